@@ -1,16 +1,44 @@
 import pytest
-import json
-import requests
-from pathlib import Path
-from requests.adapters import HTTPAdapter, Retry
-
-TEST_DATA_PATH = Path(__file__).parent / "tests" / "data" / "test_data.json"
-with open(TEST_DATA_PATH) as f:
-    TEST_DATA = json.load(f)
-
-# Timeout configuration constants
-CONNECTION_TIMEOUT = 5  # seconds for initial connection (used in health checks)
-READ_TIMEOUT = 30  # seconds for reading response
+import asyncio
+import inspect
+import os
+
+from tests.support.api_client import WorkflowProClient, create_retry_session
+from tests.support.api_login import login_via_api
+from tests.support.async_api import AsyncWorkflowProClient
+from tests.support.artifacts import artifact_dir_name
+from tests.support.auth_cache import AUTH_STATE_DIR, AuthStateCache
+from tests.support.branches import AsyncBrowser, ParallelBranches
+from tests.support.config import (
+    CONNECTION_TIMEOUT, DEFAULT_ENV, READ_TIMEOUT, ConfigError, load_config, resolve_user,
+)
+from tests.support.context_pool import ContextPool
+from tests.support.http_stats import HTTP_STATS
+from tests.support.stub_server import start_local_stub
+
+pytest_plugins = [
+    "tests.support.artifacts",
+    "tests.support.browsers",
+    "tests.support.har",
+    "tests.support.http_stats",
+    "tests.support.ledger",
+    "tests.support.network",
+    "tests.support.preflight",
+    "tests.support.project_pool",
+    "tests.support.scheduling",
+    "tests.support.selectors",
+    "tests.support.startup",
+    "tests.support.timing",
+    "tests.support.waiting",
+]
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--env",
+        default=os.getenv("WORKFLOWPRO_ENV", DEFAULT_ENV),
+        help="base_urls profile from test_data.json to run against (staging, qa)",
+    )
 
 
 def pytest_configure(config):
@@ -22,6 +50,23 @@ def pytest_configure(config):
     config.addinivalue_line("markers", "tenant: Multi-tenant tests")
     config.addinivalue_line("markers", "slow: Tests that take longer")
 
+    # WORKFLOWPRO_TARGET=local: one stand-in server per run, started before xdist workers
+    env = config.getoption("--env")
+    try:
+        test_data = load_config(env).data
+    except ConfigError as error:
+        raise pytest.UsageError(str(error))
+    if os.getenv("WORKFLOWPRO_TARGET") == "local" and not hasattr(config, "workerinput"):
+        config._workflowpro_stub = start_local_stub(test_data)
+    # after the stand-in started, so its URLs win over the profile
+    config._workflowpro_config = load_config(env)
+
+
+def pytest_unconfigure(config):
+    stub = getattr(config, "_workflowpro_stub", None)
+    if stub is not None:
+        stub.stop()
+
 
 @pytest.fixture(scope="session")
 def browser_context_args(browser_context_args):
@@ -35,81 +80,165 @@ def browser_context_args(browser_context_args):
 
 
 @pytest.fixture(scope="function")
-def context(context):
+def context(context, context_hooks):
+    for hook in context_hooks:
+        hook(context)
     yield context
 
 
 @pytest.fixture(scope="session")
-def test_data():
-    return TEST_DATA
+def workflowpro_config(pytestconfig):
+    """Frozen test data and URLs for the selected --env profile."""
+    return pytestconfig._workflowpro_config
 
 
 @pytest.fixture(scope="session")
-def base_url():
-    return TEST_DATA["base_urls"]["staging"]["web"]
+def test_data(workflowpro_config):
+    return workflowpro_config.data
 
 
 @pytest.fixture(scope="session")
-def api_base_url():
-    return TEST_DATA["base_urls"]["staging"]["api"]
+def base_url(workflowpro_config):
+    return workflowpro_config.base_url
 
 
-@pytest.fixture(scope="function", autouse=True)
-def cleanup_after_test(request):
-    yield
-    pass
+@pytest.fixture(scope="session")
+def api_base_url(workflowpro_config):
+    return workflowpro_config.api_base_url
 
 
-def create_retry_session(retries=3, backoff_factor=1):
-    """Create a requests session with retry logic for handling transient network issues."""
-    session = requests.Session()
-    retry = Retry(
-        total=retries,
-        read=retries,
-        connect=retries,
-        backoff_factor=backoff_factor,
-        status_forcelist=(500, 502, 503, 504),
+@pytest.fixture(scope="session")
+def api_client(api_base_url, workflowpro_config):
+    """Shared API client; keeps pooled keep-alive connections for the whole session."""
+    client = WorkflowProClient(
+        api_base_url,
+        workflowpro_config.endpoints,
+        session=create_retry_session(),
+        timeout=(CONNECTION_TIMEOUT, READ_TIMEOUT),
+        observers=[HTTP_STATS],
     )
-    adapter = HTTPAdapter(max_retries=retry)
-    session.mount('http://', adapter)
-    session.mount('https://', adapter)
-    return session
-
-
-@pytest.fixture(scope="session", autouse=True)
-def check_api_health():
-    """Check if API is reachable before running tests."""
-    api_base_url = TEST_DATA["base_urls"]["staging"]["api"]
-    
-    # Try to connect to the API base URL
-    try:
-        # Try a simple GET request to the API base URL with a short timeout
-        response = requests.get(
-            api_base_url,
-            timeout=(CONNECTION_TIMEOUT, CONNECTION_TIMEOUT)
-        )
-        # Even if we get a 404, that's better than a connection timeout
-        # It means the server is reachable
-    except requests.exceptions.ConnectionError:
-        pytest.skip(f"API is unreachable at {api_base_url} - skipping all tests")
-    except requests.exceptions.Timeout:
-        pytest.skip(f"API health check timed out for {api_base_url} - skipping all tests")
-    except Exception as e:
-        # For other exceptions, we'll log but continue
-        # as it might be a legitimate server response
-        pass
-
-
-@pytest.hookimpl(tryfirst=True, hookwrapper=True)
-def pytest_runtest_makereport(item, call):
-    outcome = yield
-    report = outcome.get_result()
-    
-    if report.when == "call" and report.failed:
-        if "page" in item.funcargs:
-            page = item.funcargs["page"]
-            screenshot_name = f"test-results/{item.name}.png"
-            try:
-                page.screenshot(path=screenshot_name)
-            except:
-                pass
+    yield client
+    client.close()
+
+
+@pytest.fixture(scope="session")
+def async_api(api_client):
+    """Concurrent view of api_client for `async def` tests (bounded by API_CONCURRENCY)."""
+    client = AsyncWorkflowProClient(api_client, timeout=CONNECTION_TIMEOUT + READ_TIMEOUT)
+    yield client
+    client.close()
+
+
+@pytest.fixture(scope="session")
+def context_hooks(artifact_recorder, network_router, har_session):
+    """Applied to every new browser context; the last one added sees requests first."""
+    hooks = []
+    if artifact_recorder is not None:
+        hooks.append(artifact_recorder.attach)
+    if network_router is not None:
+        hooks.append(network_router.apply)
+    if har_session is not None:
+        hooks.append(har_session.attach)
+    return hooks
+
+
+@pytest.fixture(scope="session")
+def auth_state_cache(test_data, base_url, api_base_url, context_hooks):
+    """Saved logins per test user, shared by all xdist workers."""
+    return AuthStateCache(
+        AUTH_STATE_DIR, test_data, base_url,
+        context_hooks=context_hooks, api_base_url=api_base_url,
+    )
+
+
+@pytest.fixture(scope="session")
+def api_credentials(auth_state_cache):
+    """(token, tenant_id) for a test_data.json user, from a cached API login.
+
+        tenant_a = api_client.as_tenant(*api_credentials("tenant_a_admin"))
+    """
+    return auth_state_cache.credentials
+
+
+@pytest.fixture
+def fresh_api_login(api_base_url, test_data):
+    """Uncached API login, for tests that end the session (e.g. logout)."""
+    def _login(user_key):
+        return login_via_api(api_base_url, test_data["api_endpoints"], resolve_user(test_data, user_key))
+    return _login
+
+
+@pytest.fixture(scope="session")
+def context_pool(browser, auth_state_cache, context_hooks):
+    """Warm browser contexts reused across tests, reset between leases."""
+    pool = ContextPool(browser, auth_state_cache, context_hooks=context_hooks)
+    yield pool
+    pool.close()
+
+
+@pytest.fixture
+def tenant_context(context_pool):
+    """Factory for browser contexts that are already logged in as a test_data.json user.
+
+    Contexts come from the pool and go back to it after the test; they already
+    have one blank page open. Tests that exercise the login form itself should
+    lease an anonymous context instead.
+    """
+    leased = []
+
+    def _lease(user_key, **context_args):
+        context = context_pool.lease(user_key, **context_args)
+        leased.append(context)
+        return context
+
+    yield _lease
+
+    for context in leased:
+        context_pool.release(context)
+
+
+@pytest.fixture(scope="session")
+def async_browser(browser_name, browser_type_launch_args):
+    """Async Playwright browser on its own thread, shared by parallel_branches."""
+    browser = AsyncBrowser(browser_name, browser_type_launch_args)
+    yield browser
+    browser.close()
+
+
+@pytest.fixture
+def parallel_branches(request, async_browser, auth_state_cache, network_router, har_session,
+                      artifact_recorder):
+    """Declare `async def` verification branches and run them concurrently.
+
+        @parallel_branches.branch(user="tenant_b_admin")
+        async def tenant_b(page): ...
+
+        parallel_branches.run()
+    """
+    hooks = []
+    if network_router is not None:
+        hooks.append(network_router.apply_async)
+    if har_session is not None:
+        hooks.append(har_session.attach_async)
+    return ParallelBranches(
+        async_browser,
+        auth_state_cache,
+        get_sync_browser=lambda: request.getfixturevalue("browser"),
+        context_hooks=hooks,
+        artifact_dir=(
+            artifact_recorder.output_dir / artifact_dir_name(request.node.nodeid)
+            if artifact_recorder is not None else None
+        ),
+    )
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_pyfunc_call(pyfuncitem):
+    """Run `async def` tests on a fresh event loop."""
+    if not inspect.iscoroutinefunction(pyfuncitem.obj):
+        return None
+    testargs = {
+        arg: pyfuncitem.funcargs[arg] for arg in pyfuncitem._fixtureinfo.argnames
+    }
+    asyncio.run(pyfuncitem.obj(**testargs))
+    return True
@@ -1,42 +1,28 @@
 import pytest
-import requests
-import json
-from pathlib import Path
 
-TEST_DATA_PATH = Path(__file__).parent.parent / "data" / "test_data.json"
-with open(TEST_DATA_PATH) as f:
-    TEST_DATA = json.load(f)
+from tests.support import scenarios
+from tests.support.async_api import gather_all
+from tests.support.isolation import IsolationMatrix, tenant_identities
 
-API_BASE_URL = TEST_DATA["base_urls"]["staging"]["api"]
-
-# Timeout configuration - matches values in conftest.py
-CONNECTION_TIMEOUT = 5  # seconds for initial connection
-READ_TIMEOUT = 30  # seconds for reading response
+BULK_PROJECT_COUNT = 20
+ISOLATION_PROJECTS_PER_TENANT = 5
 
 
 class TestProjectAPI:
     
     @pytest.fixture(autouse=True)
-    def setup(self):
-        self.tenant_a_token = "fake_token_tenant_a"
-        self.tenant_b_token = "fake_token_tenant_b"
-        
-        self.tenant_a_id = TEST_DATA["test_users"]["tenant_a_admin"]["tenant_id"]
-        self.tenant_b_id = TEST_DATA["test_users"]["tenant_b_admin"]["tenant_id"]
-        
-        self.created_project_ids = []
-        
-        yield
-        
-        for project_id in self.created_project_ids:
-            try:
-                requests.delete(
-                    f"{API_BASE_URL}/api/projects/{project_id}",
-                    headers={"Authorization": f"Bearer {self.tenant_a_token}"},
-                    timeout=(CONNECTION_TIMEOUT, READ_TIMEOUT)
-                )
-            except:
-                pass
+    def setup(self, api_client, api_credentials, resource_ledger):
+        self.tenant_a_token, self.tenant_a_id = api_credentials("tenant_a_admin")
+        self.tenant_b_token, self.tenant_b_id = api_credentials("tenant_b_admin")
+        
+        self.api = api_client
+        self.tenant_a = api_client.as_tenant(self.tenant_a_token, self.tenant_a_id)
+        self.tenant_b = api_client.as_tenant(self.tenant_b_token, self.tenant_b_id)
+        
+        self.ledger = resource_ledger
+    
+    def _track_tenant_a_project(self, project_id):
+        self.ledger.record("projects", project_id, "tenant_a_admin")
     
     @pytest.mark.api
     @pytest.mark.smoke
@@ -46,121 +32,79 @@ class TestProjectAPI:
             "description": "testing project creation"
         }
         
-        response = requests.post(
-            f"{API_BASE_URL}/api/projects",
-            json=project_data,
-            headers={
-                "Authorization": f"Bearer {self.tenant_a_token}",
-                "X-Tenant-ID": self.tenant_a_id
-            },
-            timeout=(CONNECTION_TIMEOUT, READ_TIMEOUT)
-        )
-        
-        assert response.status_code == 201, f"Expected 201 but got {response.status_code}"
-        
-        response_data = response.json()
-        assert "id" in response_data, "Response should contain project id"
-        assert response_data["name"] == project_data["name"]
+        project = scenarios.create_project(self.tenant_a, project_data)
         
-        self.created_project_ids.append(response_data["id"])
+        self._track_tenant_a_project(project["id"])
     
     @pytest.mark.api
     def test_list_projects_for_tenant(self):
-        response = requests.get(
-            f"{API_BASE_URL}/api/projects",
-            headers={
-                "Authorization": f"Bearer {self.tenant_a_token}",
-                "X-Tenant-ID": self.tenant_a_id
-            },
-            timeout=(CONNECTION_TIMEOUT, READ_TIMEOUT)
-        )
-        
-        assert response.status_code == 200
-        projects = response.json()
-        assert isinstance(projects, list), "Response should be list of projects"
+        scenarios.list_projects(self.tenant_a)
     
     @pytest.mark.api
     @pytest.mark.tenant
-    def test_tenant_isolation_at_api_level(self):
-        project_data = {
-            "name": "Tenant A Only Project",
-            "description": "should not be visible to tenant B"
-        }
+    def test_tenant_isolation_at_api_level(self, pooled_project):
+        project_id = pooled_project("tenant_a_admin")["id"]
         
-        create_response = requests.post(
-            f"{API_BASE_URL}/api/projects",
-            json=project_data,
-            headers={
-                "Authorization": f"Bearer {self.tenant_a_token}",
-                "X-Tenant-ID": self.tenant_a_id
-            },
-            timeout=(CONNECTION_TIMEOUT, READ_TIMEOUT)
-        )
-        
-        assert create_response.status_code == 201
-        project_id = create_response.json()["id"]
-        self.created_project_ids.append(project_id)
-        
-        get_response = requests.get(
-            f"{API_BASE_URL}/api/projects/{project_id}",
-            headers={
-                "Authorization": f"Bearer {self.tenant_b_token}",
-                "X-Tenant-ID": self.tenant_b_id
-            },
-            timeout=(CONNECTION_TIMEOUT, READ_TIMEOUT)
-        )
-        
-        assert get_response.status_code in [403, 404], \
-            f"Tenant B should not access Tenant A's project. Got {get_response.status_code}"
+        scenarios.get_project_as_other_tenant(self.tenant_b, project_id)
     
     @pytest.mark.api
-    def test_delete_project_as_admin(self):
-        project_data = {"name": "To Delete", "description": "test deletion"}
-        
-        create_response = requests.post(
-            f"{API_BASE_URL}/api/projects",
-            json=project_data,
-            headers={
-                "Authorization": f"Bearer {self.tenant_a_token}",
-                "X-Tenant-ID": self.tenant_a_id
-            },
-            timeout=(CONNECTION_TIMEOUT, READ_TIMEOUT)
+    @pytest.mark.tenant
+    async def test_bulk_projects_isolated_across_tenants(self, async_api):
+        tenant_a = async_api.as_tenant(self.tenant_a_token, self.tenant_a_id)
+        tenant_b = async_api.as_tenant(self.tenant_b_token, self.tenant_b_id)
+        
+        create_responses = await gather_all(*(
+            tenant_a.post("projects", "create", json={
+                "name": f"Bulk Isolation Project {i}",
+                "description": "bulk tenant isolation check"
+            })
+            for i in range(BULK_PROJECT_COUNT)
+        ))
+        
+        assert all(r.status_code == 201 for r in create_responses), \
+            f"Bulk create statuses: {[r.status_code for r in create_responses]}"
+        project_ids = [r.json()["id"] for r in create_responses]
+        for project_id in project_ids:
+            self._track_tenant_a_project(project_id)
+        
+        owner_responses, other_responses = await gather_all(
+            gather_all(*(tenant_a.get("projects", "get", path_params={"id": pid}) for pid in project_ids)),
+            gather_all(*(tenant_b.get("projects", "get", path_params={"id": pid}) for pid in project_ids)),
         )
         
-        project_id = create_response.json()["id"]
-        
-        delete_response = requests.delete(
-            f"{API_BASE_URL}/api/projects/{project_id}",
-            headers={
-                "Authorization": f"Bearer {self.tenant_a_token}",
-                "X-Tenant-ID": self.tenant_a_id
-            },
-            timeout=(CONNECTION_TIMEOUT, READ_TIMEOUT)
+        assert all(r.status_code == 200 for r in owner_responses), \
+            "Tenant A should read all of its own projects"
+        leaked = [pid for pid, r in zip(project_ids, other_responses) if r.status_code not in [403, 404]]
+        assert not leaked, f"Tenant B can access Tenant A's projects: {leaked}"
+    
+    @pytest.mark.api
+    @pytest.mark.tenant
+    async def test_tenant_isolation_matrix(self, async_api, api_credentials, test_data):
+        tenants = {}
+        users = {}
+        for user_key in tenant_identities(test_data):
+            token, tenant_id = api_credentials(user_key)
+            tenants[tenant_id] = async_api.as_tenant(token, tenant_id)
+            users[tenant_id] = user_key
+        
+        matrix = IsolationMatrix(tenants, resources_per_tenant=ISOLATION_PROJECTS_PER_TENANT)
+        report = await matrix.run(
+            on_created=lambda tenant_id, pid: self.ledger.record("projects", pid, users[tenant_id])
         )
         
-        assert delete_response.status_code in [200, 204], \
-            f"Delete failed with status {delete_response.status_code}"
-        
-        get_response = requests.get(
-            f"{API_BASE_URL}/api/projects/{project_id}",
-            headers={
-                "Authorization": f"Bearer {self.tenant_a_token}",
-                "X-Tenant-ID": self.tenant_a_id
-            },
-            timeout=(CONNECTION_TIMEOUT, READ_TIMEOUT)
-        )
+        assert report.ok, f"Tenant isolation violated:\n{report.render()}"
+    
+    @pytest.mark.api
+    def test_delete_project_as_admin(self, pooled_project):
+        project_id = pooled_project("tenant_a_admin", destructive=True)["id"]
         
-        assert get_response.status_code == 404, "Deleted project should return 404"
+        scenarios.delete_project(self.tenant_a, project_id)
     
     @pytest.mark.api
     def test_create_project_without_auth_fails(self):
         project_data = {"name": "No Auth Test", "description": "should fail"}
         
-        response = requests.post(
-            f"{API_BASE_URL}/api/projects",
-            json=project_data,
-            timeout=(CONNECTION_TIMEOUT, READ_TIMEOUT)
-        )
+        response = self.api.post("projects", "create", json=project_data)
         
         assert response.status_code == 401, f"Expected 401 but got {response.status_code}"
     
@@ -168,15 +112,7 @@ class TestProjectAPI:
     def test_create_project_with_invalid_data(self):
         invalid_project = {}
         
-        response = requests.post(
-            f"{API_BASE_URL}/api/projects",
-            json=invalid_project,
-            headers={
-                "Authorization": f"Bearer {self.tenant_a_token}",
-                "X-Tenant-ID": self.tenant_a_id
-            },
-            timeout=(CONNECTION_TIMEOUT, READ_TIMEOUT)
-        )
+        response = self.tenant_a.post("projects", "create", json=invalid_project)
         
         assert response.status_code == 400, \
             f"Invalid data should return 400 but got {response.status_code}"
@@ -185,14 +121,7 @@ class TestProjectAPI:
     def test_get_non_existent_project(self):
         fake_id = "non_existent_project_99999"
         
-        response = requests.get(
-            f"{API_BASE_URL}/api/projects/{fake_id}",
-            headers={
-                "Authorization": f"Bearer {self.tenant_a_token}",
-                "X-Tenant-ID": self.tenant_a_id
-            },
-            timeout=(CONNECTION_TIMEOUT, READ_TIMEOUT)
-        )
+        response = self.tenant_a.get("projects", "get", path_params={"id": fake_id})
         
         assert response.status_code == 404, \
             f"Non-existent project should return 404 but got {response.status_code}"
@@ -0,0 +1 @@
+"""Init file for shared test support helpers"""
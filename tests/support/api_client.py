@@ -0,0 +1,104 @@
+import os
+import time
+
+import requests
+from requests.adapters import HTTPAdapter, Retry
+
+from tests.support.config import CONNECTION_TIMEOUT, READ_TIMEOUT
+
+# requests in flight at once from each thread pool sharing a worker's session
+# (async tests, ledger cleanup, project pool), i.e. the width of each of them
+API_CONCURRENCY = int(os.getenv("API_CONCURRENCY", os.getenv("API_POOL_SIZE", "10")))
+API_THREAD_POOLS = 3
+# keep-alive connections per host: every thread pool busy at once, plus the test's own thread
+POOL_SIZE = API_CONCURRENCY * API_THREAD_POOLS + 1
+
+
+def create_retry_session(retries=3, backoff_factor=1, pool_size=POOL_SIZE, raise_on_status=True):
+    """Create a requests session with retry logic for handling transient network issues.
+
+    With `raise_on_status=False` a 5xx that is still failing once retries run out
+    comes back as the response instead of raising RetryError.
+    """
+    session = requests.Session()
+    retry = Retry(
+        total=retries,
+        read=retries,
+        connect=retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=(500, 502, 503, 504),
+        raise_on_status=raise_on_status,
+    )
+    adapter = HTTPAdapter(
+        max_retries=retry,
+        pool_connections=pool_size,
+        pool_maxsize=pool_size,
+    )
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+class WorkflowProClient:
+    """Thin API client over one pooled session, with paths taken from `api_endpoints`.
+
+    `as_tenant()` returns a view that shares the same connections but sends the
+    tenant's auth and X-Tenant-ID headers on every request. Observers are called
+    after each request as `observer(method, template, tenant_id, response, elapsed_ms)`,
+    with the endpoint's path template (e.g. /api/projects/{id}) rather than the URL
+    and the wall time of the whole call, retries and body download included (with
+    stream=True the body is read later, so only up to the headers).
+    """
+
+    def __init__(self, base_url, endpoints, session=None, headers=None,
+                 timeout=(CONNECTION_TIMEOUT, READ_TIMEOUT), observers=None):
+        self.base_url = base_url.rstrip("/")
+        self.endpoints = endpoints
+        self.session = session or create_retry_session()
+        self.headers = dict(headers or {})
+        self.timeout = timeout
+        self.observers = observers if observers is not None else []
+
+    def as_tenant(self, token, tenant_id):
+        headers = {
+            **self.headers,
+            "Authorization": f"Bearer {token}",
+            "X-Tenant-ID": tenant_id,
+        }
+        return WorkflowProClient(
+            self.base_url, self.endpoints, session=self.session,
+            headers=headers, timeout=self.timeout, observers=self.observers,
+        )
+
+    def path(self, group, name, **params):
+        return self.endpoints[group][name].format(**params)
+
+    def url(self, group, name, **params):
+        return f"{self.base_url}{self.path(group, name, **params)}"
+
+    def request(self, method, group, name, path_params=None, **kwargs):
+        """Send a request to endpoint `group.name`; `path_params` fill the path template."""
+        headers = {**self.headers, **kwargs.pop("headers", {})}
+        kwargs.setdefault("timeout", self.timeout)
+        url = self.url(group, name, **(path_params or {}))
+        start = time.perf_counter()
+        response = self.session.request(method, url, headers=headers, **kwargs)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        for observer in self.observers:
+            observer(method, self.endpoints[group][name], headers.get("X-Tenant-ID"), response, elapsed_ms)
+        return response
+
+    def get(self, group, name, path_params=None, **kwargs):
+        return self.request("GET", group, name, path_params=path_params, **kwargs)
+
+    def post(self, group, name, path_params=None, **kwargs):
+        return self.request("POST", group, name, path_params=path_params, **kwargs)
+
+    def put(self, group, name, path_params=None, **kwargs):
+        return self.request("PUT", group, name, path_params=path_params, **kwargs)
+
+    def delete(self, group, name, path_params=None, **kwargs):
+        return self.request("DELETE", group, name, path_params=path_params, **kwargs)
+
+    def close(self):
+        self.session.close()
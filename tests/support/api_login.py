@@ -0,0 +1,115 @@
+import time
+from typing import TYPE_CHECKING
+from urllib.parse import urlparse
+
+import pyotp
+
+from tests.support.api_client import WorkflowProClient, create_retry_session
+
+if TYPE_CHECKING:
+    from playwright.sync_api import BrowserContext
+
+
+# a code generated this close to the end of its 30s step may expire in flight
+TOTP_MIN_REMAINING = 3  # seconds
+
+# where the web app keeps the API token next to its session cookie
+TOKEN_STORAGE_KEYS = {"token": "auth_token", "tenant_id": "tenant_id"}
+
+
+class ApiLoginError(AssertionError):
+    pass
+
+
+def totp_code(secret, min_remaining=TOTP_MIN_REMAINING, clock=time.time, sleep=time.sleep):
+    """Current TOTP code, waiting for the next step if this one is about to roll over."""
+    totp = pyotp.TOTP(secret)
+    remaining = totp.interval - clock() % totp.interval
+    if remaining < min_remaining:
+        sleep(remaining + 0.1)
+    return totp.at(clock())
+
+
+def login_via_api(api_base_url: str, endpoints: dict, user: dict) -> dict:
+    """Log in with /auth/login (+ /auth/verify-2fa) and return token, tenant and cookies.
+
+    Uses its own session so the login cookies never leak into the shared api_client.
+    """
+    client = WorkflowProClient(api_base_url, endpoints, session=create_retry_session())
+    try:
+        response = client.post("auth", "login", json={
+            "email": user["email"],
+            "password": user["password"],
+        })
+        if response.status_code != 200:
+            raise ApiLoginError(f"Login failed for {user['email']}: {response.status_code}")
+        result = response.json()
+
+        if result.get("requires_2fa"):
+            if not user.get("totp_secret"):
+                raise ApiLoginError(f"{user['email']} needs 2FA but has no totp_secret")
+            result = _verify_2fa(client, result["challenge_token"], user)
+
+        token = result.get("token") or result.get("access_token")
+        if not token:
+            raise ApiLoginError(f"No token in login response for {user['email']}: {result}")
+        return {
+            "token": token,
+            "tenant_id": result.get("tenant_id") or user["tenant_id"],
+            "cookies": [
+                {"name": cookie.name, "value": cookie.value, "path": cookie.path or "/"}
+                for cookie in client.session.cookies
+            ],
+        }
+    finally:
+        client.close()
+
+
+def _verify_2fa(client, challenge_token, user):
+    interval = pyotp.TOTP(user["totp_secret"]).interval
+    response = None
+    for _ in range(2):
+        response = client.post("auth", "verify_2fa", json={
+            "challenge_token": challenge_token,
+            "code": totp_code(user["totp_secret"]),
+        })
+        if response.status_code == 200:
+            return response.json()
+        if response.status_code != 401:
+            break
+        # clock skew with the server: the next step's code usually works
+        time.sleep(interval - time.time() % interval + 0.1)
+    raise ApiLoginError(f"2FA verification failed for {user['email']}: {response.status_code}")
+
+
+def storage_state(login: dict, base_url: str) -> dict:
+    """Playwright storage_state for the web app from an API login."""
+    parts = urlparse(base_url)
+    origin = f"{parts.scheme}://{parts.netloc}"
+    cookies = login["cookies"] or [{"name": "session", "value": login["token"], "path": "/"}]
+    return {
+        "cookies": [
+            {
+                "name": cookie["name"],
+                "value": cookie["value"],
+                "domain": parts.hostname,
+                "path": cookie["path"],
+                "expires": -1,
+                "httpOnly": True,
+                "secure": parts.scheme == "https",
+                "sameSite": "Lax",
+            }
+            for cookie in cookies
+        ],
+        "origins": [{
+            "origin": origin,
+            "localStorage": [
+                {"name": TOKEN_STORAGE_KEYS[key], "value": login[key]} for key in TOKEN_STORAGE_KEYS
+            ],
+        }],
+    }
+
+
+def inject_login(context: "BrowserContext", login: dict, base_url: str):
+    """Log an existing context in by adding the session cookies from an API login."""
+    context.add_cookies(storage_state(login, base_url)["cookies"])
@@ -0,0 +1,230 @@
+"""Failure artifacts for browser tests: Playwright trace, screenshot and console/network log.
+
+Every browser context (the `page`/`context` fixtures, pooled and login contexts)
+is traced from the moment it is created, one trace chunk per test. When the test
+passes the chunk is dropped without being written; when setup or the test itself
+fails, each context the test used writes its chunk, a screenshot of every open
+page and the last ARTIFACT_LOG_LINES console messages and requests to
+test-results/<test>/. The files are linked from the HTML report, with the
+screenshots and logs embedded.
+
+    pytest --artifacts=off                           # no tracing at all
+    ARTIFACT_TRACE_SNAPSHOTS=0 pytest tests/ui       # cheaper traces: actions and network only
+
+Screenshots are JPEGs at ARTIFACT_SCREENSHOT_QUALITY. Once ARTIFACT_MAX_MB has
+been written in one run (per xdist worker), further failures keep their logs and
+screenshots but not their traces.
+"""
+import base64
+import os
+import re
+import time
+from collections import deque
+from pathlib import Path
+
+import pytest
+
+try:
+    from pytest_html import extras as html_extras
+except ImportError:  # report links are optional
+    html_extras = None
+
+
+ARTIFACT_DIR = Path(os.getenv("ARTIFACT_DIR", Path(__file__).parent.parent.parent / "test-results"))
+ARTIFACT_TRACE_SNAPSHOTS = os.getenv("ARTIFACT_TRACE_SNAPSHOTS", "1") != "0"  # DOM snapshots per action
+ARTIFACT_SCREENSHOT_QUALITY = int(os.getenv("ARTIFACT_SCREENSHOT_QUALITY", "60"))  # JPEG, 0-100
+ARTIFACT_FULL_PAGE = os.getenv("ARTIFACT_FULL_PAGE", "0") == "1"
+ARTIFACT_LOG_LINES = int(os.getenv("ARTIFACT_LOG_LINES", "500"))  # per context
+ARTIFACT_MAX_MB = float(os.getenv("ARTIFACT_MAX_MB", "200"))  # traces per run, per worker
+
+SCREENSHOT_TIMEOUT = 5000  # ms; a hung page shouldn't hold up the report
+
+
+def artifact_dir_name(nodeid):
+    return re.sub(r"[^\w.-]+", "_", nodeid).strip("_")[:180]
+
+
+class TracedContext:
+    """Trace chunk and rolling console/network log of one browser context."""
+
+    def __init__(self, context, snapshots=ARTIFACT_TRACE_SNAPSHOTS, log_lines=ARTIFACT_LOG_LINES):
+        self.context = context
+        self.log = deque(maxlen=log_lines)
+        self.used = False
+        self.chunk_open = False
+        context.tracing.start(screenshots=snapshots, snapshots=snapshots, sources=False)
+        self.start_chunk()
+        context.on("page", self._watch_page)
+        context.on("requestfinished", self._request_finished)
+        context.on("requestfailed", self._request_failed)
+        for page in context.pages:
+            self._watch_page(page)
+
+    def start_chunk(self):
+        if not self.chunk_open:
+            self.context.tracing.start_chunk()
+            self.chunk_open = True
+        self.log.clear()
+        self.used = False
+
+    def stop_chunk(self, path=None):
+        if not self.chunk_open:
+            return
+        self.chunk_open = False
+        if path is None:
+            self.context.tracing.stop_chunk()
+        else:
+            self.context.tracing.stop_chunk(path=path)
+
+    def _line(self, text):
+        self.used = True
+        self.log.append(f"{time.strftime('%H:%M:%S')} {text}")
+
+    def _watch_page(self, page):
+        page.on("console", lambda message: self._line(f"console.{message.type}: {message.text}"))
+        page.on("pageerror", lambda error: self._line(f"pageerror: {error}"))
+
+    def _request_finished(self, request):
+        response = request.response()
+        status = response.status if response is not None else "-"
+        self._line(f"{request.method} {request.url} -> {status}")
+
+    def _request_failed(self, request):
+        self._line(f"{request.method} {request.url} -> failed: {request.failure}")
+
+
+class ArtifactRecorder:
+    """Keeps every browser context traced and writes artifacts for failed tests."""
+
+    def __init__(self, output_dir=ARTIFACT_DIR, max_bytes=ARTIFACT_MAX_MB * 1024 * 1024):
+        self.output_dir = Path(output_dir)
+        self.max_bytes = max_bytes
+        self.written_bytes = 0
+        self.traced = {}  # context -> TracedContext
+        self.errors = []  # why an artifact of the last capture is missing
+
+    def attach(self, context):
+        """Context hook: start tracing a new context."""
+        traced = TracedContext(context)
+        # contexts made inside a test (page fixture, login) belong to it even before any request
+        traced.used = True
+        self.traced[context] = traced
+        context.on("close", lambda _: self.traced.pop(context, None))
+
+    def begin_test(self):
+        for traced in list(self.traced.values()):
+            self._safely(traced.start_chunk)
+
+    def end_test(self):
+        for traced in list(self.traced.values()):
+            self._safely(traced.stop_chunk)
+
+    def capture(self, nodeid):
+        """Write trace, screenshots and log for each context the test used; returns the paths."""
+        self.errors = []
+        used = [traced for traced in self.traced.values() if traced.used]
+        if not used:
+            return []
+        directory = self.output_dir / artifact_dir_name(nodeid)
+        directory.mkdir(parents=True, exist_ok=True)
+        # only this recorder's files from an earlier run; parallel branches keep theirs in the same place
+        for stale in directory.glob("context*"):
+            stale.unlink()
+        paths = []
+        for index, traced in enumerate(used):
+            for page_index, page in enumerate(traced.context.pages):
+                path = directory / f"context{index}-page{page_index}.jpg"
+                if self._safely(
+                    page.screenshot, path=path, type="jpeg", quality=ARTIFACT_SCREENSHOT_QUALITY,
+                    full_page=ARTIFACT_FULL_PAGE, timeout=SCREENSHOT_TIMEOUT,
+                ):
+                    paths.append(path)
+            if traced.log:
+                path = directory / f"context{index}.log"
+                path.write_text("\n".join(traced.log) + "\n")
+                paths.append(path)
+            if self.written_bytes >= self.max_bytes:
+                self.errors.append(f"context{index}: trace dropped, ARTIFACT_MAX_MB reached")
+                self._safely(traced.stop_chunk)
+                continue
+            path = directory / f"context{index}-trace.zip"
+            if self._safely(traced.stop_chunk, path=path) and path.exists():
+                paths.append(path)
+        self.written_bytes += sum(path.stat().st_size for path in paths)
+        return paths
+
+    def _safely(self, action, *args, **kwargs):
+        # the context may already be closed or crashed; the test failure is what matters
+        try:
+            action(*args, **kwargs)
+            return True
+        except Exception as error:
+            self.errors.append(f"{action.__name__}: {error}")
+            return False
+
+
+ARTIFACTS = ArtifactRecorder()
+
+
+def report_extras(paths, report_dir):
+    """pytest-html extras: screenshots and logs embedded, every file linked."""
+    extras = []
+    for path in paths:
+        link = os.path.relpath(path, report_dir)
+        if path.suffix == ".jpg":
+            extras.append(html_extras.jpg(base64.b64encode(path.read_bytes()).decode(), name=path.name))
+        elif path.suffix == ".log":
+            extras.append(html_extras.text(path.read_text(), name=path.name))
+        else:
+            # open with `playwright show-trace <file>` or https://trace.playwright.dev
+            extras.append(html_extras.url(link, name=path.name))
+            continue
+        extras.append(html_extras.url(link, name=f"{path.name} (file)"))
+    return extras
+
+
+# -----------------------------
+# pytest plugin
+# -----------------------------
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--artifacts",
+        choices=("off", "retain-on-failure"),
+        default=os.getenv("ARTIFACTS", "retain-on-failure"),
+        help="trace browser contexts and keep trace, screenshots and log of failed tests",
+    )
+
+
+@pytest.fixture(scope="session")
+def artifact_recorder(pytestconfig):
+    """Tracer to attach to new browser contexts, or None with --artifacts=off."""
+    return None if pytestconfig.getoption("--artifacts") == "off" else ARTIFACTS
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_protocol(item, nextitem):
+    ARTIFACTS.begin_test()
+    yield
+    ARTIFACTS.end_test()
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    outcome = yield
+    report = outcome.get_result()
+    if not report.failed or report.when == "teardown":
+        return
+    paths = ARTIFACTS.capture(item.nodeid)
+    if call.excinfo is not None:
+        # e.g. BranchFailure, for contexts this recorder doesn't trace
+        paths += getattr(call.excinfo.value, "artifacts", [])
+    lines = [str(path) for path in paths] + ARTIFACTS.errors
+    if lines:
+        report.sections.append(("failure artifacts", "\n".join(lines)))
+    if not paths:
+        return
+    htmlpath = getattr(item.config.option, "htmlpath", None)
+    if html_extras is not None and htmlpath:
+        report_dir = Path(htmlpath).resolve().parent
+        report.extras = getattr(report, "extras", []) + report_extras(paths, report_dir)
@@ -0,0 +1,63 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+from tests.support.api_client import API_CONCURRENCY
+
+
+class AsyncWorkflowProClient:
+    """Awaitable front end for `WorkflowProClient` so independent requests overlap.
+
+    Requests run on a bounded thread pool that shares the wrapped client's pooled
+    connections; the pool is sized for API_CONCURRENCY, so `concurrency` should not
+    exceed it. The client's (connect, read) timeouts still apply to every request;
+    `timeout` is an extra overall deadline per request, including time spent queued.
+    """
+
+    def __init__(self, client, concurrency=API_CONCURRENCY, timeout=None, executor=None):
+        self.client = client
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.executor = executor or ThreadPoolExecutor(
+            max_workers=concurrency, thread_name_prefix="api"
+        )
+
+    def as_tenant(self, token, tenant_id):
+        return AsyncWorkflowProClient(
+            self.client.as_tenant(token, tenant_id),
+            concurrency=self.concurrency,
+            timeout=self.timeout,
+            executor=self.executor,
+        )
+
+    async def request(self, method, group, name, path_params=None, **kwargs):
+        return await self.call(self.client.request, method, group, name, path_params=path_params, **kwargs)
+
+    async def call(self, function, *args, **kwargs):
+        """Run `function(*args, **kwargs)` on the pool, for blocking helpers such as iter_projects."""
+        future = asyncio.get_running_loop().run_in_executor(self.executor, functools.partial(function, *args, **kwargs))
+        return await asyncio.wait_for(future, self.timeout)
+
+    async def get(self, group, name, path_params=None, **kwargs):
+        return await self.request("GET", group, name, path_params=path_params, **kwargs)
+
+    async def post(self, group, name, path_params=None, **kwargs):
+        return await self.request("POST", group, name, path_params=path_params, **kwargs)
+
+    async def put(self, group, name, path_params=None, **kwargs):
+        return await self.request("PUT", group, name, path_params=path_params, **kwargs)
+
+    async def delete(self, group, name, path_params=None, **kwargs):
+        return await self.request("DELETE", group, name, path_params=path_params, **kwargs)
+
+    def close(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+async def gather_all(*aws):
+    """Await everything, then raise the first error so no request is left running."""
+    results = await asyncio.gather(*aws, return_exceptions=True)
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
+    return results
@@ -0,0 +1,118 @@
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING
+from urllib.parse import urlparse
+
+from tests.support.api_login import login_via_api, storage_state
+from tests.support.config import resolve_user
+from tests.support.locking import atomic_write_text, file_lock
+from tests.support.scheduling import note_tenant
+from tests.support.session_scope import session_scope
+from tests.support.timing import span
+
+if TYPE_CHECKING:
+    from playwright.sync_api import Browser
+
+
+AUTH_STATE_DIR = Path(__file__).parent.parent.parent / ".cache" / "auth"
+DEFAULT_TTL = int(os.getenv("AUTH_STATE_TTL", "1200"))  # seconds a saved login is reused
+LOGIN_MODE = os.getenv("AUTH_LOGIN_MODE", "api")  # api: two HTTP calls, ui: drive the login form
+
+
+class AuthStateCache:
+    """Log each tenant user in once and share the saved storage_state across workers.
+
+    States live on disk so every pytest-xdist worker (and later runs within the TTL)
+    reuse the same login. A per-user file lock makes sure only one worker logs in.
+    With an api_base_url the login is done over the API (login + verify-2fa) and
+    the session cookie and token are written straight into the storage_state;
+    the API token is kept too, for tests that call the API as that user.
+    """
+
+    def __init__(self, cache_dir, test_data: dict, base_url: str, ttl: int = DEFAULT_TTL,
+                 context_hooks=(), api_base_url: str = None, login_mode: str = LOGIN_MODE):
+        hosts = f"{urlparse(base_url).netloc or base_url} {api_base_url or ''}"
+        host_key = hashlib.sha1(hosts.encode()).hexdigest()[:10]
+        self.cache_dir = Path(cache_dir) / host_key
+        self.test_data = test_data
+        self.base_url = base_url
+        self.api_base_url = api_base_url
+        self.login_mode = login_mode if api_base_url else "ui"
+        self.ttl = ttl
+        self.context_hooks = list(context_hooks)
+
+    def state_path(self, user_key: str) -> Path:
+        return self.cache_dir / f"{user_key}.json"
+
+    def credentials_path(self, user_key: str) -> Path:
+        return self.cache_dir / f"{user_key}.token.json"
+
+    def is_fresh(self, user_key: str) -> bool:
+        return self._is_fresh(self.state_path(user_key))
+
+    def _is_fresh(self, path: Path) -> bool:
+        return path.exists() and time.time() - path.stat().st_mtime < self.ttl
+
+    def get(self, browser: "Browser", user_key: str) -> Path:
+        """Return a storage_state file for the user, logging in only if none is fresh."""
+        if self.login_mode == "api":
+            return self._ensure(user_key, self.state_path(user_key), lambda: self._api_login(user_key))
+        return self._ensure(user_key, self.state_path(user_key), lambda: self._login(browser, user_key))
+
+    def credentials(self, user_key: str):
+        """(token, tenant_id) from an API login for the user, shared like the saved states."""
+        note_tenant(user_key)
+        path = self._ensure(user_key, self.credentials_path(user_key), lambda: self._api_login(user_key))
+        credentials = json.loads(path.read_text())
+        return credentials["token"], credentials["tenant_id"]
+
+    def invalidate(self, user_key: str):
+        with file_lock(self.cache_dir / f"{user_key}.lock"):
+            self.state_path(user_key).unlink(missing_ok=True)
+            self.credentials_path(user_key).unlink(missing_ok=True)
+
+    def _ensure(self, user_key: str, path: Path, login) -> Path:
+        if self._is_fresh(path):
+            return path
+
+        with file_lock(self.cache_dir / f"{user_key}.lock"):
+            # another worker may have logged in while we waited for the lock
+            if not self._is_fresh(path):
+                # shared by every later test, not part of the one that happened to need it first
+                with session_scope():
+                    login()
+        return path
+
+    def _api_login(self, user_key: str):
+        user = resolve_user(self.test_data, user_key)
+        with span("login", user_key):
+            login = login_via_api(self.api_base_url, self.test_data["api_endpoints"], user)
+
+        atomic_write_text(self.credentials_path(user_key), json.dumps({
+            "token": login["token"],
+            "tenant_id": login["tenant_id"],
+        }))
+        if self.login_mode == "api":
+            atomic_write_text(self.state_path(user_key), json.dumps(storage_state(login, self.base_url)))
+
+    def _login(self, browser: "Browser", user_key: str):
+        from tests.support.ui_login import login_via_ui
+
+        user = resolve_user(self.test_data, user_key)
+        selectors = self.test_data["ui_selectors"]["login"]
+
+        with span("login", user_key):
+            context = browser.new_context()
+            for hook in self.context_hooks:
+                hook(context)
+            try:
+                page = context.new_page()
+                login_via_ui(page, user, selectors, self.base_url)
+                state = context.storage_state()
+            finally:
+                context.close()
+
+        atomic_write_text(self.state_path(user_key), json.dumps(state))
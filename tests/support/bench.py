@@ -0,0 +1,432 @@
+"""Benchmarks of the harness itself, run against the local stand-in.
+
+    python -m tests.support.bench                          # compare with the saved baseline
+    python -m tests.support.bench --save-baseline          # after an intended change
+    python -m tests.support.bench --only api_login,ledger_cleanup --iterations 50
+
+Each benchmark repeats one building block of the harness (config loading, API
+and form logins, the auth state cache, pre-flight probes, project create/delete,
+ledger cleanup, the project pool, listings, pytest start-up, browser contexts)
+against a fresh WorkflowProStub. Only the part inside `with clock():` is timed;
+everything else in an iteration is setup. After a few warm-up rounds the timed
+iterations give min/mean/p50/p95/max, and a second, shorter pass under
+tracemalloc gives the peak memory allocated inside the timed part.
+
+Results go to reports/bench.json. The run fails (exit 1) when a tracked metric
+(TRACKED_METRICS) is more than --threshold worse than in the baseline and also
+worse by more than its noise floor. Benchmarks that can't run here (no browser
+installed) are reported as skipped and never compared. Baselines are machine
+dependent: save them on the same kind of machine that compares against them.
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+
+from tests.support import config as config_module
+from tests.support.api_client import WorkflowProClient, create_retry_session
+from tests.support.api_login import login_via_api
+from tests.support.auth_cache import AuthStateCache
+from tests.support.config import DEFAULT_ENV, ROOT_DIR, load_config, resolve_user
+from tests.support.ledger import ResourceLedger
+from tests.support.listing import iter_projects
+from tests.support.preflight import Preflight, probe_all
+from tests.support.project_pool import ProjectPool
+from tests.support.scenarios import create_project, delete_project
+from tests.support.stub_server import start_local_stub
+
+
+BASELINE_PATH = ROOT_DIR / "tests" / "data" / "bench_baseline.json"
+REPORT_PATH = ROOT_DIR / "reports" / "bench.json"
+
+BENCH_ITERATIONS = int(os.getenv("BENCH_ITERATIONS", "30"))
+BENCH_THRESHOLD = float(os.getenv("BENCH_THRESHOLD", "0.25"))  # 25% worse than the baseline fails
+WARMUP_ITERATIONS = 3
+MEMORY_ITERATIONS = 5
+
+# metric -> smallest difference that counts; below it a change is noise
+TRACKED_METRICS = {"p50_ms": 1.0, "peak_kb": 64.0}
+
+LISTED_PROJECTS = 250  # seeded once into tenant B for the listing benchmark
+LEDGER_BATCH = 10  # projects created, then cleaned up, per ledger_cleanup iteration
+
+
+class Clock:
+    """Times the `with clock():` part of each iteration (and its memory peak, when traced)."""
+
+    def __init__(self, trace_memory=False):
+        self.trace_memory = trace_memory
+        self.samples_ms = []
+        self.peaks_kb = []
+
+    @contextmanager
+    def __call__(self):
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+            before, _ = tracemalloc.get_traced_memory()
+        start = time.perf_counter()
+        yield
+        self.samples_ms.append((time.perf_counter() - start) * 1000)
+        if self.trace_memory:
+            _, peak = tracemalloc.get_traced_memory()
+            self.peaks_kb.append(max(peak - before, 0) / 1024)
+
+
+class BenchEnv:
+    """The stand-in and everything the benchmarks share; browser parts start on first use."""
+
+    def __init__(self, env, work_dir):
+        self.work_dir = Path(work_dir)
+        self.stub = start_local_stub(load_config(env).data)
+        self.config = load_config(env)
+        self.env = env
+        self.test_data = self.config.data
+        self.client = WorkflowProClient(
+            self.config.api_base_url, self.config.endpoints, session=create_retry_session(retries=0),
+        )
+        self.auth_cache = AuthStateCache(
+            self.work_dir / "auth", self.test_data, self.config.base_url, api_base_url=self.config.api_base_url,
+        )
+        self.tenant_a = self.client.as_tenant(*self.auth_cache.credentials("tenant_a_admin"))
+        self.tenant_b = self.client.as_tenant(*self.auth_cache.credentials("tenant_b_admin"))
+        self._playwright = None
+        self._browser = None
+        self._browser_error = None
+        self._shared = {}
+
+    def shared(self, key, create):
+        """Set up once per run, e.g. a pool or seeded projects."""
+        if key not in self._shared:
+            self._shared[key] = create()
+        return self._shared[key]
+
+    def browser(self):
+        """The Chromium browser, or BenchSkipped when it can't be launched here."""
+        if self._browser is None and self._browser_error is None:
+            try:
+                from playwright.sync_api import sync_playwright
+
+                self._playwright = sync_playwright().start()
+                self._browser = self._playwright.chromium.launch()
+            except Exception as error:
+                self._browser_error = str(error).splitlines()[0]
+        if self._browser is None:
+            raise BenchSkipped(f"browser unavailable: {self._browser_error}")
+        return self._browser
+
+    def close(self):
+        for closer in self._shared.values():
+            if hasattr(closer, "close"):
+                closer.close()
+        if self._browser is not None:
+            self._browser.close()
+            self._playwright.stop()
+        self.client.close()
+        self.stub.stop()
+
+
+class BenchSkipped(Exception):
+    pass
+
+
+# -----------------------------
+# benchmarks: fn(env, clock) times its building block once
+# -----------------------------
+
+def config_load(env, clock):
+    config_module._read_test_data.cache_clear()
+    config_module._load_config.cache_clear()
+    with clock():
+        load_config(env.env).endpoints
+
+
+def api_login(env, clock):
+    user = resolve_user(env.test_data, "tenant_a_member")
+    with clock():
+        login_via_api(env.config.api_base_url, env.config.endpoints, user)
+
+
+def api_login_2fa(env, clock):
+    # may wait for the next TOTP step now and then; p50 is what is tracked
+    user = resolve_user(env.test_data, "tenant_a_admin")
+    with clock():
+        login_via_api(env.config.api_base_url, env.config.endpoints, user)
+
+
+def auth_cache_hit(env, clock):
+    with clock():
+        env.auth_cache.credentials("tenant_a_admin")
+
+
+def auth_cache_miss(env, clock):
+    env.auth_cache.invalidate("tenant_a_member")
+    with clock():
+        env.auth_cache.credentials("tenant_a_member")
+
+
+def preflight_probe(env, clock):
+    targets = Preflight.for_config(env.config).targets
+    with clock():
+        probe_all(targets)
+
+
+def preflight_cached(env, clock):
+    # a new Preflight per test run, reading what the first one probed
+    targets = Preflight.for_config(env.config).targets
+    cache_dir = env.work_dir / "preflight"
+    Preflight(targets, cache_dir).results()
+    with clock():
+        Preflight(targets, cache_dir).results()
+
+
+def project_create_delete(env, clock):
+    with clock():
+        project = create_project(env.tenant_a, {"name": "Bench Project", "description": "bench"})
+        delete_project(env.tenant_a, project["id"])
+
+
+def ledger_cleanup(env, clock):
+    ledger = env.shared("ledger", lambda: ResourceLedger(env.client, env.auth_cache.credentials))
+    for i in range(LEDGER_BATCH):
+        project = create_project(env.tenant_a, {"name": f"Bench Ledger {i}", "description": "bench"})
+        ledger.record("projects", project["id"], "tenant_a_admin")
+    with clock():
+        ledger.flush()
+    assert not ledger.leaked, f"ledger leaked {len(ledger.leaked)} projects"
+
+
+def project_pool_lease(env, clock):
+    pool = env.shared("project_pool", lambda: _project_pool(env))
+    with clock():
+        project = pool.lease("tenant_a_admin")
+    pool.release("tenant_a_admin", project["id"])
+
+
+def _project_pool(env):
+    pool = ProjectPool(env.client, env.auth_cache.credentials, env.test_data["test_projects"]["valid_project_1"])
+    pool.prefill("tenant_a_admin")
+    return pool
+
+
+def list_projects(env, clock):
+    env.shared("listed_projects", lambda: [
+        create_project(env.tenant_b, {"name": f"Bench Listed {i}", "description": "bench"})
+        for i in range(LISTED_PROJECTS)
+    ])
+    with clock():
+        count = sum(1 for _ in iter_projects(env.tenant_b))
+    assert count >= LISTED_PROJECTS, f"listed {count} of {LISTED_PROJECTS} projects"
+
+
+def pytest_startup(env, clock):
+    # conftest, plugins and collection of the API tests, in a fresh interpreter; its HTML report
+    # goes to the scratch dir instead of over reports/report.html
+    command = [
+        sys.executable, "-m", "pytest", "--collect-only", "-q", "-p", "no:cacheprovider",
+        f"--html={env.work_dir / 'pytest_startup.html'}", "tests/api",
+    ]
+    with clock():
+        result = subprocess.run(command, cwd=ROOT_DIR, capture_output=True, text=True,
+                                env={**os.environ, "WORKFLOWPRO_TARGET": "local"})
+    assert result.returncode == 0, result.stdout[-2000:] + result.stderr[-2000:]
+
+
+def browser_context(env, clock):
+    from tests.support.artifacts import ArtifactRecorder
+
+    browser = env.browser()
+    recorder = env.shared("artifact_recorder", lambda: ArtifactRecorder(env.work_dir / "artifacts"))
+    with clock():
+        context = browser.new_context(viewport={"width": 1920, "height": 1080})
+        recorder.attach(context)
+        context.new_page()
+        context.close()
+
+
+def robust_context(env, clock):
+    from tests.support.context_pool import ContextPool
+    from tests.ui.login_test import ROBUST_CONTEXT_ARGS
+
+    pool = env.shared("context_pool", lambda: ContextPool(env.browser(), env.auth_cache))
+    with clock():
+        context = pool.lease(**ROBUST_CONTEXT_ARGS)
+        pool.release(context)
+
+
+def ui_login(env, clock):
+    cache = env.shared("ui_auth_cache", lambda: AuthStateCache(
+        env.work_dir / "auth-ui", env.test_data, env.config.base_url, login_mode="ui",
+    ))
+    browser = env.browser()
+    cache.invalidate("tenant_a_member")
+    with clock():
+        cache.get(browser, "tenant_a_member")
+
+
+BENCHMARKS = {
+    "config_load": config_load,
+    "api_login": api_login,
+    "api_login_2fa": api_login_2fa,
+    "auth_cache_hit": auth_cache_hit,
+    "auth_cache_miss": auth_cache_miss,
+    "preflight_probe": preflight_probe,
+    "preflight_cached": preflight_cached,
+    "project_create_delete": project_create_delete,
+    "ledger_cleanup": ledger_cleanup,
+    "project_pool_lease": project_pool_lease,
+    "list_projects": list_projects,
+    "pytest_startup": pytest_startup,
+    "browser_context": browser_context,
+    "robust_context": robust_context,
+    "ui_login": ui_login,
+}
+# slow ones get fewer rounds; memory can't be traced in a subprocess
+ITERATION_CAPS = {"pytest_startup": 5, "api_login_2fa": 10}
+UNTRACED = {"pytest_startup"}
+
+
+def percentile(sorted_samples, q):
+    index = min(len(sorted_samples) - 1, max(0, round(q / 100 * len(sorted_samples)) - 1))
+    return sorted_samples[index]
+
+
+def summarize(samples_ms, peaks_kb):
+    samples = sorted(samples_ms)
+    summary = {
+        "n": len(samples),
+        "min_ms": samples[0],
+        "mean_ms": sum(samples) / len(samples),
+        "p50_ms": percentile(samples, 50),
+        "p95_ms": percentile(samples, 95),
+        "max_ms": samples[-1],
+    }
+    if peaks_kb:
+        summary["peak_kb"] = max(peaks_kb)
+    return {key: round(value, 3) for key, value in summary.items()}
+
+
+def run_benchmark(env, benchmark, iterations, memory_iterations=MEMORY_ITERATIONS, trace_memory=True):
+    for _ in range(WARMUP_ITERATIONS):
+        benchmark(env, Clock())
+    clock = Clock()
+    for _ in range(iterations):
+        benchmark(env, clock)
+    memory = Clock(trace_memory=True)
+    if trace_memory:
+        tracemalloc.start()
+        try:
+            for _ in range(memory_iterations):
+                benchmark(env, memory)
+        finally:
+            tracemalloc.stop()
+    return summarize(clock.samples_ms, memory.peaks_kb)
+
+
+def run_benchmarks(env, names, iterations):
+    results = {}
+    for name in names:
+        try:
+            results[name] = run_benchmark(
+                env, BENCHMARKS[name], min(iterations, ITERATION_CAPS.get(name, iterations)),
+                trace_memory=name not in UNTRACED,
+            )
+        except BenchSkipped as skipped:
+            results[name] = {"skipped": str(skipped)}
+    return results
+
+
+def compare(results, baseline, threshold=BENCH_THRESHOLD):
+    """Tracked metrics worse than the baseline by more than `threshold` and the noise floor."""
+    regressions = []
+    for name, before in baseline.get("benchmarks", {}).items():
+        after = results.get(name)
+        if not after or "skipped" in after or "skipped" in before:
+            continue
+        for metric, noise_floor in TRACKED_METRICS.items():
+            old, new = before.get(metric), after.get(metric)
+            if old is None or new is None:
+                continue
+            if new > old * (1 + threshold) and new - old > noise_floor:
+                regressions.append({
+                    "benchmark": name, "metric": metric, "baseline": old, "current": new,
+                    "change": (new - old) / old if old else None,
+                })
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--only", type=lambda value: [name.strip() for name in value.split(",") if name.strip()],
+                        default=list(BENCHMARKS), help="comma-separated benchmark names")
+    parser.add_argument("--iterations", type=int, default=BENCH_ITERATIONS)
+    parser.add_argument("--threshold", type=float, default=BENCH_THRESHOLD,
+                        help="relative regression that fails the run, e.g. 0.25")
+    parser.add_argument("--env", default=os.getenv("WORKFLOWPRO_ENV", DEFAULT_ENV),
+                        help="base_urls profile from test_data.json (only its test data is used)")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true", help="write the results as the new baseline")
+    parser.add_argument("--output", type=Path, default=REPORT_PATH)
+    args = parser.parse_args(argv)
+    unknown = [name for name in args.only if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmarks {unknown}; choose from {sorted(BENCHMARKS)}")
+
+    work_dir = Path(tempfile.mkdtemp(prefix="workflowpro-bench-"))
+    env = BenchEnv(args.env, work_dir)
+    try:
+        results = run_benchmarks(env, args.only, args.iterations)
+    finally:
+        env.close()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    report = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "machine": f"{platform.system()} {platform.machine()}, Python {platform.python_version()}",
+        "iterations": args.iterations,
+        "benchmarks": results,
+    }
+    baseline = json.loads(args.baseline.read_text()) if args.baseline.exists() else None
+    if baseline is not None and not args.save_baseline:
+        report["baseline"] = str(args.baseline)
+        report["threshold"] = args.threshold
+        report["regressions"] = compare(results, baseline, args.threshold)
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps(report, indent=2))
+
+    before = (baseline or {}).get("benchmarks", {})
+    for name, result in results.items():
+        if "skipped" in result:
+            print(f"  {name:24s} skipped ({result['skipped']})")
+            continue
+        old = before.get(name, {}).get("p50_ms")
+        change = f" ({(result['p50_ms'] - old) / old:+.0%} vs baseline)" if old and not args.save_baseline else ""
+        memory = f" peak={result['peak_kb']:.0f}KB" if "peak_kb" in result else ""
+        print(f"  {name:24s} n={result['n']:<4d} p50={result['p50_ms']:.2f}ms "
+              f"p95={result['p95_ms']:.2f}ms{memory}{change}")
+    print(f"report written to {args.output}")
+
+    if args.save_baseline:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps({key: report[key] for key in ("created", "machine", "benchmarks")},
+                                            indent=2) + "\n")
+        print(f"baseline written to {args.baseline}")
+        return 0
+    if baseline is None:
+        print(f"no baseline at {args.baseline}; save one with --save-baseline")
+        return 0
+    for regression in report["regressions"]:
+        print(f"REGRESSION {regression['benchmark']} {regression['metric']}: "
+              f"{regression['baseline']} -> {regression['current']} (> {args.threshold:.0%})")
+    return 1 if report["regressions"] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,229 @@
+"""Run independent browser verification branches of one test concurrently.
+
+Once a test has set up its data, checks like "visible on desktop", "visible on
+mobile" and "not visible to tenant B" don't depend on each other. Declared as
+branches they run at the same time, so the test takes as long as its slowest
+branch instead of the sum of all of them:
+
+    def test_project_visible(parallel_branches, base_url):
+        @parallel_branches.branch(user="tenant_a_admin", viewport={"width": 1920, "height": 1080})
+        async def desktop(page):
+            await page.goto(f"{base_url}/projects")
+            ...
+
+        @parallel_branches.branch(user="tenant_a_admin", device="iPhone 12")
+        async def mobile(page):
+            ...
+
+        parallel_branches.run()
+
+The fixtures drive Playwright through the sync API, which owns the test thread's
+event loop, so branches use the async API on a thread of their own with one
+browser shared by all tests of the worker. Each branch gets a fresh context
+(logged in from the saved states when `user` is given, with network filtering
+and HAR record/replay applied) and a page. Every branch runs to the end; if any
+failed, BranchFailure lists each failed branch with its error and, unless
+--artifacts=off, the trace and screenshot kept for it. Branches still running
+after BRANCH_TIMEOUT are cancelled, their contexts closed, and BranchTimeout raised.
+"""
+import asyncio
+import concurrent.futures
+import threading
+import time
+
+from tests.support.artifacts import ARTIFACT_SCREENSHOT_QUALITY, ARTIFACT_TRACE_SNAPSHOTS
+from tests.support.scheduling import note_tenant
+
+
+BRANCH_TIMEOUT = 120  # seconds for all branches of one run()
+CANCEL_TIMEOUT = 30  # seconds for timed out branches to close their contexts
+
+
+class BranchTimeout(AssertionError):
+    pass
+
+
+class BranchFailure(AssertionError):
+
+    def __init__(self, failures, total):
+        self.failures = failures  # [(name, error, artifact paths)]
+        self.artifacts = [path for _, _, paths in failures for path in paths]  # linked in the HTML report
+        lines = [f"{len(failures)} of {total} branches failed"]
+        for name, error, paths in failures:
+            lines.append(f"[{name}] {type(error).__name__}: {error}")
+            lines.extend(f"    {path}" for path in paths)
+        super().__init__("\n".join(lines))
+
+
+class AsyncBrowser:
+    """An async Playwright browser on its own thread and event loop, launched on first use."""
+
+    def __init__(self, browser_name="chromium", launch_args=None):
+        self.browser_name = browser_name
+        self.launch_args = dict(launch_args or {})
+        self.playwright = None
+        self.browser = None
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, name="branches", daemon=True)
+        self.thread.start()
+
+    def run(self, coroutine, timeout=None):
+        """Run `coroutine` on the browser's loop and wait for its result.
+
+        On timeout the coroutine is cancelled and given CANCEL_TIMEOUT to run its
+        cleanup (closing contexts) before the TimeoutError is raised.
+        """
+        finished = threading.Event()
+        future = asyncio.run_coroutine_threadsafe(self._signal(coroutine, finished), self.loop)
+        try:
+            return future.result(timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            finished.wait(CANCEL_TIMEOUT)
+            raise
+
+    @staticmethod
+    async def _signal(coroutine, finished):
+        # the concurrent future is done as soon as it is cancelled; this tells when cleanup is
+        try:
+            return await coroutine
+        finally:
+            finished.set()
+
+    async def get(self):
+        if self.browser is None:
+            from playwright.async_api import async_playwright
+
+            self.playwright = await async_playwright().start()
+            self.browser = await getattr(self.playwright, self.browser_name).launch(**self.launch_args)
+        return self.browser
+
+    def close(self):
+        if self.browser is not None:
+            self.run(self._shutdown(), timeout=30)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(timeout=5)
+
+    async def _shutdown(self):
+        await self.browser.close()
+        await self.playwright.stop()
+        self.browser = self.playwright = None
+
+
+class Branch:
+
+    def __init__(self, name, function, user_key=None, device=None, context_args=None):
+        self.name = name
+        self.function = function
+        self.user_key = user_key
+        self.device = device
+        self.context_args = context_args or {}
+
+
+class ParallelBranches:
+    """Branches declared by one test, run together by run()."""
+
+    def __init__(self, async_browser, auth_state_cache, get_sync_browser=None, context_hooks=(),
+                 artifact_dir=None, timeout=BRANCH_TIMEOUT):
+        self.async_browser = async_browser
+        self.auth_state_cache = auth_state_cache
+        # only needed when the saved states come from the login form
+        self.get_sync_browser = get_sync_browser
+        self.context_hooks = list(context_hooks)  # async: `await hook(context)`
+        self.artifact_dir = artifact_dir
+        self.timeout = timeout
+        self.branches = []
+        self.durations = {}  # branch name -> seconds, after run()
+
+    def branch(self, name=None, user=None, device=None, **context_args):
+        """Decorator declaring `async def branch(page)`; context_args go to browser.new_context()."""
+        def register(function):
+            self.branches.append(Branch(name or function.__name__, function, user, device, context_args))
+            return function
+        return register
+
+    def run(self):
+        """Run all declared branches concurrently; raise BranchFailure if any failed."""
+        branches, self.branches = self.branches, []
+        if not branches:
+            return
+        if self.artifact_dir is not None:
+            # only the branch files of an earlier run; the artifact recorder clears its own
+            for stale in self.artifact_dir.glob("branch-*"):
+                stale.unlink()
+        states = {}
+        for branch in branches:
+            if branch.user_key and branch.user_key not in states:
+                note_tenant(branch.user_key)
+                browser = None
+                if self.auth_state_cache.login_mode == "ui" and self.get_sync_browser is not None:
+                    browser = self.get_sync_browser()
+                states[branch.user_key] = str(self.auth_state_cache.get(browser, branch.user_key))
+
+        try:
+            results = self.async_browser.run(self._run_all(branches, states), timeout=self.timeout)
+        except concurrent.futures.TimeoutError:
+            names = ", ".join(branch.name for branch in branches)
+            raise BranchTimeout(f"Branches {names} did not finish within {self.timeout}s and were cancelled") from None
+        failures = []
+        for branch, (error, paths, elapsed) in zip(branches, results):
+            self.durations[branch.name] = elapsed
+            if error is not None:
+                failures.append((branch.name, error, paths))
+        if failures:
+            raise BranchFailure(failures, len(branches)) from failures[0][1]
+
+    async def _run_all(self, branches, states):
+        browser = await self.async_browser.get()
+        return await asyncio.gather(*(self._run_one(browser, branch, states) for branch in branches))
+
+    async def _run_one(self, browser, branch, states):
+        start = time.perf_counter()
+        context_args = dict(branch.context_args)
+        if branch.device:
+            context_args = {**self.async_browser.playwright.devices[branch.device], **context_args}
+        if branch.user_key:
+            context_args["storage_state"] = states[branch.user_key]
+        context = None
+        try:
+            context = await browser.new_context(**context_args)
+            for hook in self.context_hooks:
+                await hook(context)
+            if self.artifact_dir is not None:
+                await context.tracing.start(
+                    screenshots=ARTIFACT_TRACE_SNAPSHOTS, snapshots=ARTIFACT_TRACE_SNAPSHOTS, sources=False
+                )
+            page = await context.new_page()
+            try:
+                await branch.function(page)
+            except Exception as error:
+                paths = await self._keep_artifacts(context, page, branch.name)
+                return error, paths, time.perf_counter() - start
+            if self.artifact_dir is not None:
+                await context.tracing.stop()
+            return None, [], time.perf_counter() - start
+        except Exception as error:
+            # the context itself could not be set up
+            return error, [], time.perf_counter() - start
+        finally:
+            if context is not None:
+                await context.close()
+
+    async def _keep_artifacts(self, context, page, name):
+        if self.artifact_dir is None:
+            return []
+        self.artifact_dir.mkdir(parents=True, exist_ok=True)
+        screenshot = self.artifact_dir / f"branch-{name}.jpg"
+        trace = self.artifact_dir / f"branch-{name}-trace.zip"
+        paths = []
+        try:
+            await page.screenshot(path=screenshot, type="jpeg", quality=ARTIFACT_SCREENSHOT_QUALITY)
+            paths.append(screenshot)
+        except Exception:
+            pass  # closed or crashed page; the branch error says why
+        try:
+            await context.tracing.stop(path=trace)
+            paths.append(trace)
+        except Exception:
+            pass
+        return paths
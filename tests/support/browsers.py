@@ -0,0 +1,99 @@
+"""Load pytest-playwright (and with it Playwright) only for runs that can use a browser.
+
+pytest.ini blocks the plugin with `-p no:playwright`; while the root conftest is
+loaded, before the command line is parsed, this plugin decides from the test
+paths whether the run can reach a browser test and loads pytest-playwright back
+if so. Runs that only name paths under BROWSERLESS_PATHS never import
+Playwright, and the harness modules keep their own Playwright imports inside
+the code that drives a browser.
+
+    pytest tests/api/ tests/unit/   # no Playwright, no browser
+    pytest                      # everything, browsers on demand as before
+    BROWSERS=on pytest tests/api/test_x.py --headed   # force either way (on, off, auto)
+
+Browsers themselves are still launched on first use by the `browser` and
+`async_browser` fixtures. `playwright_browser` in pytest.ini picks the browser
+when --browser isn't given.
+"""
+import os
+from pathlib import Path
+
+import pytest
+
+
+BROWSERS = os.getenv("BROWSERS", "auto")  # auto, on or off
+BROWSERLESS_PATHS = ("tests/api", "tests/unit")
+
+PLAYWRIGHT_PLUGIN = "playwright"
+# pytest-playwright's command line options; passing one asks for the plugin
+PLAYWRIGHT_OPTIONS = (
+    "--browser", "--headed", "--browser-channel", "--slowmo", "--device", "--output",
+    "--tracing", "--video", "--screenshot", "--full-page-screenshot",
+)
+# fixtures that can only come from a browser
+BROWSER_FIXTURES = (
+    "browser", "context", "page", "async_browser", "context_pool", "tenant_context", "parallel_branches",
+)
+
+
+def wants_browsers(config, mode=BROWSERS):
+    """(needed, why) for this invocation, from the test paths and options it names."""
+    if mode in ("on", "off"):
+        return mode == "on", f"BROWSERS={mode}"
+    args = [str(arg) for arg in config.invocation_params.args]
+    named = [arg for arg in args if arg.split("=")[0] in PLAYWRIGHT_OPTIONS]
+    if named:
+        return True, f"{named[0].split('=')[0]} given"
+    paths = [arg.split("::")[0] for arg in config.known_args_namespace.file_or_dir or ()]
+    if not paths:
+        return True, "all tests selected"
+    rootpath = config.rootpath.resolve()
+    browserless = [(rootpath / path).resolve() for path in BROWSERLESS_PATHS]
+    for path in paths:
+        resolved = (config.invocation_params.dir / path).resolve()
+        if not any(resolved == root or root in resolved.parents for root in browserless):
+            return True, f"{path} may need a browser"
+    return False, f"only {', '.join(BROWSERLESS_PATHS)} selected"
+
+
+def browsers_enabled(config):
+    return config.pluginmanager.has_plugin(PLAYWRIGHT_PLUGIN)
+
+
+# -----------------------------
+# pytest plugin
+# -----------------------------
+
+def pytest_addoption(parser, pluginmanager):
+    parser.addini("playwright_browser", "browser to run in when --browser isn't given", default="chromium")
+    # runs while the root conftest loads: after pytest-playwright would have been loaded, before its
+    # options are needed to parse the command line
+    config = pluginmanager.get_plugin("pytestconfig")
+    needed, why = wants_browsers(config)
+    config._browsers_reason = why
+    if pluginmanager.has_plugin(PLAYWRIGHT_PLUGIN):
+        if not needed:
+            config._browsers_reason = "pytest-playwright loaded with -p"
+    elif needed:
+        pluginmanager.consider_pluginarg(PLAYWRIGHT_PLUGIN)
+
+
+def pytest_configure(config):
+    if browsers_enabled(config) and not config.option.browser:
+        config.option.browser = [config.getini("playwright_browser")]
+
+
+def pytest_collection_modifyitems(config, items):
+    if browsers_enabled(config):
+        return
+    needing = [item.nodeid for item in items if set(BROWSER_FIXTURES) & set(item.fixturenames)]
+    if needing:
+        raise pytest.UsageError(
+            f"Browsers are off ({config._browsers_reason}) but these tests need one; "
+            f"run them with BROWSERS=on:\n  " + "\n  ".join(needing[:10])
+        )
+
+
+def pytest_report_header(config):
+    state = "on" if browsers_enabled(config) else "off"
+    return f"browsers: {state} ({config._browsers_reason})"
@@ -0,0 +1,166 @@
+"""One place for test data and environment settings.
+
+test_data.json is parsed once per process and handed out as a frozen, validated
+Config for one environment profile (`--env staging|qa`, or WORKFLOWPRO_ENV).
+`.env` at the repo root is loaded into the environment on import, without
+overriding variables that are already set; see .env.example for what can be set.
+
+Precedence for URLs: BASE_URL / API_BASE_URL from the environment (or .env),
+then the selected profile in base_urls.
+"""
+import json
+import os
+from functools import cached_property, lru_cache
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+
+ROOT_DIR = Path(__file__).parent.parent.parent
+TEST_DATA_PATH = ROOT_DIR / "tests" / "data" / "test_data.json"
+ENV_FILE = ROOT_DIR / ".env"
+
+DEFAULT_ENV = "staging"
+
+CONNECTION_TIMEOUT = 5  # seconds for initial connection (health checks use it for reads too)
+READ_TIMEOUT = 30  # seconds for reading response
+
+# env overrides for the users in test_data.json (see .env.example)
+USER_ENV_PREFIXES = {
+    "tenant_a_admin": "TENANT_A_USER",
+    "tenant_b_admin": "TENANT_B_USER",
+}
+
+REQUIRED_ENDPOINTS = {
+    "auth": ("login", "logout", "verify_2fa"),
+    "projects": ("list", "create", "get", "update", "delete"),
+}
+REQUIRED_USER_FIELDS = ("email", "password", "tenant_id")
+
+load_dotenv(ENV_FILE, override=False)
+
+
+class ConfigError(ValueError):
+    pass
+
+
+class FrozenDict(dict):
+    """A dict that refuses changes; still a dict for json.dumps and isinstance checks."""
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("test data is read-only; copy it with dict(...) first")
+
+    __setitem__ = __delitem__ = __ior__ = clear = pop = popitem = setdefault = update = _readonly
+
+
+def freeze(value):
+    if isinstance(value, dict):
+        return FrozenDict({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+@lru_cache(maxsize=None)
+def _read_test_data(path=TEST_DATA_PATH):
+    if not Path(path).exists():
+        raise ConfigError(f"Missing test data file: {path}")
+    with open(path) as f:
+        return freeze(json.load(f))
+
+
+def resolve_user(test_data, user_key):
+    """Return the test user entry, with email/password taken from env when set."""
+    user = dict(test_data["test_users"][user_key])
+    prefix = USER_ENV_PREFIXES.get(user_key)
+    if prefix:
+        email = os.getenv(f"{prefix}_EMAIL")
+        password = os.getenv(f"{prefix}_PASSWORD")
+        if email and password:
+            user["email"] = email
+            user["password"] = password
+    return user
+
+
+class Config:
+    """Frozen view of test_data.json for one environment profile.
+
+    Slices (users, selectors, endpoints, ...) are looked up on first use; the
+    object itself can't be changed once built.
+    """
+
+    def __init__(self, data, env, base_url, api_base_url):
+        object.__setattr__(self, "data", data)
+        object.__setattr__(self, "env", env)
+        object.__setattr__(self, "base_url", base_url)
+        object.__setattr__(self, "api_base_url", api_base_url)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Config is read-only")
+
+    @cached_property
+    def users(self):
+        return self.data["test_users"]
+
+    @cached_property
+    def endpoints(self):
+        return self.data["api_endpoints"]
+
+    @cached_property
+    def selectors(self):
+        return self.data["ui_selectors"]
+
+    @cached_property
+    def projects(self):
+        return self.data.get("test_projects", FrozenDict())
+
+    @cached_property
+    def timeouts(self):
+        return self.data.get("timeouts", FrozenDict())
+
+    def user(self, user_key):
+        return resolve_user(self.data, user_key)
+
+    def __repr__(self):
+        return f"Config(env={self.env!r}, base_url={self.base_url!r}, api_base_url={self.api_base_url!r})"
+
+
+def validate(data, env):
+    profiles = data.get("base_urls", {})
+    if env not in profiles:
+        raise ConfigError(f"Unknown environment {env!r}; test_data.json has {sorted(profiles)}")
+    for key in ("web", "api"):
+        if not profiles[env].get(key):
+            raise ConfigError(f"base_urls.{env}.{key} is missing in test_data.json")
+    for user_key, user in data.get("test_users", {}).items():
+        missing = [field for field in REQUIRED_USER_FIELDS if not user.get(field)]
+        if missing:
+            raise ConfigError(f"test_users.{user_key} is missing {', '.join(missing)}")
+    endpoints = data.get("api_endpoints", {})
+    for group, names in REQUIRED_ENDPOINTS.items():
+        missing = [name for name in names if name not in endpoints.get(group, {})]
+        if missing:
+            raise ConfigError(f"api_endpoints.{group} is missing {', '.join(missing)}")
+
+
+def load_config(env=None):
+    """Config for `env` (default WORKFLOWPRO_ENV or staging), built once per process.
+
+    BASE_URL / API_BASE_URL are part of the cache key, so pointing them at the
+    local stand-in after the first call gives a matching Config.
+    """
+    env = env or os.getenv("WORKFLOWPRO_ENV", DEFAULT_ENV)
+    return _load_config(env, os.getenv("BASE_URL"), os.getenv("API_BASE_URL"))
+
+
+@lru_cache(maxsize=None)
+def _load_config(env, base_url_override, api_base_url_override):
+    data = _read_test_data()
+    validate(data, env)
+    profile = data["base_urls"][env]
+    return Config(
+        data,
+        env,
+        base_url=base_url_override or profile["web"],
+        api_base_url=api_base_url_override or profile["api"],
+    )
@@ -0,0 +1,120 @@
+import json
+import os
+from collections import OrderedDict
+from typing import TYPE_CHECKING
+
+from tests.support.scheduling import note_tenant
+
+if TYPE_CHECKING:
+    from playwright.sync_api import Browser, BrowserContext
+
+
+# warm contexts kept per machine; split between the xdist workers
+CONTEXT_POOL_BUDGET = int(os.getenv("CONTEXT_POOL_BUDGET", "12"))
+
+RESET_STORAGE_SCRIPT = "() => { try { localStorage.clear(); sessionStorage.clear(); } catch (e) {} }"
+
+# puts a saved login's localStorage back after a reset cleared it
+SEED_STORAGE_SCRIPT = """(() => {
+    const saved = %s[location.origin];
+    if (!saved) return;
+    for (const item of saved) {
+        if (localStorage.getItem(item.name) === null) localStorage.setItem(item.name, item.value);
+    }
+})();"""
+
+
+def idle_limit_per_worker():
+    workers = int(os.getenv("PYTEST_XDIST_WORKER_COUNT", "1"))
+    return max(2, CONTEXT_POOL_BUDGET // workers)
+
+
+class ContextPool:
+    """Warm browser contexts per (user, context options) key, leased to tests.
+
+    On release a context is reset instead of closed: extra pages are closed, the
+    first page goes back to about:blank with storage cleared, cookies are reset
+    to the user's saved login (or none) and granted permissions are revoked.
+    """
+
+    def __init__(self, browser: "Browser", auth_state_cache=None, max_idle=None, context_hooks=()):
+        self.browser = browser
+        self.auth_state_cache = auth_state_cache
+        self.context_hooks = list(context_hooks)
+        self.max_idle = max_idle or idle_limit_per_worker()
+        self.idle = OrderedDict()  # context -> key, least recently used first
+        self.leased = {}
+        self.created = 0
+        self.reused = 0
+
+    def lease(self, user_key=None, **context_args) -> "BrowserContext":
+        if user_key:
+            note_tenant(user_key)
+        key = (user_key, json.dumps(context_args, sort_keys=True, default=str))
+        for context, idle_key in self.idle.items():
+            if idle_key == key:
+                del self.idle[context]
+                self.reused += 1
+                break
+        else:
+            context = self._create(user_key, context_args)
+        self.leased[context] = key
+        return context
+
+    def release(self, context: "BrowserContext"):
+        key = self.leased.pop(context, None)
+        if key is None:
+            return
+        try:
+            self._reset(context, key[0])
+        except Exception:
+            # closed by the test or broken page; not worth keeping
+            self._close(context)
+            return
+        self.idle[context] = key
+        while len(self.idle) > self.max_idle:
+            oldest, _ = self.idle.popitem(last=False)
+            self._close(oldest)
+
+    def close(self):
+        for context in list(self.idle) + list(self.leased):
+            self._close(context)
+        self.idle.clear()
+        self.leased.clear()
+
+    def _create(self, user_key, context_args):
+        state = None
+        if user_key:
+            state_path = self.auth_state_cache.get(self.browser, user_key)
+            state = json.loads(state_path.read_text())
+            context_args = {**context_args, "storage_state": state}
+        context = self.browser.new_context(**context_args)
+        for hook in self.context_hooks:
+            hook(context)
+        if state and state.get("origins"):
+            saved = {o["origin"]: o.get("localStorage", []) for o in state["origins"]}
+            context.add_init_script(script=SEED_STORAGE_SCRIPT % json.dumps(saved))
+        context.new_page()
+        self.created += 1
+        return context
+
+    def _reset(self, context, user_key):
+        pages = context.pages
+        for page in pages[1:]:
+            page.close()
+        if pages:
+            pages[0].evaluate(RESET_STORAGE_SCRIPT)
+            pages[0].goto("about:blank")
+        else:
+            context.new_page()
+        context.clear_cookies()
+        if user_key:
+            state_path = self.auth_state_cache.get(self.browser, user_key)
+            context.add_cookies(json.loads(state_path.read_text())["cookies"])
+        context.clear_permissions()
+
+    def _close(self, context):
+        try:
+            context.close()
+        except Exception:
+            pass
@@ -0,0 +1,563 @@
+"""Record browser and API traffic into per-test HAR archives, then replay it offline.
+
+    pytest --har=record tests/ui tests/integration     # live run, writes .cache/har/
+    pytest --har=replay tests/ui tests/integration     # no backend needed
+
+The mode applies to tests carrying one of the `--har-markers` (ui, integration by
+default); `@pytest.mark.har("replay")` or `@pytest.mark.har("off")` overrides it
+for a single test. Recording covers every browser context (including pooled,
+login and parallel branch contexts) and every request sent through `requests`,
+so the API calls an integration test makes are replayed too. Session-wide work
+(cached logins, pre-flight probes, project pool fills) goes to one shared
+session.har instead of the archive of whichever test set it off.
+
+Credentials never reach an archive: Authorization, Cookie and Set-Cookie values
+and password, one-time code and token fields in bodies are recorded as
+"[redacted]", and replayed requests are redacted the same way before matching.
+
+Replay matches requests exactly first, then with generated values (timestamps,
+UUIDs, one-time codes) masked, then by method and URL alone. When a masked match
+pairs a recorded value with a new one, e.g. IntegrationTest_1700000000 with
+IntegrationTest_1800000000, later responses in that test get the new value.
+Requests with no recorded match fail and are reported, so stale archives show up.
+"""
+import base64
+import json
+import os
+import re
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import pytest
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+from tests.support.locking import atomic_write_text
+from tests.support.session_scope import in_session_scope
+
+
+HAR_DIR = Path(os.getenv("HAR_DIR", Path(__file__).parent.parent.parent / ".cache" / "har"))
+SESSION_ARCHIVE = HAR_DIR / "session.har"
+SESSION_PARTS_DIR = HAR_DIR / "session"  # one part per xdist worker, merged by the controller
+HAR_REPORT_DIR = Path(__file__).parent.parent.parent / "reports" / "har"
+
+# values that change between runs: UUIDs and long digit runs (timestamps, TOTP codes)
+DYNAMIC_VALUE = re.compile(r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}|\d{6,}", re.I)
+MASK = "{}"
+# bodies are stored decoded, so these would no longer be true on replay
+DROPPED_RESPONSE_HEADERS = ("content-encoding", "content-length", "transfer-encoding")
+REDACTED = "[redacted]"
+REDACTED_HEADERS = ("authorization", "proxy-authorization", "cookie", "set-cookie")
+# login and verify-2fa bodies, and the tokens they hand back
+REDACTED_FIELDS = ("password", "code", "challenge_token", "token", "access_token", "refresh_token", "totp_secret")
+
+
+def _canonical_url(url):
+    parts = urlsplit(url)
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((parts.scheme, parts.netloc, parts.path, query, ""))
+
+
+def _text(body):
+    if body is None:
+        return ""
+    if isinstance(body, bytes):
+        return body.decode("utf-8", errors="replace")
+    return body
+
+
+def _encode_content(body, mime_type):
+    content = {"size": len(body), "mimeType": mime_type}
+    try:
+        content["text"] = body.decode("utf-8")
+    except UnicodeDecodeError:
+        content["text"] = base64.b64encode(body).decode("ascii")
+        content["encoding"] = "base64"
+    return content
+
+
+def _decode_content(content):
+    text = content.get("text", "")
+    if content.get("encoding") == "base64":
+        return base64.b64decode(text), False
+    return text.encode("utf-8"), True
+
+
+def _header_list(headers):
+    return [
+        {"name": name, "value": REDACTED if name.lower() in REDACTED_HEADERS else value}
+        for name, value in headers.items()
+    ]
+
+
+def _redact_fields(value):
+    if isinstance(value, dict):
+        return {
+            key: REDACTED if key in REDACTED_FIELDS and item is not None else _redact_fields(item)
+            for key, item in value.items()
+        }
+    if isinstance(value, list):
+        return [_redact_fields(item) for item in value]
+    return value
+
+
+def redact_body(body):
+    """`body` as text with REDACTED_FIELDS blanked, in JSON or form-encoded bodies."""
+    text = _text(body)
+    try:
+        data = json.loads(text)
+    except ValueError:
+        data = None
+    if isinstance(data, (dict, list)):
+        redacted = _redact_fields(data)
+        return json.dumps(redacted) if redacted != data else text
+    if "=" in text and not text.lstrip().startswith("<"):
+        try:
+            pairs = parse_qsl(text, keep_blank_values=True, strict_parsing=True)
+        except ValueError:
+            return text
+        if any(key in REDACTED_FIELDS for key, _ in pairs):
+            return urlencode([(key, REDACTED if key in REDACTED_FIELDS else value) for key, value in pairs])
+    return text
+
+
+def archive_path(nodeid):
+    """tests/ui/login_test.py::TestX::test_y -> <HAR_DIR>/ui/login_test/TestX.test_y.har"""
+    path, _, name = nodeid.partition("::")
+    module = Path(path).with_suffix("")
+    if module.parts and module.parts[0] == "tests":
+        module = Path(*module.parts[1:])
+    name = re.sub(r"[^\w.\-\[\]]", "_", name.replace("::", "."))
+    return HAR_DIR / module / f"{name}.har"
+
+
+class HarRecorder:
+
+    def __init__(self):
+        self.entries = []
+        self.lock = threading.Lock()
+
+    def _add(self, source, method, url, request_headers, post_data, status, status_text,
+             response_headers, body, elapsed_ms=0, failure=None):
+        request = {
+            "method": method,
+            "url": url,
+            "httpVersion": "HTTP/1.1",
+            "headers": _header_list(request_headers),
+            "queryString": [{"name": k, "value": v} for k, v in parse_qsl(urlsplit(url).query)],
+            "cookies": [],
+            "headersSize": -1,
+            "bodySize": len(post_data or ""),
+        }
+        if post_data:
+            request["postData"] = {
+                "mimeType": request_headers.get("content-type", ""),
+                "text": redact_body(post_data),
+            }
+        response = {
+            "status": status,
+            "statusText": status_text,
+            "httpVersion": "HTTP/1.1",
+            "headers": _header_list(response_headers),
+            "cookies": [],
+            "content": _encode_content(self._redact_content(body), response_headers.get("content-type", "")),
+            "redirectURL": response_headers.get("location", ""),
+            "headersSize": -1,
+            "bodySize": len(body),
+        }
+        if failure:
+            response["_failureText"] = failure
+        entry = {
+            "startedDateTime": datetime.now(timezone.utc).isoformat(),
+            "time": elapsed_ms,
+            "request": request,
+            "response": response,
+            "cache": {},
+            "timings": {"send": 0, "wait": elapsed_ms, "receive": 0},
+            "_source": source,
+        }
+        with self.lock:
+            self.entries.append(entry)
+
+    @staticmethod
+    def _redact_content(body):
+        try:
+            text = body.decode("utf-8")
+        except UnicodeDecodeError:
+            return body
+        return redact_body(text).encode("utf-8")
+
+    def add_browser_request(self, request):
+        response = request.response()
+        if response is None:
+            return
+        try:
+            body = response.body()
+        except Exception:
+            body = b""  # redirects and aborted navigations have no body
+        self._add("browser", request.method, request.url, request.headers, request.post_data,
+                  response.status, response.status_text, response.headers, body,
+                  elapsed_ms=request.timing.get("responseEnd", 0))
+
+    async def add_browser_request_async(self, request):
+        response = await request.response()
+        if response is None:
+            return
+        try:
+            body = await response.body()
+        except Exception:
+            body = b""
+        self._add("browser", request.method, request.url, request.headers, request.post_data,
+                  response.status, response.status_text, response.headers, body,
+                  elapsed_ms=request.timing.get("responseEnd", 0))
+
+    def add_browser_failure(self, request):
+        self._add("browser", request.method, request.url, request.headers, request.post_data,
+                  0, "", {}, b"", failure=request.failure or "failed")
+
+    def add_http_response(self, prepared, response):
+        self._add("python", prepared.method, prepared.url, prepared.headers, prepared.body,
+                  response.status_code, response.reason or "", response.headers, response.content,
+                  elapsed_ms=response.elapsed.total_seconds() * 1000)
+
+    def save(self, path):
+        atomic_write_text(path, json.dumps({"log": {
+            "version": "1.2",
+            "creator": {"name": "workflow-pro-automation", "version": "1.0"},
+            "pages": [],
+            "entries": self.entries,
+        }}, indent=1))
+
+
+class HarReplayer:
+    """Serves recorded responses, matching each request as closely as the archive allows."""
+
+    def __init__(self, entries):
+        self.entries = entries
+        self.used = set()
+        self.substitutions = {}
+        self.unmatched = []
+        self.lock = threading.Lock()
+        self.exact, self.masked, self.loose = {}, {}, {}
+        for index, entry in enumerate(entries):
+            method, url, body = self._request_key(entry["request"])
+            self.exact.setdefault((method, url, body), []).append(index)
+            self.masked.setdefault((method, DYNAMIC_VALUE.sub(MASK, url), DYNAMIC_VALUE.sub(MASK, body)), []).append(index)
+            self.loose.setdefault((method, DYNAMIC_VALUE.sub(MASK, url)), []).append(index)
+
+    @classmethod
+    def load(cls, path):
+        return cls(json.loads(Path(path).read_text())["log"]["entries"])
+
+    @staticmethod
+    def _request_key(request):
+        return (
+            request["method"],
+            _canonical_url(request["url"]),
+            request.get("postData", {}).get("text", ""),
+        )
+
+    def _pick(self, candidates):
+        # recorded order first; repeated polling past the end keeps getting the last answer
+        for index in candidates:
+            if index not in self.used:
+                self.used.add(index)
+                return index
+        return candidates[-1]
+
+    def match(self, method, url, body, source=""):
+        url, body = _canonical_url(url), redact_body(body)
+        for recorded, actual in self.substitutions.items():
+            # values learned earlier in this test, e.g. a project name created via the API
+            url, body = url.replace(actual, recorded), body.replace(actual, recorded)
+        masked_url = DYNAMIC_VALUE.sub(MASK, url)
+        with self.lock:
+            candidates = (
+                self.exact.get((method, url, body))
+                or self.masked.get((method, masked_url, DYNAMIC_VALUE.sub(MASK, body)))
+                or self.loose.get((method, masked_url))
+            )
+            if not candidates:
+                self.unmatched.append(f"{source} {method} {url}".strip())
+                return None
+            entry = self.entries[self._pick(candidates)]
+            self._learn(entry["request"], url + body)
+            return entry
+
+    def _learn(self, request, actual):
+        method, url, body = self._request_key(request)
+        recorded_values = DYNAMIC_VALUE.findall(url + body)
+        actual_values = DYNAMIC_VALUE.findall(actual)
+        if len(recorded_values) != len(actual_values):
+            return
+        for recorded, value in zip(recorded_values, actual_values):
+            if recorded != value:
+                self.substitutions[recorded] = value
+
+    def response(self, entry):
+        """(status, headers, body) with learned values substituted into text bodies."""
+        response = entry["response"]
+        body, is_text = _decode_content(response["content"])
+        headers = {
+            h["name"]: h["value"] for h in response["headers"]
+            if h["name"].lower() not in DROPPED_RESPONSE_HEADERS
+        }
+        if is_text and self.substitutions:
+            text = body.decode("utf-8")
+            for recorded, actual in self.substitutions.items():
+                text = text.replace(recorded, actual)
+            body = text.encode("utf-8")
+        return response["status"], headers, body
+
+
+class HarSession:
+    """Dispatches browser routes and `requests` traffic to the running test's recorder or replayer.
+
+    Traffic inside session_scope() goes to `shared`, the session archive's
+    recorder or replayer, instead.
+    """
+
+    def __init__(self):
+        self.current = None
+        self.shared = None
+        self._original_send = None
+
+    def target(self):
+        return self.shared if in_session_scope() else self.current
+
+    def attach(self, context):
+        context.route("**/*", self._route)
+        context.on("requestfinished", self._request_finished)
+        context.on("requestfailed", self._request_failed)
+
+    async def attach_async(self, context):
+        """attach() for async API contexts (parallel branches)."""
+        await context.route("**/*", self._route_async)
+        context.on("requestfinished", self._request_finished_async)
+        context.on("requestfailed", self._request_failed)
+
+    def install(self):
+        if self._original_send is not None:
+            return
+        original = self._original_send = HTTPAdapter.send
+        session = self
+
+        def send(adapter, request, *args, **kwargs):
+            current = session.target()
+            if isinstance(current, HarReplayer):
+                return session._replay_http(current, request)
+            response = original(adapter, request, *args, **kwargs)
+            if isinstance(current, HarRecorder):
+                current.add_http_response(request, response)
+            return response
+
+        HTTPAdapter.send = send
+
+    def uninstall(self):
+        if self._original_send is not None:
+            HTTPAdapter.send = self._original_send
+            self._original_send = None
+
+    def _route(self, route, request):
+        replayer = self.target()
+        if not isinstance(replayer, HarReplayer) or not request.url.startswith("http"):
+            return route.fallback()
+        entry = replayer.match(request.method, request.url, request.post_data, source=request.resource_type)
+        if entry is None or entry["response"]["status"] == 0:
+            return route.abort()
+        status, headers, body = replayer.response(entry)
+        route.fulfill(status=status, headers=headers, body=body)
+
+    async def _route_async(self, route, request):
+        replayer = self.target()
+        if not isinstance(replayer, HarReplayer) or not request.url.startswith("http"):
+            return await route.fallback()
+        entry = replayer.match(request.method, request.url, request.post_data, source=request.resource_type)
+        if entry is None or entry["response"]["status"] == 0:
+            return await route.abort()
+        status, headers, body = replayer.response(entry)
+        await route.fulfill(status=status, headers=headers, body=body)
+
+    def _request_finished(self, request):
+        recorder = self.target()
+        if isinstance(recorder, HarRecorder):
+            recorder.add_browser_request(request)
+
+    async def _request_finished_async(self, request):
+        recorder = self.target()
+        if isinstance(recorder, HarRecorder):
+            await recorder.add_browser_request_async(request)
+
+    def _request_failed(self, request):
+        recorder = self.target()
+        if isinstance(recorder, HarRecorder):
+            recorder.add_browser_failure(request)
+
+    def _replay_http(self, replayer, request):
+        entry = replayer.match(request.method, request.url, request.body, source="api")
+        if entry is None:
+            raise requests.exceptions.ConnectionError(
+                f"No recorded HAR response for {request.method} {request.url}", request=request
+            )
+        status, headers, body = replayer.response(entry)
+        response = requests.Response()
+        response.status_code = status
+        response.reason = entry["response"].get("statusText", "")
+        response.headers = CaseInsensitiveDict(headers)
+        response._content = body
+        response._content_consumed = True  # iter_content() and close() use _content, there is no raw stream
+        response.url = request.url
+        response.request = request
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+        return response
+
+
+HAR = HarSession()
+
+
+def har_mode(item):
+    """Mode for a test: its `har` marker, else --har if it has one of --har-markers."""
+    marker = item.get_closest_marker("har")
+    if marker is not None:
+        return marker.args[0] if marker.args else item.config.getoption("--har")
+    markers = [m.strip() for m in item.config.getoption("--har-markers").split(",") if m.strip()]
+    if any(item.get_closest_marker(name) for name in markers):
+        return item.config.getoption("--har")
+    return "off"
+
+
+# -----------------------------
+# pytest plugin
+# -----------------------------
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--har",
+        choices=("off", "record", "replay"),
+        default=os.getenv("HAR_MODE", "off"),
+        help="record network traffic into HAR archives, or replay it without a backend",
+    )
+    parser.addoption(
+        "--har-markers",
+        default=os.getenv("HAR_MARKERS", "ui,integration"),
+        help="comma separated markers of the tests --har applies to",
+    )
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "har(mode): record, replay or off for this test's network traffic")
+    config._har_enabled = False
+    config._har_report = None
+    if not hasattr(config, "workerinput"):
+        for stale in [*HAR_REPORT_DIR.glob("*.json"), *SESSION_PARTS_DIR.glob("*.har")]:
+            stale.unlink()
+
+
+def pytest_collection_modifyitems(config, items):
+    modes = {har_mode(item) for item in items}
+    config._har_enabled = bool(modes - {"off"})
+    if config._har_enabled:
+        HAR.install()
+    if "record" in modes:
+        HAR.shared = HarRecorder()
+    elif "replay" in modes and SESSION_ARCHIVE.exists():
+        HAR.shared = HarReplayer.load(SESSION_ARCHIVE)
+
+
+def pytest_unconfigure(config):
+    HAR.uninstall()
+
+
+@pytest.fixture(scope="session")
+def har_session(request):
+    """HAR dispatcher to attach to new browser contexts, or None when no test uses it."""
+    return HAR if request.config._har_enabled else None
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_runtest_setup(item):
+    mode = har_mode(item)
+    if mode == "record":
+        HAR.current = HarRecorder()
+    elif mode == "replay":
+        path = archive_path(item.nodeid)
+        if not path.exists():
+            pytest.skip(f"no HAR archive at {path}; record it with --har=record")
+        HAR.current = HarReplayer.load(path)
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_protocol(item, nextitem):
+    yield
+    current, HAR.current = HAR.current, None
+    if current is None:
+        return
+    results = getattr(item.config, "_har_results", None)
+    if results is None:
+        results = item.config._har_results = {}
+    if isinstance(current, HarRecorder):
+        current.save(archive_path(item.nodeid))
+        results[item.nodeid] = {"mode": "record", "entries": len(current.entries)}
+    else:
+        results[item.nodeid] = {
+            "mode": "replay",
+            "unmatched": current.unmatched,
+            "substitutions": current.substitutions,
+        }
+
+
+def pytest_sessionfinish(session):
+    config = session.config
+    worker = config.workerinput["workerid"] if hasattr(config, "workerinput") else "controller"
+    results = getattr(config, "_har_results", None) or {}
+    shared, HAR.shared = HAR.shared, None
+    if isinstance(shared, HarRecorder) and shared.entries:
+        shared.save(SESSION_PARTS_DIR / f"{worker}.har")
+    elif isinstance(shared, HarReplayer) and shared.unmatched:
+        results[f"{SESSION_ARCHIVE.name} ({worker})"] = {
+            "mode": "replay",
+            "unmatched": shared.unmatched,
+            "substitutions": shared.substitutions,
+        }
+    if results:
+        atomic_write_text(HAR_REPORT_DIR / f"{worker}.json", json.dumps(results))
+    if worker != "controller":
+        return
+    merged = {}
+    for path in sorted(HAR_REPORT_DIR.glob("*.json")):
+        merged.update(json.loads(path.read_text()))
+    parts = sorted(SESSION_PARTS_DIR.glob("*.har"))
+    if parts:
+        recorder = HarRecorder()
+        for part in parts:
+            recorder.entries.extend(json.loads(part.read_text())["log"]["entries"])
+            part.unlink()
+        recorder.save(SESSION_ARCHIVE)
+        merged[SESSION_ARCHIVE.name] = {"mode": "record", "entries": len(recorder.entries)}
+    if merged:
+        atomic_write_text(HAR_REPORT_DIR.parent / "har.json", json.dumps(merged, indent=2))
+        config._har_report = merged
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    report = getattr(config, "_har_report", None)
+    if not report:
+        return
+    recorded = [nodeid for nodeid, result in report.items() if result["mode"] == "record"]
+    stale = {nodeid: result["unmatched"] for nodeid, result in report.items() if result.get("unmatched")}
+    if recorded:
+        terminalreporter.section("HAR archives recorded")
+        for nodeid in recorded:
+            path = SESSION_ARCHIVE if nodeid == SESSION_ARCHIVE.name else archive_path(nodeid)
+            terminalreporter.write_line(f"{report[nodeid]['entries']:5d} entries  {path}")
+    if stale:
+        terminalreporter.section("HAR requests with no recorded match (re-record these)")
+        for nodeid, unmatched in stale.items():
+            terminalreporter.write_line(nodeid)
+            for request in unmatched[:20]:
+                terminalreporter.write_line(f"    {request}")
+            if len(unmatched) > 20:
+                terminalreporter.write_line(f"    ... {len(unmatched) - 20} more")
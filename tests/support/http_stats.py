@@ -0,0 +1,238 @@
+"""Per-endpoint HTTP latency and status statistics for every harness API call.
+
+HttpStats is a WorkflowProClient observer. Requests are grouped by method,
+path template (e.g. /api/projects/{id}) and tenant; each group keeps status
+counts and a log-bucketed latency histogram, so memory stays flat no matter how
+many requests a run makes. Worker stats are merged by the controller into
+reports/http_stats.json and rendered as a table in the pytest-html report.
+Background traffic no test waits for (the project pool's fills and resets) is
+left out.
+"""
+import html
+import json
+import math
+import threading
+from pathlib import Path
+
+import pytest
+
+from tests.support.locking import atomic_write_text
+from tests.support.session_scope import in_background
+
+
+HTTP_STATS_DIR = Path(__file__).parent.parent.parent / "reports" / "http_stats"
+BUCKET_GROWTH = 1.05  # ~2.5% error on reported percentiles
+MIN_LATENCY_MS = 0.1
+
+
+class LatencyHistogram:
+    """Log-bucketed histogram of latencies in milliseconds; mergeable."""
+
+    def __init__(self):
+        self.buckets = {}
+        self.count = 0
+        self.total_ms = 0.0
+        self.min_ms = None
+        self.max_ms = None
+
+    def add(self, ms):
+        index = int(math.log(max(ms, MIN_LATENCY_MS) / MIN_LATENCY_MS, BUCKET_GROWTH))
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+        self.count += 1
+        self.total_ms += ms
+        self.min_ms = ms if self.min_ms is None else min(self.min_ms, ms)
+        self.max_ms = ms if self.max_ms is None else max(self.max_ms, ms)
+
+    def merge(self, other):
+        for index, count in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + count
+        self.count += other.count
+        self.total_ms += other.total_ms
+        for ms in (other.min_ms, other.max_ms):
+            if ms is not None:
+                self.min_ms = ms if self.min_ms is None else min(self.min_ms, ms)
+                self.max_ms = ms if self.max_ms is None else max(self.max_ms, ms)
+
+    def percentile(self, q):
+        if not self.count:
+            return None
+        rank = q / 100 * self.count
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= rank:
+                # geometric middle of the bucket, clamped to what was observed
+                value = MIN_LATENCY_MS * BUCKET_GROWTH ** (index + 0.5)
+                return min(max(value, self.min_ms), self.max_ms)
+        return self.max_ms
+
+    def to_json(self):
+        return {
+            "buckets": {str(k): v for k, v in self.buckets.items()},
+            "count": self.count,
+            "total_ms": self.total_ms,
+            "min_ms": self.min_ms,
+            "max_ms": self.max_ms,
+        }
+
+    @classmethod
+    def from_json(cls, data):
+        histogram = cls()
+        histogram.buckets = {int(k): v for k, v in data["buckets"].items()}
+        histogram.count = data["count"]
+        histogram.total_ms = data["total_ms"]
+        histogram.min_ms = data["min_ms"]
+        histogram.max_ms = data["max_ms"]
+        return histogram
+
+
+class EndpointStats:
+
+    def __init__(self):
+        self.latency = LatencyHistogram()
+        self.statuses = {}
+
+    def merge(self, other):
+        self.latency.merge(other.latency)
+        for status, count in other.statuses.items():
+            self.statuses[status] = self.statuses.get(status, 0) + count
+
+    @property
+    def errors(self):
+        return sum(count for status, count in self.statuses.items() if int(status) >= 500)
+
+    def summary(self, elapsed=None):
+        count = self.latency.count
+        return {
+            "count": count,
+            "throughput_rps": count / elapsed if elapsed else None,
+            "statuses": dict(sorted(self.statuses.items())),
+            "error_rate": self.errors / count if count else 0.0,
+            "mean_ms": self.latency.total_ms / count if count else None,
+            "p50_ms": self.latency.percentile(50),
+            "p95_ms": self.latency.percentile(95),
+            "p99_ms": self.latency.percentile(99),
+            "max_ms": self.latency.max_ms,
+        }
+
+
+class HttpStats:
+    """Client observer: aggregate (method, template, tenant) -> EndpointStats."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.endpoints = {}
+
+    def __call__(self, method, template, tenant_id, response, elapsed_ms):
+        if in_background():
+            return
+        self.add(method, template, tenant_id, response.status_code, elapsed_ms)
+
+    def add(self, method, template, tenant_id, status, elapsed_ms):
+        key = (method, template, tenant_id or "-")
+        with self.lock:
+            stats = self.endpoints.setdefault(key, EndpointStats())
+            stats.latency.add(elapsed_ms)
+            stats.statuses[str(status)] = stats.statuses.get(str(status), 0) + 1
+
+    def merge(self, other):
+        with self.lock:
+            for key, stats in other.endpoints.items():
+                self.endpoints.setdefault(key, EndpointStats()).merge(stats)
+
+    def by_endpoint(self):
+        """Stats per "METHOD template", with tenants folded together."""
+        combined = {}
+        for (method, template, _), stats in self.endpoints.items():
+            combined.setdefault(f"{method} {template}", EndpointStats()).merge(stats)
+        return dict(sorted(combined.items()))
+
+    def summary(self, elapsed=None):
+        return {key: stats.summary(elapsed) for key, stats in self.by_endpoint().items()}
+
+    def to_json(self):
+        return [
+            {
+                "method": method,
+                "template": template,
+                "tenant": tenant,
+                "statuses": stats.statuses,
+                "latency": stats.latency.to_json(),
+            }
+            for (method, template, tenant), stats in self.endpoints.items()
+        ]
+
+    @classmethod
+    def from_json(cls, data):
+        result = cls()
+        for entry in data:
+            stats = EndpointStats()
+            stats.statuses = dict(entry["statuses"])
+            stats.latency = LatencyHistogram.from_json(entry["latency"])
+            result.endpoints[(entry["method"], entry["template"], entry["tenant"])] = stats
+        return result
+
+
+HTTP_STATS = HttpStats()
+
+
+def render_html_table(summary):
+    rows = "".join(
+        "<tr><td>{}</td><td>{}</td><td>{}</td><td>{:.1%}</td><td>{}</td><td>{}</td><td>{}</td><td>{}</td></tr>".format(
+            html.escape(key),
+            s["count"],
+            html.escape(", ".join(f"{k}: {v}" for k, v in s["statuses"].items())),
+            s["error_rate"],
+            *(f"{s[f]:.1f}" if s[f] is not None else "-" for f in ("mean_ms", "p50_ms", "p95_ms", "p99_ms")),
+        )
+        for key, s in summary.items()
+    )
+    return (
+        "<h2>API latency</h2><table id='http-stats'><thead><tr>"
+        "<th>Endpoint</th><th>Requests</th><th>Statuses</th><th>5xx rate</th>"
+        "<th>Mean ms</th><th>p50 ms</th><th>p95 ms</th><th>p99 ms</th>"
+        f"</tr></thead><tbody>{rows}</tbody></table>"
+    )
+
+
+# -----------------------------
+# pytest plugin
+# -----------------------------
+
+def pytest_configure(config):
+    config._http_stats_summary = None
+    if not hasattr(config, "workerinput"):
+        for stale in HTTP_STATS_DIR.glob("*.json"):
+            stale.unlink()
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_sessionfinish(session):
+    # tryfirst: merged before pytest-html renders the report in its own sessionfinish
+    config = session.config
+    if hasattr(config, "workerinput"):
+        atomic_write_text(
+            HTTP_STATS_DIR / f"{config.workerinput['workerid']}.json",
+            json.dumps(HTTP_STATS.to_json()),
+        )
+        return
+
+    merged = HttpStats()
+    merged.merge(HTTP_STATS)
+    for path in sorted(HTTP_STATS_DIR.glob("*.json")):
+        merged.merge(HttpStats.from_json(json.loads(path.read_text())))
+    if not merged.endpoints:
+        return
+    summary = merged.summary()
+    atomic_write_text(HTTP_STATS_DIR.parent / "http_stats.json", json.dumps({
+        "endpoints": summary,
+        "by_tenant": merged.to_json(),
+    }, indent=2))
+    config._http_stats_summary = summary
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_html_results_summary(prefix, summary, postfix, session):
+    stats = session.config._http_stats_summary
+    if stats:
+        postfix.append(render_html_table(stats))
@@ -0,0 +1,191 @@
+"""Cross-tenant isolation matrix: M tenants with N projects each.
+
+Every tenant seeds its N projects at once. Direct access is then probed with a
+GET, PUT and DELETE from every tenant against a sample of `probes_per_pair`
+(PROBES_PER_PAIR by default) projects of every other tenant. The viewers rotate
+over each owner's projects, so with more tenants than projects per tenant every
+project is still probed by someone. Finally each tenant lists its projects once,
+following every page (listing.iter_projects). That one listing answers both
+questions: whether a viewer sees projects other tenants own, and whether an
+owner's project was renamed or removed by someone else, whatever status the
+write returned. Requests go through AsyncWorkflowProClient, so parallelism is
+bounded by its pool.
+
+Requests per run: M·N creates, M listings (counted once each, however many
+pages they take) and 3·M·(M-1)·min(probes_per_pair, N) probes. The default sample
+keeps that at a few requests per tenant pair rather than growing with N.
+The result is a violation matrix, viewer tenant x owner tenant -> operations
+that leaked.
+"""
+import time
+
+from tests.support.async_api import gather_all
+from tests.support.listing import PAGE_SIZE, iter_projects
+
+
+DENIED = (403, 404)
+PROBES_PER_PAIR = 2  # projects of each other tenant probed by each viewer
+OPERATIONS = ("list", "get", "update", "delete")
+
+
+def tenant_identities(test_data):
+    """One user per tenant in test_data.json, admins first; user keys in tenant order."""
+    chosen = {}
+    users = sorted(test_data["test_users"].items(), key=lambda item: item[1].get("role") != "admin")
+    for user_key, user in users:
+        chosen.setdefault(user["tenant_id"], user_key)
+    return [chosen[tenant_id] for tenant_id in sorted(chosen)]
+
+
+class IsolationReport:
+
+    def __init__(self, tenants, violations, requests, elapsed):
+        self.tenants = list(tenants)
+        self.violations = violations  # (viewer, owner) -> {operation: [project ids]}
+        self.requests = requests
+        self.elapsed = elapsed
+
+    @property
+    def ok(self):
+        return not self.violations
+
+    def render(self):
+        """Viewer rows x owner columns; a cell lists the operations that leaked."""
+        width = max([len(t) for t in self.tenants] + [len("viewer \\ owner"), len("get,update")]) + 2
+        lines = ["viewer \\ owner".ljust(width) + "".join(t.ljust(width) for t in self.tenants)]
+        for viewer in self.tenants:
+            cells = []
+            for owner in self.tenants:
+                if viewer == owner:
+                    cells.append("-")
+                    continue
+                leaked = self.violations.get((viewer, owner), {})
+                cells.append(",".join(op for op in OPERATIONS if op in leaked) or "ok")
+            lines.append(viewer.ljust(width) + "".join(cell.ljust(width) for cell in cells))
+        lines.append(f"{len(self.tenants)} tenants, {self.requests} requests in {self.elapsed:.1f}s")
+        return "\n".join(lines)
+
+    def to_json(self):
+        return {
+            "tenants": self.tenants,
+            "requests": self.requests,
+            "elapsed_s": self.elapsed,
+            "violations": [
+                {"viewer": viewer, "owner": owner, "operations": operations}
+                for (viewer, owner), operations in sorted(self.violations.items())
+            ],
+        }
+
+
+class IsolationMatrix:
+
+    def __init__(self, tenants, resources_per_tenant=5, probes_per_pair=PROBES_PER_PAIR,
+                 name_prefix="IsolationMatrix", page_size=PAGE_SIZE):
+        self.tenants = dict(tenants)  # tenant id -> AsyncWorkflowProClient view for that tenant
+        self.resources_per_tenant = resources_per_tenant
+        self.probes_per_pair = min(probes_per_pair, resources_per_tenant)
+        self.page_size = page_size
+        self.name_prefix = name_prefix
+        self.owned = {}  # tenant id -> {project id: name}
+        self.requests = 0
+
+    async def run(self, on_created=None):
+        start = time.perf_counter()
+        await self.seed(on_created)
+        violations = await self.check()
+        return IsolationReport(self.tenants, violations, self.requests, time.perf_counter() - start)
+
+    async def seed(self, on_created=None):
+        """Create resources_per_tenant projects for every tenant, all at once."""
+        run_id = int(time.time() * 1000)
+        jobs = [
+            (tenant_id, f"{self.name_prefix}_{run_id}_{index}_{i}")
+            for index, tenant_id in enumerate(self.tenants)
+            for i in range(self.resources_per_tenant)
+        ]
+        responses = await self._all(
+            self.tenants[tenant_id].post("projects", "create", json={
+                "name": name, "description": "tenant isolation matrix",
+            })
+            for tenant_id, name in jobs
+        )
+        failed = [(tenant_id, r.status_code) for (tenant_id, _), r in zip(jobs, responses) if r.status_code != 201]
+        for (tenant_id, name), response in zip(jobs, responses):
+            if response.status_code == 201:
+                project_id = response.json()["id"]
+                self.owned.setdefault(tenant_id, {})[project_id] = name
+                if on_created is not None:
+                    on_created(tenant_id, project_id)
+        assert not failed, f"Seeding the isolation matrix failed: {failed}"
+
+    async def check(self):
+        violations = {}
+
+        def leak(viewer, owner, operation, project_id):
+            violations.setdefault((viewer, owner), {}).setdefault(operation, []).append(project_id)
+
+        owner_of = {pid: tenant_id for tenant_id, owned in self.owned.items() for pid in owned}
+
+        probes = list(self._probes())
+        responses = await self._all(self._probe(viewer, operation, project_id)
+                                    for viewer, _, operation, project_id in probes)
+        for (viewer, owner, operation, project_id), response in zip(probes, responses):
+            if response.status_code not in DENIED:
+                leak(viewer, owner, operation, project_id)
+
+        # one listing per tenant, after the probes, instead of a GET per foreign project
+        probed = {(project_id, operation): (viewer, owner) for viewer, owner, operation, project_id in probes}
+        for tenant_id, listed in zip(self.tenants, await self._lists()):
+            for project_id in listed:
+                owner = owner_of.get(project_id)
+                if owner is not None and owner != tenant_id:
+                    leak(tenant_id, owner, "list", project_id)
+            # writes to its own projects that claimed to be denied may still have gone through
+            for project_id, name in self.owned.get(tenant_id, {}).items():
+                if project_id not in listed:
+                    by = probed.get((project_id, "delete"))
+                    if by is not None:
+                        leak(by[0], tenant_id, "delete", project_id)
+                elif listed[project_id] != name:
+                    by = probed.get((project_id, "update"))
+                    if by is not None:
+                        leak(by[0], tenant_id, "update", project_id)
+
+        for operations in violations.values():
+            for operation, project_ids in operations.items():
+                operations[operation] = sorted(set(project_ids))
+        return violations
+
+    def _probes(self):
+        """(viewer, owner, operation, project id); viewers rotate over the owner's projects."""
+        for viewer_index, viewer in enumerate(self.tenants):
+            for owner in self.tenants:
+                if owner == viewer:
+                    continue
+                project_ids = list(self.owned.get(owner, {}))
+                for i in range(self.probes_per_pair):
+                    project_id = project_ids[(viewer_index + i) % len(project_ids)]
+                    for operation in ("get", "update", "delete"):
+                        yield viewer, owner, operation, project_id
+
+    def _probe(self, viewer, operation, project_id):
+        client = self.tenants[viewer]
+        path_params = {"id": project_id}
+        if operation == "get":
+            return client.get("projects", "get", path_params=path_params)
+        if operation == "update":
+            return client.put("projects", "update", path_params=path_params,
+                              json={"name": f"{self.name_prefix}_overwritten_by_{viewer}"})
+        return client.delete("projects", "delete", path_params=path_params)
+
+    async def _lists(self):
+        """{project id: name} of every page each tenant lists, in tenant order."""
+        return await self._all(client.call(self._list, client.client) for client in self.tenants.values())
+
+    def _list(self, tenant):
+        return {project.id: project.name for project in iter_projects(tenant, page_size=self.page_size)}
+
+    async def _all(self, coroutines):
+        coroutines = list(coroutines)
+        self.requests += len(coroutines)
+        return await gather_all(*coroutines)
@@ -0,0 +1,211 @@
+"""Session-wide ledger of resources created by tests, cleaned up in parallel batches.
+
+Tests record what they create through the `resource_ledger` fixture. With
+`--cleanup=test` (default) the resources are deleted when each test finishes; with
+`--cleanup=session` they are deleted once at the end of the run. Every xdist worker
+journals what it could not delete (or deferred) to `.cache/ledger/<worker>.json`; the
+controller merges those journals, deletes each resource at most once and reports
+anything that still leaked. Journals name the test user that owns a resource, never
+its token: whoever deletes it asks the auth cache for a current login.
+"""
+import json
+import os
+import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+import requests
+
+from tests.support.api_client import API_CONCURRENCY, WorkflowProClient, create_retry_session
+from tests.support.api_login import ApiLoginError
+from tests.support.auth_cache import AUTH_STATE_DIR, AuthStateCache
+from tests.support.locking import atomic_write_text
+from tests.support.timing import span
+
+
+LEDGER_DIR = Path(__file__).parent.parent.parent / ".cache" / "ledger"
+
+DELETED_STATUSES = (200, 202, 204, 404)  # 404: the test already removed it
+DELETE_ATTEMPTS = 3
+DELETE_BACKOFF = 0.5  # seconds, doubled per attempt
+
+
+class ResourceLedger:
+
+    def __init__(self, client: WorkflowProClient, credentials, batch_size=API_CONCURRENCY):
+        """`credentials(user_key)` returns (token, tenant_id), e.g. AuthStateCache.credentials.
+
+        Deletes go to `client`'s API on a session of their own without transport
+        retries: the attempts in `_delete` are the only retry policy, so a resource
+        that keeps failing is reported after DELETE_ATTEMPTS requests.
+        """
+        self.client = WorkflowProClient(
+            client.base_url, client.endpoints,
+            session=create_retry_session(retries=0, pool_size=batch_size, raise_on_status=False),
+            headers=client.headers, timeout=client.timeout, observers=client.observers,
+        )
+        self.credentials = credentials
+        self.batch_size = batch_size
+        self.entries = {}
+        self.leaked = []
+
+    def record(self, group, resource_id, user_key):
+        """Remember a resource `user_key` created; `group` is its api_endpoints group, e.g. "projects"."""
+        self.entries[(group, resource_id)] = {
+            "group": group,
+            "id": resource_id,
+            "user_key": user_key,
+        }
+
+    def take(self):
+        entries = list(self.entries.values())
+        self.entries.clear()
+        return entries
+
+    def delete_all(self, entries):
+        """Delete entries in parallel batches; return the ones that could not be deleted."""
+        leaked = []
+        if not entries:
+            return leaked
+        # the deletes run on pool threads, which --timing doesn't charge to the test
+        with span("cleanup", f"{len(entries)} resources"):
+            with ThreadPoolExecutor(max_workers=self.batch_size, thread_name_prefix="cleanup") as pool:
+                for start in range(0, len(entries), self.batch_size):
+                    batch = entries[start:start + self.batch_size]
+                    for entry, deleted in zip(batch, pool.map(self._delete, batch)):
+                        if not deleted:
+                            leaked.append(entry)
+        return leaked
+
+    def flush(self):
+        self.leaked.extend(self.delete_all(self.take()))
+
+    def close(self):
+        self.client.close()
+
+    def _delete(self, entry):
+        for attempt in range(DELETE_ATTEMPTS):
+            try:
+                # looked up per attempt: a login saved earlier in the run may have expired since
+                tenant = self.client.as_tenant(*self.credentials(entry["user_key"]))
+                response = tenant.delete(entry["group"], "delete", path_params={"id": entry["id"]})
+                if response.status_code in DELETED_STATUSES:
+                    return True
+                if response.status_code < 500:
+                    return False
+            except (requests.exceptions.RequestException, ApiLoginError):
+                pass
+            time.sleep(DELETE_BACKOFF * 2 ** attempt)
+        return False
+
+
+def merge_journals(ledger_dir=LEDGER_DIR):
+    """Combine every worker journal, keeping each (group, id) pair only once."""
+    merged = {"pending": {}, "leaked": {}}
+    for path in sorted(Path(ledger_dir).glob("*.json")):
+        if path.name == "leaked.json":
+            continue
+        journal = json.loads(path.read_text())
+        for key in ("pending", "leaked"):
+            for entry in journal[key]:
+                merged[key][(entry["group"], entry["id"])] = entry
+    # something that leaked on one worker but is pending elsewhere gets one more try
+    for entry_key in merged["pending"]:
+        merged["leaked"].pop(entry_key, None)
+    merged["pending"] = list(merged["pending"].values())
+    merged["leaked"] = list(merged["leaked"].values())
+    return merged
+
+
+def _is_controller(config):
+    return not hasattr(config, "workerinput")
+
+
+def _worker_id(config):
+    if _is_controller(config):
+        return "controller"
+    return config.workerinput["workerid"]
+
+
+# -----------------------------
+# pytest plugin
+# -----------------------------
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--cleanup",
+        choices=("test", "session"),
+        default=os.getenv("CLEANUP_MODE", "test"),
+        help="when to delete resources recorded in the ledger: after each test or once per run",
+    )
+
+
+def pytest_configure(config):
+    config._ledger_leaks = []
+    if _is_controller(config):
+        shutil.rmtree(LEDGER_DIR, ignore_errors=True)
+
+
+@pytest.fixture(scope="session")
+def _session_ledger(request, api_client, api_credentials):
+    ledger = ResourceLedger(api_client, api_credentials)
+    yield ledger
+    ledger.close()
+    # deferred and leaked entries go to the journal; the controller settles them
+    journal = {
+        "pending": ledger.take(),
+        "leaked": ledger.leaked,
+    }
+    atomic_write_text(
+        LEDGER_DIR / f"{_worker_id(request.config)}.json", json.dumps(journal)
+    )
+
+
+@pytest.fixture
+def resource_ledger(request, _session_ledger):
+    """Record created resources here instead of deleting them in the test."""
+    yield _session_ledger
+    if request.config.getoption("--cleanup") == "test":
+        _session_ledger.flush()
+
+
+def pytest_sessionfinish(session):
+    config = session.config
+    if not _is_controller(config):
+        return
+
+    journals = merge_journals()
+    leaked = journals["leaked"]
+    if journals["pending"]:
+        # the controller has no fixtures: log in through the same on-disk cache the workers share
+        workflowpro = config._workflowpro_config
+        auth = AuthStateCache(
+            AUTH_STATE_DIR, workflowpro.data, workflowpro.base_url, api_base_url=workflowpro.api_base_url
+        )
+        client = WorkflowProClient(workflowpro.api_base_url, workflowpro.endpoints)
+        ledger = ResourceLedger(client, auth.credentials)
+        try:
+            leaked += ledger.delete_all(journals["pending"])
+        finally:
+            ledger.close()
+            client.close()
+
+    config._ledger_leaks = leaked
+    if leaked:
+        atomic_write_text(LEDGER_DIR / "leaked.json", json.dumps(
+            [{"group": e["group"], "id": e["id"], "user_key": e["user_key"]} for e in leaked],
+            indent=2,
+        ))
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    leaked = getattr(config, "_ledger_leaks", [])
+    if not leaked:
+        return
+    terminalreporter.section("leaked resources")
+    for entry in leaked:
+        terminalreporter.write_line(
+            f"{entry['group']}/{entry['id']} (created by {entry['user_key']})"
+        )
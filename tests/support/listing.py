@@ -0,0 +1,176 @@
+"""Stream project listings page by page without holding them in memory.
+
+`iter_projects(tenant)` asks for pages of `page_size` and follows whatever
+pagination the server answers with: a `next_cursor` / `next` field in an
+envelope like {"items": [...], "next_cursor": "..."}, a `Link: <...>; rel="next"`
+header, or `page` / `total_pages`. A bare JSON array without a next link is
+one page. Each body is read in chunks and its items are decoded one at a time,
+so memory stays at one chunk plus one project however long the listing is, and
+only a compact ProjectRef per project is handed out.
+
+Leaving the loop early closes the response without reading the rest of it, so
+membership checks stop as soon as they have an answer:
+
+    find_project(tenant_b, project_id)   # stops at the match
+"""
+import codecs
+import json
+from collections import namedtuple
+from urllib.parse import parse_qsl, urlsplit
+
+
+PAGE_SIZE = 100
+CHUNK_SIZE = 16 * 1024  # bytes read from the socket at a time
+
+ITEM_KEYS = ("items", "projects", "data", "results")
+CURSOR_KEYS = ("next_cursor", "cursor", "next")
+
+ProjectRef = namedtuple("ProjectRef", "id name tenant_id")
+
+_WHITESPACE = " \t\r\n"
+_NUMBER_CHARS = "0123456789+-.eE"
+
+
+class ListingError(AssertionError):
+    pass
+
+
+class _Stream:
+    """Decoded text of a streamed response, pulled into a small buffer on demand."""
+
+    def __init__(self, response, chunk_size=CHUNK_SIZE):
+        self.chunks = response.iter_content(chunk_size)
+        self.decoder = codecs.getincrementaldecoder(response.encoding or "utf-8")()
+        self.buffer = ""
+        self.pos = 0
+        self.done = False
+
+    def fill(self):
+        """Read one more chunk; False once the body is exhausted."""
+        if self.done:
+            return False
+        self.buffer = self.buffer[self.pos:]
+        self.pos = 0
+        chunk = next(self.chunks, None)
+        if chunk is None:
+            self.done = True
+            self.buffer += self.decoder.decode(b"", final=True)
+        else:
+            self.buffer += self.decoder.decode(chunk)
+        return True
+
+    def peek(self):
+        """Next non-whitespace character, without consuming it ("" at the end)."""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self.fill():
+                return ""
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise ListingError(f"Unexpected listing body: expected {char!r} near {self.buffer[self.pos:self.pos + 40]!r}")
+        self.pos += 1
+
+    def value(self, decoder=json.JSONDecoder()):
+        """Decode the next JSON value, reading more while it is incomplete."""
+        self.peek()
+        while True:
+            if self._number_may_continue():
+                self.fill()
+                continue
+            try:
+                value, end = decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError as error:
+                if not self.fill():
+                    raise ListingError(f"Malformed listing body: {error}") from None
+                continue
+            self.pos = end
+            return value
+
+    def _number_may_continue(self):
+        # "1", "1." or "1.5e" at the end of the buffer may go on in the next chunk
+        if self.done or self.pos >= len(self.buffer) or self.buffer[self.pos] not in "-0123456789":
+            return False
+        end = self.pos
+        while end < len(self.buffer) and self.buffer[end] in _NUMBER_CHARS:
+            end += 1
+        return end == len(self.buffer)
+
+    def array(self):
+        """Yield the elements of the JSON array starting here."""
+        self.expect("[")
+        if self.peek() == "]":
+            self.pos += 1
+            return
+        while True:
+            yield self.value()
+            if self.peek() == ",":
+                self.pos += 1
+                continue
+            self.expect("]")
+            return
+
+
+def _parse_page(response, meta):
+    """Yield the items of one page; envelope fields other than the items end up in `meta`."""
+    stream = _Stream(response)
+    if stream.peek() == "[":
+        yield from stream.array()
+        return
+    stream.expect("{")
+    while stream.peek() != "}":
+        key = stream.value()
+        stream.expect(":")
+        if key in ITEM_KEYS and stream.peek() == "[":
+            yield from stream.array()
+        else:
+            meta[key] = stream.value()
+        if stream.peek() == ",":
+            stream.pos += 1
+
+
+def _next_params(response, meta, params):
+    """Query params for the next page, or None on the last one."""
+    for key in CURSOR_KEYS:
+        cursor = meta.get(key)
+        if isinstance(cursor, str) and cursor.startswith(("http://", "https://", "/")):
+            return dict(parse_qsl(urlsplit(cursor).query))
+        if cursor:
+            return {**params, "cursor": cursor}
+    if meta.get("has_more") is False:
+        return None
+    link = response.links.get("next", {}).get("url")
+    if link:
+        return dict(parse_qsl(urlsplit(link).query))
+    page, total = meta.get("page"), meta.get("total_pages")
+    if page is not None and total is not None and page < total:
+        return {**params, "page": page + 1}
+    return None
+
+
+def iter_projects(tenant, page_size=PAGE_SIZE):
+    """Yield a ProjectRef per project visible to `tenant`, one page at a time."""
+    params = {"limit": page_size}
+    while params is not None:
+        response = tenant.get("projects", "list", params=params, stream=True)
+        try:
+            if response.status_code != 200:
+                raise ListingError(f"Listing projects failed: {response.status_code}")
+            meta = {}
+            for item in _parse_page(response, meta):
+                yield ProjectRef(item.get("id") or item.get("project_id"), item.get("name"), item.get("tenant_id"))
+            params = _next_params(response, meta, params)
+        finally:
+            # unread rest of an abandoned page is dropped with the connection
+            response.close()
+
+
+def find_project(tenant, project_id, page_size=PAGE_SIZE):
+    """ProjectRef for `project_id` if `tenant` lists it, else None, reading no further than needed."""
+    for project in iter_projects(tenant, page_size=page_size):
+        if project.id == project_id:
+            return project
+    return None
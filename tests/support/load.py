@@ -0,0 +1,243 @@
+"""Load mode: run the TestProjectAPI scenarios as weighted workloads.
+
+    python -m tests.support.load --users 20 --duration 60
+    python -m tests.support.load --target local --iterations 2000 --mix list=5,create_delete=1
+
+Each virtual user is a thread with its own tenant A/B views of one pooled
+client. Per-endpoint latency (keyed by the api_endpoints template), error rates
+and tenant-isolation violations are written to a JSON report so runs can be
+compared.
+"""
+import argparse
+import json
+import os
+import random
+import threading
+import time
+from pathlib import Path
+
+from tests.support import scenarios
+from tests.support.api_client import WorkflowProClient, create_retry_session
+from tests.support.api_login import login_via_api
+from tests.support.config import DEFAULT_ENV, load_config, resolve_user
+from tests.support.http_stats import HttpStats
+from tests.support.stub_server import start_local_stub
+
+
+REPORT_DIR = Path(__file__).parent.parent.parent / "reports" / "load"
+
+
+class VirtualUser:
+
+    def __init__(self, index, tenant_a, tenant_b):
+        self.index = index
+        self.tenant_a = tenant_a
+        self.tenant_b = tenant_b
+        self.seed_project_id = None
+
+    def setup(self):
+        project = scenarios.create_project(self.tenant_a, {
+            "name": f"Load Seed Project {self.index}",
+            "description": "seed project for load run",
+        })
+        self.seed_project_id = project["id"]
+
+    def teardown(self):
+        if self.seed_project_id:
+            self.tenant_a.delete("projects", "delete", path_params={"id": self.seed_project_id})
+
+
+def create_delete(user):
+    project = scenarios.create_project(user.tenant_a, {
+        "name": f"Load Project {user.index}-{time.monotonic_ns()}",
+        "description": "load run",
+    })
+    scenarios.delete_project(user.tenant_a, project["id"])
+
+
+def list_projects(user):
+    scenarios.list_projects(user.tenant_a)
+
+
+def get_seed_project(user):
+    response = user.tenant_a.get("projects", "get", path_params={"id": user.seed_project_id})
+    assert response.status_code == 200, f"Expected 200 but got {response.status_code}"
+
+
+def cross_tenant_get(user):
+    scenarios.get_project_as_other_tenant(user.tenant_b, user.seed_project_id)
+
+
+WORKLOADS = {
+    "create_delete": create_delete,
+    "list": list_projects,
+    "get": get_seed_project,
+    "cross_tenant_get": cross_tenant_get,
+}
+DEFAULT_MIX = {"create_delete": 1, "list": 4, "get": 3, "cross_tenant_get": 2}
+
+
+def run_load(client, tenant_a_auth, tenant_b_auth, users=10, duration=None, iterations=None,
+             mix=None, seed=None):
+    """Run weighted workloads until `duration` seconds pass or `iterations` complete."""
+    if duration is None and iterations is None:
+        raise ValueError("Either duration or iterations is required")
+    mix = mix or DEFAULT_MIX
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    rng = random.Random(seed)
+
+    stats = HttpStats()
+    client.observers.append(stats)
+    outcomes = {name: {"count": 0, "failures": 0, "isolation_violations": 0} for name in names}
+    failures = []
+    lock = threading.Lock()
+    remaining = [iterations]
+    deadline = time.monotonic() + duration if duration is not None else None
+
+    def next_workload():
+        with lock:
+            if deadline is not None and time.monotonic() >= deadline:
+                return None
+            if remaining[0] is not None:
+                if remaining[0] <= 0:
+                    return None
+                remaining[0] -= 1
+            return rng.choices(names, weights)[0]
+
+    def virtual_user(index):
+        user = VirtualUser(
+            index, client.as_tenant(*tenant_a_auth), client.as_tenant(*tenant_b_auth)
+        )
+        try:
+            user.setup()
+        except Exception as error:
+            with lock:
+                failures.append(f"user {index} setup: {error}")
+            return
+        try:
+            while True:
+                name = next_workload()
+                if name is None:
+                    break
+                try:
+                    WORKLOADS[name](user)
+                    outcome = None
+                except scenarios.IsolationViolation as error:
+                    outcome = ("isolation_violations", error)
+                except Exception as error:
+                    outcome = ("failures", error)
+                with lock:
+                    outcomes[name]["count"] += 1
+                    if outcome:
+                        outcomes[name][outcome[0]] += 1
+                        if len(failures) < 50:
+                            failures.append(f"{name}: {outcome[1]}")
+        finally:
+            user.teardown()
+
+    started = time.monotonic()
+    threads = [threading.Thread(target=virtual_user, args=(i,), name=f"vu-{i}") for i in range(users)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - started
+    client.observers.remove(stats)
+
+    completed = sum(o["count"] for o in outcomes.values())
+    return {
+        "users": users,
+        "duration_s": elapsed,
+        "iterations": completed,
+        "throughput_ips": completed / elapsed if elapsed else None,
+        "mix": mix,
+        "scenarios": outcomes,
+        "isolation_violations": sum(o["isolation_violations"] for o in outcomes.values()),
+        "endpoints": stats.summary(elapsed),
+        "endpoints_by_tenant": stats.to_json(),
+        "sample_failures": failures,
+    }
+
+
+def parse_mix(value):
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        if name not in WORKLOADS:
+            raise argparse.ArgumentTypeError(f"Unknown workload {name!r}, choose from {sorted(WORKLOADS)}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--duration", type=float, help="seconds to run")
+    parser.add_argument("--iterations", type=int, help="total scenario runs")
+    parser.add_argument("--mix", type=parse_mix, default=DEFAULT_MIX,
+                        help="weighted workloads, e.g. list=4,create_delete=1")
+    parser.add_argument("--env", default=os.getenv("WORKFLOWPRO_ENV", DEFAULT_ENV),
+                        help="base_urls profile from test_data.json (staging, qa)")
+    parser.add_argument("--target", choices=("staging", "local"),
+                        default=os.getenv("WORKFLOWPRO_TARGET", "staging"),
+                        help="local runs against the in-process stand-in instead of --env")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--output", type=Path,
+                        default=REPORT_DIR / f"load-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    parser.add_argument("--tenant-a-token", default=os.getenv("TENANT_A_TOKEN"),
+                        help="defaults to logging tenant_a_admin in through the API")
+    parser.add_argument("--tenant-b-token", default=os.getenv("TENANT_B_TOKEN"),
+                        help="defaults to logging tenant_b_admin in through the API")
+    args = parser.parse_args(argv)
+    if args.duration is None and args.iterations is None:
+        args.duration = 30
+
+    test_data = load_config(args.env).data
+    stub = None
+    if args.target == "local":
+        stub = start_local_stub(test_data)
+    api_base_url = load_config(args.env).api_base_url
+
+    def tenant_auth(user_key, token):
+        user = resolve_user(test_data, user_key)
+        if token:
+            return token, user["tenant_id"]
+        login = login_via_api(api_base_url, test_data["api_endpoints"], user)
+        return login["token"], login["tenant_id"]
+
+    # no retries: under load every failed attempt should show up in the error rate, and 5xx
+    # responses come back (to be counted by status) instead of raising RetryError
+    client = WorkflowProClient(
+        api_base_url, test_data["api_endpoints"],
+        session=create_retry_session(retries=0, pool_size=args.users, raise_on_status=False),
+    )
+    try:
+        report = run_load(
+            client,
+            tenant_auth("tenant_a_admin", args.tenant_a_token),
+            tenant_auth("tenant_b_admin", args.tenant_b_token),
+            users=args.users, duration=args.duration, iterations=args.iterations,
+            mix=args.mix, seed=args.seed,
+        )
+    finally:
+        client.close()
+        if stub is not None:
+            stub.stop()
+
+    report["target"] = api_base_url if stub is None else "local"
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps(report, indent=2))
+
+    print(f"{report['iterations']} iterations in {report['duration_s']:.1f}s "
+          f"({report['throughput_ips']:.1f}/s), {report['isolation_violations']} isolation violations")
+    for key, endpoint in report["endpoints"].items():
+        print(f"  {key:32s} n={endpoint['count']:<6d} p50={endpoint['p50_ms']:.1f}ms "
+              f"p95={endpoint['p95_ms']:.1f}ms p99={endpoint['p99_ms']:.1f}ms "
+              f"errors={endpoint['error_rate']:.1%}")
+    print(f"report written to {args.output}")
+    return 1 if report["isolation_violations"] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
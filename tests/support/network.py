@@ -0,0 +1,308 @@
+"""Request filtering and an on-disk static asset cache for browser contexts.
+
+Every pooled context gets a route handler that:
+  * aborts requests for blocked resource types (images, fonts, media by default)
+    and for hosts on the deny list, or off the allow list when one is set;
+  * serves GET scripts and stylesheets from .cache/assets, keyed by URL. An
+    entry is fresh for the response's max-age, capped at ASSET_CACHE_TTL, or
+    for ASSET_CACHE_TTL when the response gives none. After that, and on
+    every request when the response said no-cache, it is revalidated with
+    If-None-Match / If-Modified-Since. An entry with neither validator is
+    fetched again. A stale entry is never served without revalidation.
+
+Fewer requests in flight also means `networkidle` settles sooner. Configure with
+NETWORK_FILTER=0 (off), NETWORK_BLOCK_TYPES, NETWORK_DENY_HOSTS,
+NETWORK_ALLOW_HOSTS and ASSET_CACHE_TTL. Savings per run go to
+reports/network.json and the terminal summary.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from urllib.parse import urlparse
+
+import pytest
+
+from tests.support.har import DROPPED_RESPONSE_HEADERS
+from tests.support.locking import atomic_write_text
+
+
+ASSET_CACHE_DIR = Path(__file__).parent.parent.parent / ".cache" / "assets"
+NETWORK_STATS_DIR = Path(__file__).parent.parent.parent / "reports" / "network"
+
+DEFAULT_BLOCK_TYPES = "image,media,font"
+DEFAULT_DENY_HOSTS = (
+    "google-analytics.com,googletagmanager.com,doubleclick.net,segment.io,"
+    "segment.com,hotjar.com,intercom.io,sentry.io,facebook.net,fullstory.com"
+)
+CACHED_TYPES = ("script", "stylesheet")
+UNCACHEABLE = ("no-store", "private")
+
+
+def _env_list(name, default=""):
+    return [value.strip() for value in os.getenv(name, default).split(",") if value.strip()]
+
+
+def _host_matches(host, suffixes):
+    return any(host == suffix or host.endswith("." + suffix) for suffix in suffixes)
+
+
+def _cache_control(headers):
+    """{directive: value} from a Cache-Control header, names lower-cased."""
+    directives = {}
+    for part in headers.get("cache-control", "").split(","):
+        name, _, value = part.strip().partition("=")
+        if name:
+            directives[name.lower()] = value.strip('"')
+    return directives
+
+
+def _fulfill_headers(headers):
+    # the cached body is the decoded one, so drop the headers that described the wire encoding
+    return {name: value for name, value in headers.items() if name.lower() not in DROPPED_RESPONSE_HEADERS}
+
+
+class NetworkPolicy:
+
+    def __init__(self, block_types=(), deny_hosts=(), allow_hosts=(), cache_ttl=3600):
+        self.block_types = set(block_types)
+        self.deny_hosts = list(deny_hosts)
+        self.allow_hosts = list(allow_hosts)
+        self.cache_ttl = cache_ttl
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            block_types=_env_list("NETWORK_BLOCK_TYPES", DEFAULT_BLOCK_TYPES),
+            deny_hosts=_env_list("NETWORK_DENY_HOSTS", DEFAULT_DENY_HOSTS),
+            allow_hosts=_env_list("NETWORK_ALLOW_HOSTS"),
+            cache_ttl=int(os.getenv("ASSET_CACHE_TTL", "3600")),
+        )
+
+    def fresh_for(self, headers):
+        """Seconds a cached response may be served without revalidating it."""
+        directives = _cache_control(headers)
+        if "no-cache" in directives:
+            return 0
+        if "max-age" in directives:
+            try:
+                return min(int(directives["max-age"]), self.cache_ttl)
+            except ValueError:
+                return 0
+        return self.cache_ttl
+
+    def is_fresh(self, meta):
+        return time.time() - meta["stored_at"] < self.fresh_for(meta["headers"])
+
+    def is_blocked(self, resource_type, host):
+        if resource_type in self.block_types:
+            return True
+        if _host_matches(host, self.deny_hosts):
+            return True
+        return bool(self.allow_hosts) and not _host_matches(host, self.allow_hosts)
+
+
+class StaticAssetCache:
+
+    def __init__(self, cache_dir=ASSET_CACHE_DIR):
+        self.cache_dir = Path(cache_dir)
+
+    def _paths(self, url):
+        key = hashlib.sha1(url.encode()).hexdigest()
+        return self.cache_dir / f"{key}.json", self.cache_dir / f"{key}.body"
+
+    def get(self, url):
+        meta_path, body_path = self._paths(url)
+        try:
+            meta = json.loads(meta_path.read_text())
+            return meta, body_path.read_bytes()
+        except (OSError, ValueError):
+            return None
+
+    def put(self, url, status, headers, body):
+        meta_path, body_path = self._paths(url)
+        body_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_body = body_path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_body.write_bytes(body)
+        os.replace(tmp_body, body_path)
+        atomic_write_text(meta_path, json.dumps({
+            "url": url,
+            "status": status,
+            "headers": headers,
+            "etag": headers.get("etag"),
+            "stored_at": time.time(),
+        }))
+
+    def touch(self, url):
+        meta_path, _ = self._paths(url)
+        meta = json.loads(meta_path.read_text())
+        meta["stored_at"] = time.time()
+        atomic_write_text(meta_path, json.dumps(meta))
+
+
+class NetworkRouter:
+    """Route handler applied to browser contexts, with per-run savings counters."""
+
+    def __init__(self, policy=None, cache=None):
+        self.policy = policy or NetworkPolicy.from_env()
+        self.cache = cache or StaticAssetCache()
+        self.lock = threading.Lock()
+        self.stats = {
+            "requests": 0,
+            "blocked_requests": 0,
+            "blocked_by_type": {},
+            "cache_hits": 0,
+            "cache_revalidated": 0,
+            "cache_misses": 0,
+            "bytes_from_cache": 0,
+        }
+
+    def apply(self, context):
+        context.route("**/*", self.handle)
+
+    def handle(self, route, request):
+        self._count("requests")
+        url = request.url
+        if not url.startswith("http"):
+            return route.continue_()
+        host = urlparse(url).hostname or ""
+        if self.policy.is_blocked(request.resource_type, host):
+            self._count("blocked_requests")
+            with self.lock:
+                by_type = self.stats["blocked_by_type"]
+                by_type[request.resource_type] = by_type.get(request.resource_type, 0) + 1
+            return route.abort("blockedbyclient")
+        if request.method == "GET" and request.resource_type in CACHED_TYPES:
+            return self._serve_cached(route, url)
+        return route.continue_()
+
+    async def apply_async(self, context):
+        """apply() for async API contexts (parallel branches)."""
+        await context.route("**/*", self.handle_async)
+
+    async def handle_async(self, route, request):
+        # blocking and fresh cache hits only; misses and revalidation go to the network
+        self._count("requests")
+        url = request.url
+        if not url.startswith("http"):
+            return await route.continue_()
+        host = urlparse(url).hostname or ""
+        if self.policy.is_blocked(request.resource_type, host):
+            self._count("blocked_requests")
+            with self.lock:
+                by_type = self.stats["blocked_by_type"]
+                by_type[request.resource_type] = by_type.get(request.resource_type, 0) + 1
+            return await route.abort("blockedbyclient")
+        if request.method == "GET" and request.resource_type in CACHED_TYPES:
+            cached = self.cache.get(url)
+            if cached and self.policy.is_fresh(cached[0]):
+                meta, body = cached
+                self._count("cache_hits")
+                self._count("bytes_from_cache", len(body))
+                return await route.fulfill(status=meta["status"], headers=_fulfill_headers(meta["headers"]), body=body)
+        return await route.continue_()
+
+    def _serve_cached(self, route, url):
+        cached = self.cache.get(url)
+        if cached:
+            meta, body = cached
+            if self.policy.is_fresh(meta):
+                return self._fulfill_cached(route, meta, body)
+            validators = {}
+            if meta.get("etag"):
+                validators["if-none-match"] = meta["etag"]
+            if meta["headers"].get("last-modified"):
+                validators["if-modified-since"] = meta["headers"]["last-modified"]
+            if validators:
+                response = route.fetch(headers={**route.request.headers, **validators})
+                if response.status == 304:
+                    self.cache.touch(url)
+                    self._count("cache_revalidated")
+                    return self._fulfill_cached(route, meta, body)
+                return self._store_and_fulfill(route, url, response)
+
+        self._count("cache_misses")
+        return self._store_and_fulfill(route, url, route.fetch())
+
+    def _fulfill_cached(self, route, meta, body):
+        self._count("cache_hits")
+        self._count("bytes_from_cache", len(body))
+        route.fulfill(status=meta["status"], headers=_fulfill_headers(meta["headers"]), body=body)
+
+    def _store_and_fulfill(self, route, url, response):
+        headers = _fulfill_headers(response.headers)
+        body = response.body()
+        directives = _cache_control(headers)
+        if response.status == 200 and not any(flag in directives for flag in UNCACHEABLE):
+            self.cache.put(url, response.status, headers, body)
+        route.fulfill(status=response.status, headers=headers, body=body)
+
+    def _count(self, name, amount=1):
+        with self.lock:
+            self.stats[name] += amount
+
+
+def merge_stats(reports):
+    merged = {}
+    for report in reports:
+        for name, value in report.items():
+            if isinstance(value, dict):
+                bucket = merged.setdefault(name, {})
+                for key, count in value.items():
+                    bucket[key] = bucket.get(key, 0) + count
+            else:
+                merged[name] = merged.get(name, 0) + value
+    return merged
+
+
+# -----------------------------
+# pytest plugin
+# -----------------------------
+
+def pytest_configure(config):
+    config._network_summary = None
+    if not hasattr(config, "workerinput"):
+        for stale in NETWORK_STATS_DIR.glob("*.json"):
+            stale.unlink()
+
+
+@pytest.fixture(scope="session")
+def network_router(request):
+    """Shared route handler for browser contexts, or None with NETWORK_FILTER=0."""
+    if os.getenv("NETWORK_FILTER", "1") == "0":
+        yield None
+        return
+    router = NetworkRouter()
+    yield router
+    config = request.config
+    worker = config.workerinput["workerid"] if hasattr(config, "workerinput") else "controller"
+    atomic_write_text(NETWORK_STATS_DIR / f"{worker}.json", json.dumps(router.stats))
+
+
+def pytest_sessionfinish(session):
+    config = session.config
+    if hasattr(config, "workerinput"):
+        return
+    reports = [json.loads(p.read_text()) for p in sorted(NETWORK_STATS_DIR.glob("*.json"))]
+    if not reports:
+        return
+    merged = merge_stats(reports)
+    atomic_write_text(NETWORK_STATS_DIR.parent / "network.json", json.dumps(merged, indent=2))
+    config._network_summary = merged
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    stats = getattr(config, "_network_summary", None)
+    if not stats or not stats.get("requests"):
+        return
+    terminalreporter.section("browser network savings")
+    terminalreporter.write_line(
+        f"{stats['blocked_requests']} of {stats['requests']} requests blocked "
+        f"({', '.join(f'{k}: {v}' for k, v in stats['blocked_by_type'].items()) or 'by host'})"
+    )
+    terminalreporter.write_line(
+        f"{stats['cache_hits']} assets served from cache ({stats['bytes_from_cache'] / 1024:.0f} KiB), "
+        f"{stats['cache_revalidated']} revalidated, {stats['cache_misses']} misses"
+    )
@@ -0,0 +1,172 @@
+"""Pre-flight reachability checks, run once per run and shared by all xdist workers.
+
+The web app, the API and the auth endpoint are probed concurrently the first
+time a test needs one of them. Results go to .cache/preflight/<hosts>.json
+under a file lock; other workers (and runs within PREFLIGHT_TTL seconds) reuse
+them instead of probing again. A target counts as up when it answers at all,
+whatever the status code.
+
+Only tests that need a target that is down are skipped: `ui` needs the web app,
+`api` the API, `integration` both, and tests that log in through the API
+(api_credentials, tenant_context, parallel_branches) need the auth endpoint.
+Unmarked tests need the API, as before. Tests replaying a HAR archive, and `unit`
+tests of the harness itself, need nothing.
+"""
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+import requests
+
+from tests.support.config import CONNECTION_TIMEOUT, load_config
+from tests.support.har import har_mode
+from tests.support.locking import atomic_write_text, file_lock
+from tests.support.session_scope import session_scope
+
+
+PREFLIGHT_DIR = Path(__file__).parent.parent.parent / ".cache" / "preflight"
+PREFLIGHT_TTL = int(os.getenv("PREFLIGHT_TTL", "30"))  # seconds
+
+MARKER_PROBES = {
+    "api": ("api",),
+    "ui": ("web",),
+    "integration": ("web", "api"),
+}
+FIXTURE_PROBES = {
+    "api_credentials": ("auth",),
+    "tenant_context": ("auth",),
+    "fresh_api_login": ("auth",),
+    "parallel_branches": ("auth",),
+    "pooled_project": ("auth",),
+}
+DEFAULT_PROBES = ("api",)
+
+
+def probe(url, timeout=CONNECTION_TIMEOUT):
+    start = time.perf_counter()
+    try:
+        with session_scope():
+            response = requests.get(url, timeout=(timeout, timeout), allow_redirects=False)
+    except requests.exceptions.ConnectionError:
+        error = "unreachable"
+    except requests.exceptions.Timeout:
+        error = "timed out"
+    except requests.exceptions.RequestException as e:
+        # anything past the connection means the server is there
+        return {"url": url, "ok": True, "latency_ms": (time.perf_counter() - start) * 1000, "error": str(e)}
+    else:
+        return {
+            "url": url,
+            "ok": True,
+            "status": response.status_code,
+            "latency_ms": (time.perf_counter() - start) * 1000,
+        }
+    return {"url": url, "ok": False, "latency_ms": (time.perf_counter() - start) * 1000, "error": error}
+
+
+def probe_all(targets):
+    """Probe {name: url} concurrently; returns {name: result}."""
+    with ThreadPoolExecutor(max_workers=len(targets), thread_name_prefix="preflight") as pool:
+        futures = {name: pool.submit(probe, url) for name, url in targets.items()}
+        return {name: future.result() for name, future in futures.items()}
+
+
+class Preflight:
+
+    def __init__(self, targets, cache_dir=PREFLIGHT_DIR, ttl=PREFLIGHT_TTL):
+        self.targets = dict(targets)
+        key = hashlib.sha1(json.dumps(self.targets, sort_keys=True).encode()).hexdigest()[:10]
+        self.path = Path(cache_dir) / f"{key}.json"
+        self.ttl = ttl
+        self._results = None
+
+    @classmethod
+    def for_config(cls, workflowpro_config):
+        return cls({
+            "web": workflowpro_config.base_url,
+            "api": workflowpro_config.api_base_url,
+            "auth": workflowpro_config.api_base_url + workflowpro_config.endpoints["auth"]["login"],
+        })
+
+    def cached(self):
+        try:
+            if time.time() - self.path.stat().st_mtime < self.ttl:
+                return json.loads(self.path.read_text())
+        except (OSError, ValueError):
+            pass
+        return None
+
+    def results(self):
+        if self._results is None:
+            self._results = self.cached()
+        if self._results is None:
+            with file_lock(self.path.with_suffix(".lock")):
+                # another worker may have probed while we waited
+                self._results = self.cached()
+                if self._results is None:
+                    self._results = probe_all(self.targets)
+                    atomic_write_text(self.path, json.dumps(self._results, indent=2))
+        return self._results
+
+    def down(self, names):
+        results = self.results()
+        return [name for name in names if not results[name]["ok"]]
+
+
+def required_probes(item):
+    if item.get_closest_marker("unit"):
+        return []
+    names = set()
+    for marker, probes in MARKER_PROBES.items():
+        if item.get_closest_marker(marker):
+            names.update(probes)
+    if not names:
+        names.update(DEFAULT_PROBES)
+    for fixture, probes in FIXTURE_PROBES.items():
+        if fixture in item.fixturenames:
+            names.update(probes)
+    return sorted(names)
+
+
+# -----------------------------
+# pytest plugin
+# -----------------------------
+
+def _preflight(config):
+    if getattr(config, "_preflight", None) is None:
+        config._preflight = Preflight.for_config(load_config(config.getoption("--env")))
+    return config._preflight
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_runtest_setup(item):
+    if har_mode(item) == "replay":
+        return
+    preflight = _preflight(item.config)
+    down = preflight.down(required_probes(item))
+    if down:
+        results = preflight.results()
+        pytest.skip("; ".join(
+            f"{name} is {results[name]['error']} at {results[name]['url']}" for name in down
+        ))
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    if getattr(config, "_preflight", None) is None and hasattr(config, "_workflowpro_config"):
+        # under xdist only the workers probe; they left the results in the cache file
+        config._preflight = Preflight.for_config(config._workflowpro_config)
+    preflight = getattr(config, "_preflight", None)
+    results = preflight and (preflight._results or preflight.cached())
+    if not results:
+        return
+    terminalreporter.section("pre-flight checks")
+    for name, result in results.items():
+        state = f"HTTP {result['status']}" if "status" in result else result.get("error", "")
+        terminalreporter.write_line(
+            f"{name:5s} {'up' if result['ok'] else 'DOWN':5s} {result['latency_ms']:7.1f}ms  "
+            f"{state}  {result['url']}"
+        )
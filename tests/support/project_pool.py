@@ -0,0 +1,222 @@
+"""Pre-created projects leased to tests that only need "a project that exists".
+
+Each worker keeps PROJECT_POOL_SIZE projects per test user ready, created
+concurrently in the background as soon as the pool is first used (users listed
+in PROJECT_POOL_USERS are filled at session start). A lease pops one off an
+in-memory queue; when a queue runs down to PROJECT_POOL_LOW it is topped up in
+the background.
+
+After the test the project is checked off the test's critical path: if its
+name, description or status changed it is put back the way it was created, and
+if it is gone, or can't be put back, it is dropped (and deleted). Tests that
+delete or otherwise ruin their project lease it with destructive=True so it is
+never handed out again. Whatever the pool still holds at the end goes to the
+resource ledger for cleanup.
+
+    def test_x(pooled_project):
+        project = pooled_project("tenant_a_admin")
+"""
+import itertools
+import os
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from tests.support.api_client import API_CONCURRENCY
+from tests.support.ledger import DELETED_STATUSES
+from tests.support.scheduling import note_tenant
+from tests.support.session_scope import session_scope
+
+
+PROJECT_POOL_SIZE = int(os.getenv("PROJECT_POOL_SIZE", "4"))  # per test user, per worker
+PROJECT_POOL_LOW = int(os.getenv("PROJECT_POOL_LOW", "1"))  # refill when this few are left
+PROJECT_POOL_USERS = [u.strip() for u in os.getenv("PROJECT_POOL_USERS", "tenant_a_admin").split(",") if u.strip()]
+LEASE_TIMEOUT = 30  # seconds to wait for a project when the pool is empty
+
+RESET_FIELDS = ("name", "description", "status")
+
+
+class ProjectPoolError(AssertionError):
+    pass
+
+
+class ProjectPool:
+
+    def __init__(self, client, credentials, template, size=PROJECT_POOL_SIZE, low_water=PROJECT_POOL_LOW,
+                 workers=API_CONCURRENCY):
+        self.client = client
+        # user_key -> (token, tenant_id); asked again for every request, like the ledger does,
+        # so an expired login is renewed by the auth cache instead of failing every lease
+        self.credentials = credentials
+        self.template = dict(template)
+        self.size = size
+        self.low_water = low_water
+        self.lock = threading.Condition()
+        self.available = {}  # user_key -> deque of projects ready to lease
+        self.pending = {}  # user_key -> projects being created or checked
+        self.owned = {}  # project id -> (user_key, fields as created)
+        self.errors = {}  # user_key -> why the last creation failed
+        self.serial = itertools.count(1)
+        self.stats = {"leased": 0, "waited": 0, "created": 0, "reset": 0, "dropped": 0}
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="project-pool")
+
+    def prefill(self, user_key):
+        self.credentials(user_key)  # a login that fails does so here, not in the background
+        with self.lock:
+            self._refill(user_key)
+
+    def lease(self, user_key, timeout=LEASE_TIMEOUT):
+        """A project owned by `user_key`'s tenant, as it was created."""
+        note_tenant(user_key)
+        self.credentials(user_key)
+        with self.lock:
+            queue = self.available.setdefault(user_key, deque())
+            if not queue:
+                self.stats["waited"] += 1
+                self.errors.pop(user_key, None)
+                self._refill(user_key, at_least=1)
+                self.lock.wait_for(
+                    lambda: queue or (user_key in self.errors and not self.pending.get(user_key)), timeout
+                )
+                if not queue:
+                    raise ProjectPoolError(
+                        f"No pooled project for {user_key}: {self.errors.get(user_key, 'timed out')}"
+                    )
+            project = queue.popleft()
+            self.stats["leased"] += 1
+            self._refill(user_key)
+        return dict(project)
+
+    def release(self, user_key, project_id, destroy=False):
+        """Hand a leased project back; it is checked and reset in the background."""
+        with self.lock:
+            self.pending[user_key] = self.pending.get(user_key, 0) + 1
+        self.executor.submit(self._in_background, self._settle, user_key, project_id, destroy)
+
+    def close(self):
+        """Stop background work; returns {project id: user_key} still held by the pool.
+
+        Creates and settles still queued are cancelled, not run. A cancelled settle
+        leaves its project in `owned` (only a successful drop removes it), which is
+        what hands it to the ledger here; `pending` is reset since it no longer adds up.
+        """
+        self.executor.shutdown(wait=True, cancel_futures=True)
+        with self.lock:
+            self.pending.clear()
+            return {project_id: user_key for project_id, (user_key, _) in self.owned.items()}
+
+    def _tenant(self, user_key):
+        return self.client.as_tenant(*self.credentials(user_key))
+
+    def _refill(self, user_key, at_least=0):
+        # called with self.lock held
+        have = len(self.available.setdefault(user_key, deque())) + self.pending.get(user_key, 0)
+        missing = self.size - have if have <= self.low_water else 0
+        for _ in range(max(missing, at_least - have)):
+            self.pending[user_key] = self.pending.get(user_key, 0) + 1
+            self.executor.submit(self._in_background, self._create, user_key)
+
+    @staticmethod
+    def _in_background(work, *args):
+        # pool traffic serves later tests, not the one running meanwhile: keep it out of its
+        # HAR archive, timing spans and HTTP stats
+        with session_scope(background=True):
+            work(*args)
+
+    def _create(self, user_key):
+        project = None
+        try:
+            data = {**self.template, "name": f"{self.template['name']} [pool {next(self.serial)}]"}
+            response = self._tenant(user_key).post("projects", "create", json=data)
+            if response.status_code == 201:
+                project = response.json()
+            else:
+                error = f"create returned {response.status_code}"
+        except Exception as e:
+            error = str(e)
+        with self.lock:
+            self.pending[user_key] -= 1
+            if project is None:
+                self.errors[user_key] = error
+            else:
+                self.owned[project["id"]] = (user_key, {f: project.get(f) for f in RESET_FIELDS})
+                self.available[user_key].append(project)
+                self.stats["created"] += 1
+            self.lock.notify_all()
+
+    def _settle(self, user_key, project_id, destroy):
+        project = None
+        try:
+            if not destroy:
+                project = self._restore(user_key, project_id)
+            if project is None:
+                self._drop(user_key, project_id)
+        except Exception:
+            project = None  # left in self.owned, so the ledger cleans it up
+        with self.lock:
+            self.pending[user_key] -= 1
+            if project is not None:
+                self.available[user_key].append(project)
+            else:
+                self.stats["dropped"] += 1
+            self._refill(user_key)
+            self.lock.notify_all()
+
+    def _restore(self, user_key, project_id):
+        """The project as created, resetting it if needed; None when it can't be reused."""
+        tenant = self._tenant(user_key)
+        known = self.owned[project_id][1]
+        response = tenant.get("projects", "get", path_params={"id": project_id})
+        if response.status_code != 200:
+            return None
+        current = response.json()
+        if all(current.get(f) == known[f] for f in RESET_FIELDS):
+            return current
+        response = tenant.put("projects", "update", path_params={"id": project_id}, json=known)
+        if response.status_code != 200 or any(response.json().get(f) != known[f] for f in RESET_FIELDS):
+            return None
+        with self.lock:
+            self.stats["reset"] += 1
+        return response.json()
+
+    def _drop(self, user_key, project_id):
+        response = self._tenant(user_key).delete("projects", "delete", path_params={"id": project_id})
+        if response.status_code in DELETED_STATUSES:
+            with self.lock:
+                self.owned.pop(project_id, None)
+
+
+# -----------------------------
+# pytest plugin
+# -----------------------------
+
+@pytest.fixture(scope="session")
+def project_pool(api_client, api_credentials, test_data, _session_ledger):
+    pool = ProjectPool(api_client, api_credentials, test_data["test_projects"]["valid_project_1"])
+    for user_key in PROJECT_POOL_USERS:
+        pool.prefill(user_key)
+    yield pool
+    for project_id, user_key in pool.close().items():
+        _session_ledger.record("projects", project_id, user_key)
+
+
+@pytest.fixture
+def pooled_project(project_pool):
+    """Factory for an existing project of a test user, leased from the pool.
+
+        project = pooled_project("tenant_a_admin")
+        project = pooled_project("tenant_a_admin", destructive=True)  # the test deletes it
+    """
+    leased = []
+
+    def _lease(user_key, destructive=False):
+        project = project_pool.lease(user_key)
+        leased.append((user_key, project["id"], destructive))
+        return project
+
+    yield _lease
+
+    for user_key, project_id, destructive in leased:
+        project_pool.release(user_key, project_id, destroy=destructive)
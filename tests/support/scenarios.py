@@ -0,0 +1,51 @@
+"""Project API flows shared by TestProjectAPI and the load runner.
+
+Each scenario drives tenant-scoped WorkflowProClient views and raises
+AssertionError when the API misbehaves, so the functional tests and the load
+mode check exactly the same things.
+"""
+from tests.support.listing import iter_projects
+
+
+class IsolationViolation(AssertionError):
+    """A tenant could see or touch another tenant's resource."""
+
+
+def create_project(tenant, project_data):
+    response = tenant.post("projects", "create", json=project_data)
+
+    assert response.status_code == 201, f"Expected 201 but got {response.status_code}"
+
+    response_data = response.json()
+    assert "id" in response_data, "Response should contain project id"
+    assert response_data["name"] == project_data["name"]
+    return response_data
+
+
+def list_projects(tenant):
+    """Stream the whole listing page by page; returns how many projects it had."""
+    count = 0
+    for project in iter_projects(tenant):
+        assert project.id, f"Listed project without an id: {project}"
+        count += 1
+    return count
+
+
+def get_project_as_other_tenant(other_tenant, project_id):
+    response = other_tenant.get("projects", "get", path_params={"id": project_id})
+
+    if response.status_code not in [403, 404]:
+        raise IsolationViolation(
+            f"Tenant B should not access Tenant A's project. Got {response.status_code}"
+        )
+
+
+def delete_project(tenant, project_id):
+    delete_response = tenant.delete("projects", "delete", path_params={"id": project_id})
+
+    assert delete_response.status_code in [200, 204], \
+        f"Delete failed with status {delete_response.status_code}"
+
+    get_response = tenant.get("projects", "get", path_params={"id": project_id})
+
+    assert get_response.status_code == 404, "Deleted project should return 404"
@@ -0,0 +1,289 @@
+"""Duration-aware pytest-xdist scheduling with tenant affinity.
+
+Every run records per-test durations (setup + call + teardown) and the tenant
+users each test logged in as into .cache/durations.json. With `-n N` the next
+run hands tests out longest-first from that history, a couple at a time, so the
+slow integration tests start early and short ones fill the gaps at the end.
+Among tests of about the same length, a worker is given one that uses a tenant
+it has already logged in as, so pooled contexts and logins are reused.
+
+The predicted makespan (longest-first over the history) and the actual busy time
+per worker are written to reports/schedule.json and the terminal summary.
+Turn it off with --no-duration-schedule (plain `--dist load`).
+"""
+import heapq
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from tests.support.locking import atomic_write_text, file_lock
+from tests.support.session_scope import in_background
+
+
+DURATIONS_PATH = Path(__file__).parent.parent.parent / ".cache" / "durations.json"
+SCHEDULE_REPORT_PATH = Path(__file__).parent.parent.parent / "reports" / "schedule.json"
+
+DEFAULT_DURATION = 1.0  # seconds, for tests with no history at all
+HISTORY_WEIGHT = 0.5  # weight of the newest run in the moving average
+PREFETCH = 2  # tests queued per worker; xdist needs the next one to plan teardown
+AFFINITY_SLACK = 0.2  # a same-tenant test may be up to 20% shorter than the longest pending
+
+_current = None  # nodeid of the test running in this process
+_tenants = {}  # nodeid -> user keys it logged in as
+_tenants_lock = threading.Lock()
+
+RESULTS = {}  # nodeid -> (seconds over all phases, tenants)
+WORKER_BUSY = {}  # xdist worker id -> seconds spent in tests
+SKIPPED = set()  # their near-zero durations would skew the history
+
+
+def note_tenant(user_key):
+    """Remember that the running test logged in as `user_key` (for affinity).
+
+    Background work, like the project pool refilling for later tests, is left out.
+    """
+    if in_background():
+        return
+    with _tenants_lock:
+        if _current is not None:
+            _tenants.setdefault(_current, set()).add(user_key)
+
+
+class DurationHistory:
+
+    def __init__(self, tests=None):
+        self.tests = tests or {}  # nodeid -> {"duration", "runs", "tenants"}
+
+    @classmethod
+    def load(cls, path=DURATIONS_PATH):
+        try:
+            return cls(json.loads(Path(path).read_text()))
+        except (OSError, ValueError):
+            return cls()
+
+    def predict(self, nodeid):
+        entry = self.tests.get(nodeid)
+        if entry:
+            return entry["duration"]
+        if self.tests:
+            return sum(e["duration"] for e in self.tests.values()) / len(self.tests)
+        return DEFAULT_DURATION
+
+    def tenants(self, nodeid):
+        return set(self.tests.get(nodeid, {}).get("tenants", ()))
+
+    def update(self, results):
+        for nodeid, (duration, tenants) in results.items():
+            entry = self.tests.get(nodeid)
+            if entry is None:
+                self.tests[nodeid] = {"duration": duration, "runs": 1, "tenants": sorted(tenants)}
+                continue
+            entry["duration"] = HISTORY_WEIGHT * duration + (1 - HISTORY_WEIGHT) * entry["duration"]
+            entry["runs"] += 1
+            entry["tenants"] = sorted(tenants)
+
+    def save(self, path=DURATIONS_PATH):
+        path = Path(path)
+        with file_lock(path.with_suffix(".lock")):
+            # another run may have finished meanwhile; keep its entries
+            merged = DurationHistory.load(path)
+            merged.tests.update(self.tests)
+            atomic_write_text(path, json.dumps(merged.tests, indent=1, sort_keys=True))
+
+
+def longest_first_makespan(durations, workers):
+    """Makespan and per-worker load of greedy longest-first over `workers` workers."""
+    loads = [(0.0, index) for index in range(workers)]
+    for duration in sorted(durations, reverse=True):
+        load, index = heapq.heappop(loads)
+        heapq.heappush(loads, (load + duration, index))
+    per_worker = sorted(load for load, _ in loads)
+    return (per_worker[-1] if per_worker else 0.0), per_worker
+
+
+def make_scheduler_class():
+    # imported lazily: xdist is only needed when running with -n
+    from xdist.scheduler import LoadScheduling
+
+    class DurationScheduling(LoadScheduling):
+        """LoadScheduling that sends the longest pending test first, preferring tenant affinity."""
+
+        def __init__(self, config, log=None, history=None):
+            super().__init__(config, log)
+            self.history = history or DurationHistory.load()
+            self.predicted = []
+            self.node_tenants = {}
+
+        def schedule(self):
+            assert self.collection_is_completed
+
+            if self.collection is not None:
+                for node in self.nodes:
+                    self.check_schedule(node)
+                return
+
+            if not self._check_nodes_have_same_collection():
+                self.log("**Different tests collected, aborting run**")
+                return
+
+            self.collection = list(self.node2collection.values())[0]
+            self.predicted = [self.history.predict(nodeid) for nodeid in self.collection]
+            self.pending[:] = sorted(range(len(self.collection)), key=lambda i: -self.predicted[i])
+            if not self.collection:
+                return
+
+            makespan, per_worker = longest_first_makespan(self.predicted, len(self.nodes))
+            self.config._schedule_plan = {
+                "workers": len(self.nodes),
+                "predicted_makespan_s": makespan,
+                "predicted_per_worker_s": per_worker,
+                "predicted_total_s": sum(self.predicted),
+            }
+
+            for node in self.nodes:
+                self._send_tests(node, PREFETCH)
+            if not self.pending:
+                for node in self.nodes:
+                    node.shutdown()
+
+        def check_schedule(self, node, duration=0):
+            if node.shutting_down:
+                return
+            if self.pending:
+                missing = PREFETCH - len(self.node2pending[node])
+                if missing > 0:
+                    self._send_tests(node, missing)
+            else:
+                node.shutdown()
+            self.log("num items waiting for node:", len(self.pending))
+
+        def mark_test_pending(self, item):
+            super().mark_test_pending(item)
+            self.pending.sort(key=lambda i: -self.predicted[i])
+
+        def _send_tests(self, node, num):
+            chosen = [self._take_for(node) for _ in range(min(num, len(self.pending)))]
+            if chosen:
+                self.node2pending[node].extend(chosen)
+                node.send_runtest_some(chosen)
+
+        def _take_for(self, node):
+            tenants = self.node_tenants.setdefault(node, set())
+            threshold = self.predicted[self.pending[0]] * (1 - AFFINITY_SLACK)
+            position = 0
+            if tenants:
+                for i, index in enumerate(self.pending):
+                    if self.predicted[index] < threshold:
+                        break
+                    if self.history.tenants(self.collection[index]) & tenants:
+                        position = i
+                        break
+            index = self.pending.pop(position)
+            tenants.update(self.history.tenants(self.collection[index]))
+            return index
+
+    return DurationScheduling
+
+
+# -----------------------------
+# pytest plugin
+# -----------------------------
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--no-duration-schedule",
+        action="store_true",
+        default=os.getenv("DURATION_SCHEDULE", "1") == "0",
+        help="with -n, use plain xdist load distribution instead of longest-first from history",
+    )
+
+
+def pytest_configure(config):
+    config._schedule_plan = None
+    config._schedule_started = time.monotonic()
+
+
+@pytest.hookimpl(tryfirst=True, optionalhook=True)
+def pytest_xdist_make_scheduler(config, log):
+    if config.getoption("--no-duration-schedule") or config.getvalue("dist") != "load":
+        return None
+    return make_scheduler_class()(config, log)
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_protocol(item, nextitem):
+    global _current
+    with _tenants_lock:
+        _current = item.nodeid
+        _tenants.pop(item.nodeid, None)
+    try:
+        yield
+    finally:
+        with _tenants_lock:
+            _current = None
+            _tenants.pop(item.nodeid, None)
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    outcome = yield
+    if call.when == "teardown":
+        report = outcome.get_result()
+        with _tenants_lock:
+            tenants = sorted(_tenants.get(item.nodeid, ()))
+        # user_properties travel with the report from xdist workers to the controller; the
+        # report shares the item's list, so attach a copy to this report only
+        report.user_properties = [*report.user_properties, ("tenants", tenants)]
+
+
+def pytest_runtest_logreport(report):
+    # on the controller these are the reports forwarded by the workers
+    duration, tenants = RESULTS.get(report.nodeid, (0.0, set()))
+    for name, value in report.user_properties:
+        if name == "tenants":
+            tenants = set(value)
+    RESULTS[report.nodeid] = (duration + report.duration, tenants)
+    if report.skipped:
+        SKIPPED.add(report.nodeid)
+    node = getattr(report, "node", None)
+    worker = node.gateway.id if node is not None else "main"
+    WORKER_BUSY[worker] = WORKER_BUSY.get(worker, 0.0) + report.duration
+
+
+def pytest_sessionfinish(session):
+    config = session.config
+    if hasattr(config, "workerinput") or not RESULTS:
+        return
+    history = DurationHistory.load()
+    history.update({nodeid: result for nodeid, result in RESULTS.items() if nodeid not in SKIPPED})
+    history.save()
+
+    plan = config._schedule_plan
+    if plan is None:
+        return
+    busy = WORKER_BUSY
+    config._schedule_report = {
+        **plan,
+        "actual_makespan_s": max(busy.values()) if busy else 0.0,
+        "actual_per_worker_s": dict(sorted(busy.items())),
+        "wall_clock_s": time.monotonic() - config._schedule_started,
+    }
+    atomic_write_text(SCHEDULE_REPORT_PATH, json.dumps(config._schedule_report, indent=2))
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    report = getattr(config, "_schedule_report", None)
+    if not report:
+        return
+    terminalreporter.section("xdist schedule")
+    terminalreporter.write_line(
+        f"predicted makespan {report['predicted_makespan_s']:.1f}s, "
+        f"actual {report['actual_makespan_s']:.1f}s over {report['workers']} workers "
+        f"(wall clock {report['wall_clock_s']:.1f}s)"
+    )
+    for worker, busy in report["actual_per_worker_s"].items():
+        terminalreporter.write_line(f"  {worker}: {busy:.1f}s busy")
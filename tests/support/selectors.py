@@ -0,0 +1,159 @@
+"""Resolve a group of fallback selectors in one wait, learning which one wins.
+
+All candidates are combined with `Locator.or_()` so Playwright waits for
+whichever appears first, instead of spending a timeout on each miss in turn.
+The winning candidate is counted per page path and selector group in
+`.cache/selectors.json` (shared by xdist workers) and tried first next time;
+candidates that never win are listed at the end of the run. Each wait is
+added to the eventual consistency waits in WAIT_LOG.
+"""
+import json
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING
+from urllib.parse import urlparse
+
+import pytest
+
+from tests.support.locking import atomic_write_text, file_lock
+from tests.support.waiting import record_wait
+
+if TYPE_CHECKING:
+    from playwright.sync_api import Locator, Page
+
+
+SELECTOR_CACHE_PATH = Path(__file__).parent.parent.parent / ".cache" / "selectors.json"
+DEAD_AFTER_RESOLUTIONS = 5  # resolutions of a group before unused candidates count as dead
+
+
+class SelectorResolver:
+
+    def __init__(self, cache_path=SELECTOR_CACHE_PATH):
+        self.cache_path = Path(cache_path)
+        self.learned = self._load()
+        self.session_wins = {}
+
+    def resolve(self, page: "Page", group: str, candidates, timeout=10000, state="visible") -> "Locator":
+        """Wait once for any candidate and return a locator for the one that matched."""
+        key = self._key(page, group)
+        order = self._order(key, candidates)
+
+        combined = page.locator(candidates[order[0]])
+        for index in order[1:]:
+            combined = combined.or_(page.locator(candidates[index]))
+        start = time.monotonic()
+        try:
+            combined.first.wait_for(state=state, timeout=timeout)
+        except Exception:
+            record_wait(f"{group} {state}", time.monotonic() - start, succeeded=False)
+            raise
+        record_wait(f"{group} {state}", time.monotonic() - start)
+
+        for index in order:
+            locator = page.locator(candidates[index]).first
+            if locator.is_visible() or (state != "visible" and locator.count()):
+                self._win(key, index, candidates)
+                return locator
+        # matched element went away between the wait and the check
+        return combined.first
+
+    async def resolve_async(self, page, group: str, candidates, timeout=10000, state="visible"):
+        """resolve() for async API pages (parallel branches)."""
+        key = self._key(page, group)
+        order = self._order(key, candidates)
+
+        combined = page.locator(candidates[order[0]])
+        for index in order[1:]:
+            combined = combined.or_(page.locator(candidates[index]))
+        start = time.monotonic()
+        try:
+            await combined.first.wait_for(state=state, timeout=timeout)
+        except Exception:
+            record_wait(f"{group} {state}", time.monotonic() - start, succeeded=False)
+            raise
+        record_wait(f"{group} {state}", time.monotonic() - start)
+
+        for index in order:
+            locator = page.locator(candidates[index]).first
+            if await locator.is_visible() or (state != "visible" and await locator.count()):
+                self._win(key, index, candidates)
+                return locator
+        return combined.first
+
+    def is_any_visible(self, page: "Page", candidates) -> bool:
+        """Check every candidate at once without waiting."""
+        combined = page.locator(candidates[0])
+        for candidate in candidates[1:]:
+            combined = combined.or_(page.locator(candidate))
+        return combined.first.is_visible()
+
+    async def is_any_visible_async(self, page, candidates) -> bool:
+        combined = page.locator(candidates[0])
+        for candidate in candidates[1:]:
+            combined = combined.or_(page.locator(candidate))
+        return await combined.first.is_visible()
+
+    def save(self):
+        """Merge this process's wins into the shared cache file."""
+        if not self.session_wins:
+            return
+        with file_lock(self.cache_path.with_suffix(".lock")):
+            learned = self._load()
+            for key, entry in self.session_wins.items():
+                stored = learned.setdefault(key, {"wins": {}, "candidates": entry["candidates"]})
+                stored["candidates"] = entry["candidates"]
+                for index, count in entry["wins"].items():
+                    stored["wins"][index] = stored["wins"].get(index, 0) + count
+            atomic_write_text(self.cache_path, json.dumps(learned, indent=2, sort_keys=True))
+        self.learned = learned
+        self.session_wins = {}
+
+    def dead_candidates(self):
+        """Candidates that have never matched although their group resolved repeatedly."""
+        dead = []
+        for key, entry in sorted(self._load().items()):
+            if sum(entry["wins"].values()) < DEAD_AFTER_RESOLUTIONS:
+                continue
+            for index, candidate in enumerate(entry["candidates"]):
+                if not entry["wins"].get(str(index)):
+                    dead.append((key, candidate))
+        return dead
+
+    def _key(self, page, group):
+        return f"{urlparse(page.url).path or '/'}::{group}"
+
+    def _order(self, key, candidates):
+        # indexes rather than selector strings, since candidates may embed ids or names
+        wins = self.learned.get(key, {}).get("wins", {})
+        return sorted(range(len(candidates)), key=lambda i: -wins.get(str(i), 0))
+
+    def _win(self, key, index, candidates):
+        entry = self.session_wins.setdefault(key, {"wins": {}, "candidates": list(candidates)})
+        entry["wins"][str(index)] = entry["wins"].get(str(index), 0) + 1
+
+    def _load(self):
+        if not self.cache_path.exists():
+            return {}
+        return json.loads(self.cache_path.read_text())
+
+
+# -----------------------------
+# pytest plugin
+# -----------------------------
+
+@pytest.fixture(scope="session")
+def selector_resolver():
+    resolver = SelectorResolver()
+    yield resolver
+    resolver.save()
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    if hasattr(config, "workerinput"):
+        return
+    dead = SelectorResolver().dead_candidates()
+    if not dead:
+        return
+    terminalreporter.section("selectors that never matched")
+    for key, candidate in dead:
+        terminalreporter.write_line(f"{key}: {candidate}")
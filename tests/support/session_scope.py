@@ -0,0 +1,37 @@
+"""Mark work done for the whole session rather than for the running test.
+
+Cached logins, pre-flight probes and project pool fills run while some test is
+in progress (or on a background thread), but they belong to every test that
+comes after, not to the one that happened to trigger them. Per-test recorders
+check `in_session_scope()` to keep that traffic out of the test's own record.
+Work no test waits for at all, like the project pool's own threads, is also
+marked `background`; timing and HTTP stats leave that out too.
+
+    with session_scope():
+        login_via_api(...)
+"""
+import threading
+from contextlib import contextmanager
+
+
+_state = threading.local()
+
+
+@contextmanager
+def session_scope(background=False):
+    """Everything this thread does inside the block is session-wide work."""
+    previous = in_session_scope(), in_background()
+    _state.active = True
+    _state.background = background or previous[1]
+    try:
+        yield
+    finally:
+        _state.active, _state.background = previous
+
+
+def in_session_scope():
+    return getattr(_state, "active", False)
+
+
+def in_background():
+    return getattr(_state, "background", False)
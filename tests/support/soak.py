@@ -0,0 +1,482 @@
+"""Soak mode: repeat harness flows at a steady pace for hours and watch what grows.
+
+    python -m tests.support.soak --duration 3600
+    python -m tests.support.soak --target local --flows create_delete,api_login --duration 600 --interval 1
+
+Each flow runs on its own thread, started every --interval seconds (an
+iteration that overruns starts the next one right away and counts as late):
+
+    create_delete  the API create/delete cycle, with credentials from the auth
+                   state cache, so expired tokens and re-logins are part of it
+    api_login      a fresh API login (login + 2FA) each time
+    ui_login       the login form flow of TestRobustLogin.test_user_login, on a
+                   pooled browser context like robust_context
+
+Every --sample-every seconds a sample records RSS of this process and of the
+browser processes under it, open file descriptors and sockets, threads, and per
+flow the iterations, errors and p50/p95 latency since the previous sample. The
+time series is rewritten to reports/soak/ after every sample, so an interrupted
+run (Ctrl-C stops it cleanly) still leaves its data.
+
+At the end, each metric is checked for sustained growth: after the warm-up, the
+medians of the first, middle and last third of the samples must rise in order,
+and the last third must be above the first by more than the metric's relative
+and absolute allowance (GROWTH_LIMITS). Error rates are flagged when the last
+third fails noticeably more often than the first. Any flag makes the exit code 1.
+A flow whose setup fails (ui_login without an installed browser, say) is left
+out and listed under setup_errors; the run exits 2 only if no flow could start.
+Process metrics are read from /proc, so they are only sampled on Linux.
+"""
+import argparse
+import json
+import os
+import signal
+import statistics
+import threading
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+
+from tests.support import scenarios
+from tests.support.api_client import WorkflowProClient, create_retry_session
+from tests.support.api_login import login_via_api
+from tests.support.auth_cache import AuthStateCache
+from tests.support.config import DEFAULT_ENV, ROOT_DIR, load_config, resolve_user
+from tests.support.locking import atomic_write_text
+from tests.support.stub_server import start_local_stub
+
+
+REPORT_DIR = ROOT_DIR / "reports" / "soak"
+AUTH_DIR = ROOT_DIR / ".cache" / "soak" / "auth"
+
+SOAK_INTERVAL = float(os.getenv("SOAK_INTERVAL", "5"))  # seconds between iterations of a flow
+SOAK_SAMPLE_EVERY = float(os.getenv("SOAK_SAMPLE_EVERY", "30"))  # seconds between samples
+SOAK_WARMUP = 0.2  # share of the samples left out of trend checks while caches and pools fill up
+MIN_TREND_SAMPLES = 6
+
+# metric -> (relative, absolute) growth from the first to the last third that counts as a leak
+GROWTH_LIMITS = {
+    "rss_kb": (0.10, 10 * 1024),
+    "browser_rss_kb": (0.15, 50 * 1024),
+    "browser_processes": (0.5, 2),
+    "open_fds": (0.2, 10),
+    "open_sockets": (0.5, 5),
+    "threads": (0.5, 3),
+    "p50_ms": (0.25, 20),
+}
+ERROR_RATE_DRIFT = 0.02  # last third failing this much more often than the first third
+MAX_ERROR_MESSAGES = 20
+
+
+# -----------------------------
+# process metrics (/proc)
+# -----------------------------
+
+def _status_kb(pid, field="VmRSS"):
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return 0
+
+
+def descendants(pid):
+    """Pids of all processes under `pid` (the Playwright driver and the browsers it started)."""
+    children = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                # the command name may contain spaces; ppid is the second field after it
+                ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        children.setdefault(ppid, []).append(int(entry))
+    found, pending = [], [pid]
+    while pending:
+        for child in children.get(pending.pop(), ()):
+            found.append(child)
+            pending.append(child)
+    return found
+
+
+def process_metrics(pid=None):
+    """RSS, browser RSS, fds, sockets and threads of this process; empty where /proc is missing."""
+    pid = pid or os.getpid()
+    if not os.path.isdir(f"/proc/{pid}"):
+        return {"threads": threading.active_count()}
+    fds = os.listdir(f"/proc/{pid}/fd")
+    sockets = 0
+    for fd in fds:
+        try:
+            sockets += os.readlink(f"/proc/{pid}/fd/{fd}").startswith("socket:")
+        except OSError:
+            pass  # closed while we looked
+    children = descendants(pid)
+    return {
+        "rss_kb": _status_kb(pid),
+        "browser_rss_kb": sum(_status_kb(child) for child in children),
+        "browser_processes": len(children),
+        "open_fds": len(fds),
+        "open_sockets": sockets,
+        "threads": threading.active_count(),
+    }
+
+
+# -----------------------------
+# flows
+# -----------------------------
+
+class Flow(ABC):
+    """One repeated harness flow; setup/teardown run on the flow's own thread."""
+
+    def __init__(self, soak):
+        self.soak = soak
+
+    def setup(self):
+        pass
+
+    @abstractmethod
+    def run(self):
+        """One iteration; raising counts it as an error."""
+
+    def teardown(self):
+        pass
+
+
+class CreateDeleteFlow(Flow):
+
+    def run(self):
+        tenant = self.soak.client.as_tenant(*self.soak.auth_cache.credentials("tenant_a_admin"))
+        project = scenarios.create_project(tenant, {
+            "name": f"Soak Project {time.monotonic_ns()}",
+            "description": "soak run",
+        })
+        scenarios.delete_project(tenant, project["id"])
+
+
+class ApiLoginFlow(Flow):
+
+    def run(self):
+        config = self.soak.config
+        login_via_api(config.api_base_url, config.endpoints, resolve_user(config.data, "tenant_a_member"))
+
+
+class UiLoginFlow(Flow):
+
+    def setup(self):
+        # Playwright's sync API stays on the thread that started it
+        from playwright.sync_api import sync_playwright
+
+        from tests.support.context_pool import ContextPool
+
+        self.playwright = sync_playwright().start()
+        try:
+            self.browser = self.playwright.chromium.launch(headless=os.getenv("HEADLESS", "true") != "false")
+        except Exception:
+            self.playwright.stop()
+            raise
+        self.pool = ContextPool(self.browser)
+
+    def run(self):
+        from tests.support.ui_login import login_via_ui
+        from tests.ui.login_test import ROBUST_CONTEXT_ARGS
+
+        config = self.soak.config
+        context = self.pool.lease(**ROBUST_CONTEXT_ARGS)
+        try:
+            login_via_ui(context.pages[0], resolve_user(config.data, "tenant_a_member"),
+                         config.selectors["login"], config.base_url)
+        finally:
+            self.pool.release(context)
+
+    def teardown(self):
+        self.pool.close()
+        self.browser.close()
+        self.playwright.stop()
+
+
+FLOWS = {
+    "create_delete": CreateDeleteFlow,
+    "api_login": ApiLoginFlow,
+    "ui_login": UiLoginFlow,
+}
+
+
+# -----------------------------
+# trend checks
+# -----------------------------
+
+def growth(values, relative, absolute, warmup=SOAK_WARMUP):
+    """Median of the first/middle/last third after warm-up; a dict with `growing` set."""
+    values = [v for v in values[int(len(values) * warmup):] if v is not None]
+    if len(values) < MIN_TREND_SAMPLES:
+        return None
+    third = len(values) // 3
+    first, middle, last = (statistics.median(part) for part in (
+        values[:third], values[third:len(values) - third], values[len(values) - third:],
+    ))
+    rise = last - first
+    return {
+        "first": first,
+        "middle": middle,
+        "last": last,
+        "growing": first <= middle <= last and rise > max(relative * first, absolute),
+    }
+
+
+def slope_per_hour(points):
+    """Least-squares slope of (seconds, value) points, in value per hour."""
+    points = [(t, v) for t, v in points if v is not None]
+    if len(points) < 2:
+        return None
+    mean_t = sum(t for t, _ in points) / len(points)
+    mean_v = sum(v for _, v in points) / len(points)
+    spread = sum((t - mean_t) ** 2 for t, _ in points)
+    if not spread:
+        return None
+    return sum((t - mean_t) * (v - mean_v) for t, v in points) / spread * 3600
+
+
+def trends(samples, flows, warmup=SOAK_WARMUP):
+    """{series: trend} for process metrics and per-flow latency and error rate, plus the flags."""
+    series = {metric: [(s["elapsed_s"], s.get(metric)) for s in samples] for metric in GROWTH_LIMITS
+              if metric != "p50_ms"}
+    for name in flows:
+        series[f"{name}.p50_ms"] = [(s["elapsed_s"], s["flows"][name]["p50_ms"]) for s in samples]
+
+    found, flags = {}, []
+    for key, points in series.items():
+        relative, absolute = GROWTH_LIMITS[key.rsplit(".", 1)[-1]]
+        result = growth([v for _, v in points], relative, absolute, warmup)
+        if result is None:
+            continue
+        result["per_hour"] = slope_per_hour(points[int(len(points) * warmup):])
+        found[key] = result
+        if result["growing"]:
+            flags.append(f"{key} keeps growing: {result['first']:.0f} -> {result['middle']:.0f} "
+                         f"-> {result['last']:.0f}")
+
+    for name in flows:
+        windows = [s["flows"][name] for s in samples][int(len(samples) * warmup):]
+        if len(windows) < MIN_TREND_SAMPLES:
+            continue
+        third = len(windows) // 3
+        first, last = _error_rate(windows[:third]), _error_rate(windows[-third:])
+        found[f"{name}.error_rate"] = {"first": first, "last": last, "growing": last - first > ERROR_RATE_DRIFT}
+        if last - first > ERROR_RATE_DRIFT:
+            flags.append(f"{name} error rate rose from {first:.1%} to {last:.1%}")
+    return found, flags
+
+
+def _error_rate(windows):
+    runs = sum(w["runs"] for w in windows)
+    return sum(w["errors"] for w in windows) / runs if runs else 0.0
+
+
+# -----------------------------
+# runner
+# -----------------------------
+
+class SoakRun:
+
+    def __init__(self, config, flows, duration, interval=SOAK_INTERVAL, sample_every=SOAK_SAMPLE_EVERY,
+                 output=None, auth_dir=AUTH_DIR):
+        self.config = config
+        self.flow_names = list(flows)
+        self.duration = duration
+        self.interval = interval
+        self.sample_every = sample_every
+        self.output = output
+        self.client = WorkflowProClient(config.api_base_url, config.endpoints, session=create_retry_session())
+        self.auth_cache = AuthStateCache(auth_dir, config.data, config.base_url, api_base_url=config.api_base_url)
+        self.stopping = threading.Event()
+        self.lock = threading.Lock()
+        self.windows = {name: self._window() for name in self.flow_names}
+        self.totals = {name: {"runs": 0, "errors": 0, "late": 0} for name in self.flow_names}
+        self.errors = []
+        self.setup_errors = {}
+        self.samples = []
+        self.started = None
+
+    @staticmethod
+    def _window():
+        return {"latencies_ms": [], "errors": 0}
+
+    def run(self):
+        self.started = time.monotonic()
+        ready = {name: threading.Event() for name in self.flow_names}
+        threads = [
+            threading.Thread(target=self._pace, args=(name, ready[name]), name=f"soak-{name}", daemon=True)
+            for name in self.flow_names
+        ]
+        for thread in threads:
+            thread.start()
+        for event in ready.values():
+            event.wait()
+        with self.lock:
+            # flows that could not start are left out of samples, totals and trends
+            self.flow_names = [name for name in self.flow_names if name not in self.setup_errors]
+            for name in self.setup_errors:
+                del self.windows[name], self.totals[name]
+        if not self.flow_names:
+            self.stop()
+        else:
+            deadline = self.started + self.duration
+            while not self.stopping.wait(min(self.sample_every, max(deadline - time.monotonic(), 0))):
+                self.sample()
+                if time.monotonic() >= deadline:
+                    break
+            self.stop()
+        for thread in threads:
+            thread.join()
+        self.client.close()
+        return self.report()
+
+    def stop(self):
+        self.stopping.set()
+
+    def sample(self):
+        with self.lock:
+            windows = {name: self._window() for name in self.flow_names}
+            windows, self.windows = self.windows, windows
+        flows = {}
+        for name, window in windows.items():
+            latencies = sorted(window["latencies_ms"])
+            flows[name] = {
+                "runs": len(latencies),
+                "errors": window["errors"],
+                "p50_ms": latencies[len(latencies) // 2] if latencies else None,
+                "p95_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] if latencies else None,
+                "max_ms": latencies[-1] if latencies else None,
+            }
+        self.samples.append({
+            "elapsed_s": round(time.monotonic() - self.started, 1),
+            **process_metrics(),
+            "flows": flows,
+        })
+        if self.output is not None:
+            atomic_write_text(self.output, json.dumps(self.report(), indent=2))
+
+    def report(self):
+        found, flags = trends(self.samples, self.flow_names)
+        with self.lock:
+            totals = {name: dict(counts) for name, counts in self.totals.items()}
+            errors = list(self.errors)
+            setup_errors = dict(self.setup_errors)
+        return {
+            "target": self.config.api_base_url,
+            "flows": self.flow_names,
+            "interval_s": self.interval,
+            "sample_every_s": self.sample_every,
+            "duration_s": round(time.monotonic() - self.started, 1) if self.started else 0,
+            "totals": totals,
+            "setup_errors": setup_errors,
+            "samples": self.samples,
+            "trends": found,
+            "flags": flags,
+            "sample_errors": errors,
+        }
+
+    def _pace(self, name, ready):
+        flow = FLOWS[name](self)
+        try:
+            flow.setup()
+        except Exception as error:
+            with self.lock:
+                self.setup_errors[name] = f"{type(error).__name__}: {str(error).splitlines()[0]}"
+            ready.set()
+            return
+        ready.set()
+        next_start = time.monotonic()
+        try:
+            while not self.stopping.is_set():
+                start = time.perf_counter()
+                error = None
+                try:
+                    flow.run()
+                except Exception as e:
+                    error = f"{type(e).__name__}: {str(e).splitlines()[0] if str(e) else ''}"
+                elapsed_ms = (time.perf_counter() - start) * 1000
+                with self.lock:
+                    self.windows[name]["latencies_ms"].append(elapsed_ms)
+                    self.totals[name]["runs"] += 1
+                    if error is not None:
+                        self.windows[name]["errors"] += 1
+                        self.totals[name]["errors"] += 1
+                        if len(self.errors) < MAX_ERROR_MESSAGES:
+                            self.errors.append(f"{time.monotonic() - self.started:.0f}s {name}: {error}")
+                next_start += self.interval
+                if next_start < time.monotonic():
+                    with self.lock:
+                        self.totals[name]["late"] += 1
+                    next_start = time.monotonic()
+                self.stopping.wait(next_start - time.monotonic())
+        finally:
+            flow.teardown()
+
+
+def parse_flows(value):
+    flows = [name.strip() for name in value.split(",") if name.strip()]
+    unknown = [name for name in flows if name not in FLOWS]
+    if unknown or not flows:
+        raise argparse.ArgumentTypeError(f"Unknown flows {unknown}, choose from {sorted(FLOWS)}")
+    return flows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--flows", type=parse_flows, default=list(FLOWS), help="comma-separated flows")
+    parser.add_argument("--duration", type=float, default=3600, help="seconds to run")
+    parser.add_argument("--interval", type=float, default=SOAK_INTERVAL,
+                        help="seconds between the starts of two iterations of a flow")
+    parser.add_argument("--sample-every", type=float, default=SOAK_SAMPLE_EVERY, help="seconds between samples")
+    parser.add_argument("--env", default=os.getenv("WORKFLOWPRO_ENV", DEFAULT_ENV),
+                        help="base_urls profile from test_data.json (staging, qa)")
+    parser.add_argument("--target", choices=("staging", "local"),
+                        default=os.getenv("WORKFLOWPRO_TARGET", "staging"),
+                        help="local runs against the in-process stand-in instead of --env")
+    parser.add_argument("--output", type=Path,
+                        default=REPORT_DIR / f"soak-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    args = parser.parse_args(argv)
+
+    stub = None
+    if args.target == "local":
+        stub = start_local_stub(load_config(args.env).data)
+    soak = SoakRun(load_config(args.env), args.flows, args.duration, args.interval, args.sample_every, args.output)
+    previous = signal.signal(signal.SIGINT, lambda *_: soak.stop())
+    try:
+        report = soak.run()
+    finally:
+        signal.signal(signal.SIGINT, previous)
+        if stub is not None:
+            stub.stop()
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps(report, indent=2))
+
+    for name, error in report["setup_errors"].items():
+        print(f"{name} could not start, skipped: {error}")
+    print(f"{len(report['samples'])} samples over {report['duration_s']:.0f}s")
+    for name, totals in report["totals"].items():
+        rate = totals["errors"] / totals["runs"] if totals["runs"] else 0
+        print(f"  {name:16s} runs={totals['runs']:<6d} errors={rate:.1%} late={totals['late']}")
+    for key, trend in report["trends"].items():
+        per_hour = trend.get("per_hour")
+        print(f"  {key:28s} {trend['first']:.4g} -> {trend['last']:.4g}"
+              + (f" ({per_hour:+.4g}/h)" if per_hour is not None else "")
+              + ("  GROWING" if trend["growing"] else ""))
+    for flag in report["flags"]:
+        print(f"FLAG {flag}")
+    print(f"report written to {args.output}")
+    if not report["flows"]:
+        return 2
+    return 1 if report["flags"] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,183 @@
+"""Start-up profile: where the time goes before the first test runs.
+
+    python -m tests.support.startup tests/api/      # any pytest arguments
+    python -m tests.support.startup --top 30
+
+Runs `pytest --collect-only` for the given arguments in a fresh interpreter
+with `-X importtime` and `--startup-profile`, then reports the wall time, the
+time spent importing (per top-level package, and per harness module), the time
+until pytest_configure and the collection time of each test module (which
+includes importing it). The report is printed and written to
+reports/startup.json, so API-only runs can be checked for Playwright creeping
+back in.
+
+`pytest --startup-profile=FILE` on its own only records the pytest phases.
+"""
+import argparse
+import json
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pytest
+
+from tests.support.browsers import browsers_enabled
+from tests.support.locking import atomic_write_text
+
+
+REPORT_PATH = Path(__file__).parent.parent.parent / "reports" / "startup.json"
+TOP_PACKAGES = 15
+HARNESS_PREFIXES = ("conftest", "tests")
+
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)\s*$")
+
+
+def parse_importtime(stderr):
+    """{module: (self µs, cumulative µs, depth)} from `python -X importtime` output."""
+    modules = {}
+    for line in stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            own, cumulative, indent, name = match.groups()
+            modules[name] = (int(own), int(cumulative), (len(indent) - 1) // 2)
+    return modules
+
+
+def summarize_imports(modules, top=TOP_PACKAGES):
+    packages = {}
+    for name, (_, cumulative, depth) in modules.items():
+        if depth == 0:
+            package = name.split(".")[0]
+            packages[package] = packages.get(package, 0) + cumulative
+    harness = {
+        name: cumulative for name, (_, cumulative, _) in modules.items()
+        if name.split(".")[0] in HARNESS_PREFIXES
+    }
+    ranked = sorted(packages.items(), key=lambda item: item[1], reverse=True)
+    return {
+        "total_ms": sum(packages.values()) / 1000,
+        "packages_ms": {name: us / 1000 for name, us in ranked[:top]},
+        "harness_ms": {name: us / 1000 for name, us in sorted(harness.items(), key=lambda item: -item[1])},
+        "playwright_imported": any(name.split(".")[0] == "playwright" for name in modules),
+    }
+
+
+def profile(pytest_args, top=TOP_PACKAGES, cwd=None):
+    """Collect `pytest_args` in a fresh interpreter; returns the report."""
+    phases_path = REPORT_PATH.with_name("startup-phases.json")
+    with tempfile.TemporaryDirectory() as scratch:
+        command = [
+            # --capture=no: captured stderr would swallow the import times of conftest, plugins and tests
+            sys.executable, "-X", "importtime", "-m", "pytest", "--collect-only", "-q", "--capture=no",
+            "-p", "no:cacheprovider", f"--startup-profile={phases_path}",
+            # keep the HTML report pytest.ini asks for away from reports/report.html
+            f"--html={Path(scratch) / 'report.html'}", *pytest_args,
+        ]
+        started = time.time()
+        result = subprocess.run(command, cwd=cwd, capture_output=True, text=True)
+        wall = time.time() - started
+    if result.returncode not in (0, 5):  # 5: nothing collected
+        raise SystemExit(f"pytest failed ({result.returncode}):\n{result.stdout[-3000:]}")
+    phases = json.loads(phases_path.read_text())
+    phases_path.unlink()
+    return {
+        "args": list(pytest_args),
+        "wall_ms": wall * 1000,
+        "until_configure_ms": (phases["configure"] - started) * 1000,
+        "collection_ms": (phases["collection_finish"] - phases["collection_start"]) * 1000,
+        "browsers": phases["browsers"],
+        "imports": summarize_imports(parse_importtime(result.stderr), top),
+        "modules_ms": phases["modules"],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--top", type=int, default=TOP_PACKAGES, help="packages to list by import time")
+    parser.add_argument("--output", type=Path, default=REPORT_PATH)
+    args, pytest_args = parser.parse_known_args(argv)
+
+    report = profile(pytest_args, args.top)
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps(report, indent=2))
+
+    imports = report["imports"]
+    print(f"pytest --collect-only {' '.join(pytest_args)}: {report['wall_ms']:.0f}ms "
+          f"({report['until_configure_ms']:.0f}ms until configure, "
+          f"{report['collection_ms']:.0f}ms collecting), browsers {report['browsers']}")
+    print(f"imports: {imports['total_ms']:.0f}ms"
+          + (" (Playwright imported)" if imports["playwright_imported"] else " (no Playwright)"))
+    for name, ms in imports["packages_ms"].items():
+        print(f"  {name:40s} {ms:8.1f}ms")
+    print("harness modules (cumulative):")
+    for name, ms in list(imports["harness_ms"].items())[:args.top]:
+        print(f"  {name:40s} {ms:8.1f}ms")
+    print("collection per test module (incl. import):")
+    for name, ms in sorted(report["modules_ms"].items(), key=lambda item: -item[1]):
+        print(f"  {name:40s} {ms:8.1f}ms")
+    print(f"report written to {args.output}")
+    return 0
+
+
+# -----------------------------
+# pytest plugin
+# -----------------------------
+
+class StartupRecorder:
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.stamps = {}
+        self.modules = {}  # test module -> ms to collect it
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--startup-profile",
+        metavar="FILE",
+        default=None,
+        help="write pytest start-up and per-module collection times to FILE (see tests/support/startup.py)",
+    )
+
+
+def pytest_configure(config):
+    path = config.getoption("--startup-profile")
+    if path and not hasattr(config, "workerinput"):
+        config._startup = StartupRecorder(path)
+        config._startup.stamps["configure"] = time.time()
+
+
+def pytest_collection(session):
+    recorder = getattr(session.config, "_startup", None)
+    if recorder is not None:
+        recorder.stamps["collection_start"] = time.time()
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_make_collect_report(collector):
+    recorder = getattr(collector.config, "_startup", None)
+    if recorder is None or not isinstance(collector, pytest.Module):
+        yield
+        return
+    start = time.perf_counter()
+    yield
+    recorder.modules[collector.nodeid] = (time.perf_counter() - start) * 1000
+
+
+def pytest_collection_finish(session):
+    recorder = getattr(session.config, "_startup", None)
+    if recorder is None:
+        return
+    recorder.stamps["collection_finish"] = time.time()
+    atomic_write_text(recorder.path, json.dumps({
+        **recorder.stamps,
+        "browsers": "on" if browsers_enabled(session.config) else "off",
+        "modules": recorder.modules,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
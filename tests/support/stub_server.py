@@ -0,0 +1,508 @@
+"""In-process stand-in for the WorkFlow Pro web app and API.
+
+Set WORKFLOWPRO_TARGET=local to run the suite against it instead of staging. The
+server is started once per run by the controller process, before xdist workers
+are spawned, and BASE_URL / API_BASE_URL are pointed at it, so every worker and
+the shared auth cache talk to the same state.
+
+It implements the routes in test_data.json `api_endpoints` (login with TOTP,
+projects CRUD with cursor pagination when `limit` is given, tenants) plus the
+/login and /projects pages (GET routes also answer HEAD), with the same tenant isolation rules as the real
+service: a session only sees its own tenant's projects, a mismatching
+X-Tenant-ID is rejected with 403 and other tenants' projects are reported as
+404. Latency and error injection come from WORKFLOWPRO_STUB_LATENCY_MS ("20" or
+"10-50") and WORKFLOWPRO_STUB_ERROR_RATE.
+"""
+import html
+import json
+import os
+import random
+import re
+import secrets
+import threading
+import time
+import uuid
+from http.cookies import SimpleCookie
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pyotp
+
+
+class StubProfile:
+    """Latency and error injection applied to every request."""
+
+    def __init__(self, latency_ms=(0, 0), error_rate=0.0, error_status=503):
+        self.latency_ms = latency_ms
+        self.error_rate = error_rate
+        self.error_status = error_status
+
+    @classmethod
+    def from_env(cls):
+        low, _, high = os.getenv("WORKFLOWPRO_STUB_LATENCY_MS", "0").partition("-")
+        return cls(
+            latency_ms=(float(low), float(high or low)),
+            error_rate=float(os.getenv("WORKFLOWPRO_STUB_ERROR_RATE", "0")),
+            error_status=int(os.getenv("WORKFLOWPRO_STUB_ERROR_STATUS", "503")),
+        )
+
+    def delay(self):
+        low, high = self.latency_ms
+        if high > 0:
+            time.sleep(random.uniform(low, high) / 1000)
+
+    def injected_error(self):
+        return self.error_rate > 0 and random.random() < self.error_rate
+
+
+class HttpError(Exception):
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class WorkflowProState:
+    """Users, sessions and projects, shared by all handler threads."""
+
+    def __init__(self, test_data, static_tokens=None):
+        self.lock = threading.Lock()
+        self.users = {u["email"]: u for u in test_data["test_users"].values()}
+        self.tenants = {}
+        for user in test_data["test_users"].values():
+            self.tenants[user["tenant_id"]] = {
+                "id": user["tenant_id"],
+                "name": user.get("tenant_name", user["tenant_id"]),
+            }
+        self.sessions = {}
+        self.challenges = {}
+        self.projects = {}
+        # pre-issued tokens: token -> tenant id, or None for a token trusted for any tenant
+        self.static_tokens = dict(static_tokens or {})
+
+    def login(self, email, password):
+        user = self.users.get(email)
+        if not user or user["password"] != password:
+            raise HttpError(401, "Invalid email or password")
+        if user.get("totp_secret"):
+            challenge = secrets.token_urlsafe(16)
+            with self.lock:
+                self.challenges[challenge] = email
+            return {"requires_2fa": True, "challenge_token": challenge}
+        return self._issue_session(user)
+
+    def verify_2fa(self, challenge, code):
+        with self.lock:
+            email = self.challenges.get(challenge)
+        if not email:
+            raise HttpError(401, "Unknown or expired 2FA challenge")
+        user = self.users[email]
+        if not pyotp.TOTP(user["totp_secret"]).verify(str(code), valid_window=1):
+            raise HttpError(401, "Invalid 2FA code")
+        with self.lock:
+            self.challenges.pop(challenge, None)
+        return self._issue_session(user)
+
+    def logout(self, token):
+        with self.lock:
+            self.sessions.pop(token, None)
+
+    def _issue_session(self, user):
+        token = secrets.token_urlsafe(24)
+        with self.lock:
+            self.sessions[token] = {"email": user["email"], "tenant_id": user["tenant_id"]}
+        return {
+            "token": token,
+            "tenant_id": user["tenant_id"],
+            "user": {"email": user["email"], "role": user.get("role")},
+        }
+
+    def tenant_for(self, token, requested_tenant):
+        """Tenant a request acts as, enforcing that the token belongs to it."""
+        if token in self.sessions:
+            tenant_id = self.sessions[token]["tenant_id"]
+        elif token in self.static_tokens:
+            tenant_id = self.static_tokens[token] or requested_tenant
+        else:
+            raise HttpError(401, "Authentication required")
+        if not tenant_id:
+            raise HttpError(401, "Authentication required")
+        if requested_tenant and requested_tenant != tenant_id:
+            raise HttpError(403, "Token is not valid for this tenant")
+        return tenant_id
+
+    def create_project(self, tenant_id, data):
+        if not isinstance(data, dict) or not data.get("name"):
+            raise HttpError(400, "Project name is required")
+        project = {
+            "id": uuid.uuid4().hex,
+            "name": data["name"],
+            "description": data.get("description", ""),
+            "status": data.get("status", "active"),
+            "tenant_id": tenant_id,
+            "created_at": time.time(),
+        }
+        with self.lock:
+            self.projects[project["id"]] = project
+        return project
+
+    def list_projects(self, tenant_id):
+        with self.lock:
+            return [p for p in self.projects.values() if p["tenant_id"] == tenant_id]
+
+    def get_project(self, tenant_id, project_id):
+        project = self.projects.get(project_id)
+        # other tenants' projects are indistinguishable from missing ones
+        if not project or project["tenant_id"] != tenant_id:
+            raise HttpError(404, "Project not found")
+        return project
+
+    def update_project(self, tenant_id, project_id, data):
+        with self.lock:
+            project = self.get_project(tenant_id, project_id)
+            for field in ("name", "description", "status"):
+                if field in data:
+                    project[field] = data[field]
+            return project
+
+    def delete_project(self, tenant_id, project_id):
+        with self.lock:
+            self.get_project(tenant_id, project_id)
+            del self.projects[project_id]
+
+
+def _route_pattern(template):
+    return re.compile("^" + re.sub(r"\\{(\w+)\\}", r"(?P<\1>[^/]+)", re.escape(template)) + "$")
+
+
+class StubRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "WorkflowProStub/1.0"
+    # headers and body go out in separate writes; with Nagle on, the body waits for the
+    # client's delayed ACK (~40ms) on every keep-alive request
+    disable_nagle_algorithm = True
+
+    # -- plumbing --
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def do_PUT(self):
+        self._dispatch("PUT")
+
+    def do_DELETE(self):
+        self._dispatch("DELETE")
+
+    def do_HEAD(self):
+        # routed like GET; _send leaves the body out
+        self._dispatch("HEAD")
+
+    def log_message(self, format, *args):
+        pass
+
+    @property
+    def state(self) -> WorkflowProState:
+        return self.server.state
+
+    def _dispatch(self, method):
+        parsed = urlparse(self.path)
+        self.query = parse_qs(parsed.query)
+        self.body = self._read_body()
+        self.server.profile.delay()
+
+        route = self.server.match("GET" if method == "HEAD" else method, parsed.path)
+        if route is None:
+            return self._send_json(404, {"error": "Not found"})
+        handler, params = route
+        is_api = parsed.path.startswith("/api/")
+        if is_api and self.server.profile.injected_error():
+            return self._send_json(self.server.profile.error_status, {"error": "Injected error"})
+        try:
+            handler(self, **params)
+        except HttpError as error:
+            if is_api:
+                self._send_json(error.status, {"error": error.message})
+            else:
+                self._send_html(error.status, f"<p class='error-message'>{html.escape(error.message)}</p>")
+
+    def _read_body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(length) if length else b""
+
+    def _json_body(self):
+        try:
+            return json.loads(self.body or b"{}")
+        except ValueError:
+            raise HttpError(400, "Malformed JSON body")
+
+    def _form_body(self):
+        return {k: v[0] for k, v in parse_qs(self.body.decode()).items()}
+
+    def _cookie(self, name):
+        cookie = SimpleCookie(self.headers.get("Cookie", ""))
+        return cookie[name].value if name in cookie else None
+
+    def _token(self):
+        auth = self.headers.get("Authorization", "")
+        if auth.startswith("Bearer "):
+            return auth[len("Bearer "):]
+        return self._cookie("session")
+
+    def _tenant(self):
+        return self.state.tenant_for(self._token(), self.headers.get("X-Tenant-ID"))
+
+    def _int_param(self, name, default, minimum):
+        value = self.query.get(name, [default])[0]
+        try:
+            number = int(value)
+        except (TypeError, ValueError):
+            raise HttpError(400, f"{name} must be an integer")
+        if number < minimum:
+            raise HttpError(400, f"{name} must be at least {minimum}")
+        return number
+
+    def _send(self, status, body, content_type, headers=None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def _send_json(self, status, payload, headers=None):
+        body = b"" if payload is None else json.dumps(payload).encode()
+        self._send(status, body, "application/json", headers)
+
+    def _send_html(self, status, content, headers=None):
+        page = f"<!doctype html><html><head><title>WorkFlow Pro</title></head><body>{content}</body></html>"
+        self._send(status, page.encode(), "text/html; charset=utf-8", headers)
+
+    def _redirect(self, location, cookies=None):
+        self.send_response(303)
+        self.send_header("Location", location)
+        for cookie in cookies or []:
+            self.send_header("Set-Cookie", cookie)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    # -- API --
+
+    def api_login(self):
+        data = self._json_body()
+        result = self.state.login(data.get("email"), data.get("password"))
+        self._send_json(200, result, self._session_cookie(result))
+
+    def api_verify_2fa(self):
+        data = self._json_body()
+        result = self.state.verify_2fa(data.get("challenge_token"), data.get("code"))
+        self._send_json(200, result, self._session_cookie(result))
+
+    def api_logout(self):
+        self.state.logout(self._token())
+        self._send_json(204, None)
+
+    def api_list_projects(self):
+        projects = self.state.list_projects(self._tenant())
+        if "limit" not in self.query:
+            return self._send_json(200, projects)
+        # paginated: {"items": [...], "next_cursor": offset or null}
+        limit = self._int_param("limit", None, minimum=1)
+        offset = self._int_param("cursor", "0", minimum=0)
+        end = offset + limit
+        self._send_json(200, {
+            "items": projects[offset:end],
+            "next_cursor": str(end) if end < len(projects) else None,
+        })
+
+    def api_create_project(self):
+        tenant_id = self._tenant()
+        self._send_json(201, self.state.create_project(tenant_id, self._json_body()))
+
+    def api_get_project(self, id):
+        self._send_json(200, self.state.get_project(self._tenant(), id))
+
+    def api_update_project(self, id):
+        tenant_id = self._tenant()
+        self._send_json(200, self.state.update_project(tenant_id, id, self._json_body()))
+
+    def api_delete_project(self, id):
+        self.state.delete_project(self._tenant(), id)
+        self._send_json(204, None)
+
+    def api_list_tenants(self):
+        self._send_json(200, [self._tenant_record(self._tenant())])
+
+    def api_switch_tenant(self):
+        tenant_id = self._tenant()
+        if self._json_body().get("tenant_id") != tenant_id:
+            raise HttpError(403, "User does not belong to this tenant")
+        self._send_json(200, self._tenant_record(tenant_id))
+
+    def _tenant_record(self, tenant_id):
+        # a static token trusted for any tenant may name one no test user belongs to
+        if tenant_id not in self.state.tenants:
+            raise HttpError(401, "Unknown tenant")
+        return self.state.tenants[tenant_id]
+
+    def _session_cookie(self, result):
+        if "token" not in result:
+            return None
+        return {"Set-Cookie": f"session={result['token']}; Path=/; HttpOnly"}
+
+    # -- pages --
+
+    def page_root(self):
+        self._redirect("/projects" if self._web_session() else "/login")
+
+    def page_login(self):
+        self._send_html(200, self._login_form())
+
+    def page_login_submit(self):
+        form = self._form_body()
+        try:
+            result = self.state.login(form.get("email"), form.get("password"))
+        except HttpError as error:
+            return self._send_html(200, self._login_form(error.message))
+        if result.get("requires_2fa"):
+            challenge = result["challenge_token"]
+            return self._send_html(
+                200, self._otp_form(),
+                {"Set-Cookie": f"challenge={challenge}; Path=/; HttpOnly"},
+            )
+        self._redirect("/projects", [f"session={result['token']}; Path=/; HttpOnly"])
+
+    def page_verify_submit(self):
+        form = self._form_body()
+        try:
+            result = self.state.verify_2fa(self._cookie("challenge"), form.get("otp"))
+        except HttpError as error:
+            return self._send_html(200, self._otp_form(error.message))
+        self._redirect("/projects", [
+            f"session={result['token']}; Path=/; HttpOnly",
+            "challenge=; Path=/; Max-Age=0",
+        ])
+
+    def page_projects(self):
+        session = self._web_session()
+        if not session:
+            return self._redirect("/login")
+        cards = "".join(
+            f"<div class='project-card' data-testid='project-{p['id']}'>"
+            f"<h3>{html.escape(p['name'])}</h3><p>{html.escape(p['description'])}</p></div>"
+            for p in self.state.list_projects(session["tenant_id"])
+        )
+        tenant = self.state.tenants[session["tenant_id"]]
+        self._send_html(200, (
+            f"<header><span data-testid='tenant-name'>{html.escape(tenant['name'])}</span>"
+            "<form method='post' action='/logout'>"
+            "<button type='submit' data-testid='logout'>Logout</button></form></header>"
+            f"<main data-testid='project-list'>{cards}</main>"
+        ))
+
+    def page_logout(self):
+        self.state.logout(self._cookie("session"))
+        self._redirect("/login", ["session=; Path=/; Max-Age=0"])
+
+    def _web_session(self):
+        return self.state.sessions.get(self._cookie("session"))
+
+    def _login_form(self, error=None):
+        message = f"<div class='error-message'>{html.escape(error)}</div>" if error else ""
+        return (
+            f"{message}<form method='post' action='/login'>"
+            "<input name='email' type='email' data-testid='email-input'>"
+            "<input name='password' type='password' data-testid='password-input'>"
+            "<button type='submit' data-testid='login-button'>Log in</button></form>"
+        )
+
+    def _otp_form(self, error=None):
+        message = f"<div class='error-message'>{html.escape(error)}</div>" if error else ""
+        return (
+            f"{message}<form method='post' action='/login/verify'>"
+            "<input name='otp' data-testid='otp-input' autocomplete='one-time-code'>"
+            "<button type='submit' data-testid='verify-2fa-button'>Verify</button></form>"
+        )
+
+
+class WorkflowProStub(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, test_data, profile=None, static_tokens=None, host="127.0.0.1", port=0):
+        super().__init__((host, port), StubRequestHandler)
+        self.state = WorkflowProState(test_data, static_tokens)
+        self.profile = profile or StubProfile()
+        self.routes = self._build_routes(test_data["api_endpoints"])
+        self._thread = None
+        self._previous_env = {}
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, name="workflowpro-stub", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+        for name, value in self._previous_env.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+        self._previous_env = {}
+
+    def export_env(self):
+        """Point BASE_URL / API_BASE_URL at this server until stop()."""
+        for name in ("BASE_URL", "API_BASE_URL"):
+            self._previous_env.setdefault(name, os.environ.get(name))
+            os.environ[name] = self.url
+
+    def match(self, method, path):
+        for route_method, pattern, handler in self.routes:
+            if route_method != method:
+                continue
+            found = pattern.match(path)
+            if found:
+                return handler, found.groupdict()
+        return None
+
+    def _build_routes(self, endpoints):
+        h = StubRequestHandler
+        api = [
+            ("POST", endpoints["auth"]["login"], h.api_login),
+            ("POST", endpoints["auth"]["verify_2fa"], h.api_verify_2fa),
+            ("POST", endpoints["auth"]["logout"], h.api_logout),
+            ("GET", endpoints["projects"]["list"], h.api_list_projects),
+            ("POST", endpoints["projects"]["create"], h.api_create_project),
+            ("GET", endpoints["projects"]["get"], h.api_get_project),
+            ("PUT", endpoints["projects"]["update"], h.api_update_project),
+            ("DELETE", endpoints["projects"]["delete"], h.api_delete_project),
+            ("GET", endpoints["tenants"]["list"], h.api_list_tenants),
+            ("POST", endpoints["tenants"]["switch"], h.api_switch_tenant),
+        ]
+        pages = [
+            ("GET", "/", h.page_root),
+            ("GET", "/login", h.page_login),
+            ("POST", "/login", h.page_login_submit),
+            ("POST", "/login/verify", h.page_verify_submit),
+            ("GET", "/projects", h.page_projects),
+            ("POST", "/logout", h.page_logout),
+        ]
+        return [(method, _route_pattern(path), handler) for method, path, handler in api + pages]
+
+
+def start_local_stub(test_data, static_tokens=None):
+    """Start the stand-in and point BASE_URL / API_BASE_URL at it for this run."""
+    stub = WorkflowProStub(test_data, StubProfile.from_env(), static_tokens).start()
+    stub.export_env()
+    return stub
@@ -0,0 +1,242 @@
+"""Per-test, per-phase timing of the slow building blocks (`--timing`).
+
+Wraps Playwright navigation/wait/locator calls, every HTTP request sent through
+requests, and time.sleep with perf_counter timers. Each span is attributed to
+the running test and its phase (setup/call/teardown). Nested spans only count
+once, at the outermost level, so a login wrapped in `span("login")` is not
+also counted as its gotos and clicks. Only the thread running the test records:
+the patches are process-wide, but calls made on other threads (the async
+browser's loop, executor pools, the project pool's refills) belong to no test,
+and session_scope background work is left out as well.
+
+Each xdist worker writes reports/timing/<worker>.json; the controller merges
+them into reports/timing.json and prints the slowest spans.
+"""
+import functools
+import heapq
+import json
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from urllib.parse import urlparse
+
+import pytest
+import requests
+
+from tests.support.browsers import browsers_enabled
+from tests.support.locking import atomic_write_text
+from tests.support.session_scope import in_background
+
+
+TIMING_DIR = Path(__file__).parent.parent.parent / "reports" / "timing"
+SLOWEST_SPANS = 20
+
+PLAYWRIGHT_CALLS = {
+    "Page": ["goto", "reload", "wait_for_load_state", "wait_for_url", "wait_for_timeout", "screenshot"],
+    "Locator": ["click", "fill", "wait_for", "is_visible", "count"],
+    "Browser": ["new_context"],
+    "BrowserContext": ["new_page", "close", "storage_state"],
+}
+
+
+class TimingRecorder:
+
+    def __init__(self):
+        self.totals = {}  # nodeid -> phase -> category -> [seconds, count]
+        self.slowest = []  # min-heap of (seconds, nodeid, phase, category, detail)
+        self.lock = threading.Lock()
+        self.local = threading.local()
+
+    @property
+    def current(self):
+        """(nodeid, phase) of the test running on this thread, if any."""
+        return getattr(self.local, "current", None)
+
+    @current.setter
+    def current(self, value):
+        self.local.current = value
+
+    def add(self, category, detail, seconds):
+        # background threads (project pool) are running for later tests, not this one
+        if self.current is None or in_background():
+            return
+        nodeid, phase = self.current
+        with self.lock:
+            total = self.totals.setdefault(nodeid, {}).setdefault(phase, {}).setdefault(category, [0.0, 0])
+            total[0] += seconds
+            total[1] += 1
+            span = (seconds, nodeid, phase, category, detail)
+            if len(self.slowest) < SLOWEST_SPANS:
+                heapq.heappush(self.slowest, span)
+            elif seconds > self.slowest[0][0]:
+                heapq.heapreplace(self.slowest, span)
+
+    @contextmanager
+    def span(self, category, detail=""):
+        depth = getattr(self.local, "depth", 0)
+        self.local.depth = depth + 1
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.local.depth = depth
+            if depth == 0:
+                self.add(category, detail, time.perf_counter() - start)
+
+    def to_json(self):
+        return {
+            "tests": self.totals,
+            "slowest": [
+                {"seconds": s, "nodeid": n, "phase": p, "category": c, "detail": d}
+                for s, n, p, c, d in sorted(self.slowest, reverse=True)
+            ],
+        }
+
+
+RECORDER = TimingRecorder()
+
+
+def span(category, detail=""):
+    """Time a block as one span, e.g. `with span("login", user_key):`."""
+    return RECORDER.span(category, detail)
+
+
+def _wrap(owner, name, category, detail_fn):
+    original = getattr(owner, name)
+
+    @functools.wraps(original)
+    def timed(*args, **kwargs):
+        if RECORDER.current is None or in_background():
+            return original(*args, **kwargs)
+        with RECORDER.span(category, detail_fn(args, kwargs)):
+            return original(*args, **kwargs)
+
+    setattr(owner, name, timed)
+    return owner, name, original
+
+
+def _first_arg(args, kwargs):
+    return str(args[1]) if len(args) > 1 else ""
+
+
+def _locator_detail(args, kwargs):
+    return str(args[0])
+
+
+def _http_detail(args, kwargs):
+    prepared = args[1]
+    return f"{prepared.method} {urlparse(prepared.url).path}"
+
+
+def install(playwright=True):
+    """Patch the timed calls; returns what is needed to undo it."""
+    patches = [
+        _wrap(requests.Session, "send", "http", _http_detail),
+        _wrap(time, "sleep", "sleep", lambda args, kwargs: f"{args[0]}s" if args else ""),
+    ]
+    if not playwright:
+        return patches
+    try:
+        from playwright.sync_api import _generated as playwright_api
+    except ImportError:
+        return patches
+    for class_name, methods in PLAYWRIGHT_CALLS.items():
+        owner = getattr(playwright_api, class_name)
+        detail_fn = _locator_detail if class_name == "Locator" else _first_arg
+        for method in methods:
+            patches.append(_wrap(owner, method, f"playwright.{method}", detail_fn))
+    return patches
+
+
+def uninstall(patches):
+    for owner, name, original in reversed(patches):
+        setattr(owner, name, original)
+
+
+def merge_reports(paths):
+    merged = {"tests": {}, "slowest": []}
+    for path in paths:
+        report = json.loads(Path(path).read_text())
+        merged["tests"].update(report["tests"])
+        merged["slowest"].extend(report["slowest"])
+    merged["slowest"] = sorted(merged["slowest"], key=lambda s: s["seconds"], reverse=True)[:SLOWEST_SPANS]
+    categories = {}
+    for phases in merged["tests"].values():
+        for totals in phases.values():
+            for category, (seconds, count) in totals.items():
+                entry = categories.setdefault(category, [0.0, 0])
+                entry[0] += seconds
+                entry[1] += count
+    merged["categories"] = categories
+    return merged
+
+
+# -----------------------------
+# pytest plugin
+# -----------------------------
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--timing",
+        action="store_true",
+        default=False,
+        help="record per-test, per-phase time spent in Playwright, HTTP and sleeps",
+    )
+
+
+def pytest_configure(config):
+    if not config.getoption("--timing"):
+        return
+    # API-only runs don't load Playwright just to time it
+    config._timing_patches = install(playwright=browsers_enabled(config))
+    if not hasattr(config, "workerinput"):
+        for stale in TIMING_DIR.glob("*.json"):
+            stale.unlink()
+
+
+def _phase_wrapper(phase):
+    @pytest.hookimpl(hookwrapper=True)
+    def wrapper(item):
+        if not item.config.getoption("--timing"):
+            yield
+            return
+        RECORDER.current = (item.nodeid, phase)
+        try:
+            yield
+        finally:
+            RECORDER.current = None
+    return wrapper
+
+
+pytest_runtest_setup = _phase_wrapper("setup")
+pytest_runtest_call = _phase_wrapper("call")
+pytest_runtest_teardown = _phase_wrapper("teardown")
+
+
+def pytest_sessionfinish(session):
+    config = session.config
+    if not config.getoption("--timing"):
+        return
+    uninstall(config._timing_patches)
+    worker = config.workerinput["workerid"] if hasattr(config, "workerinput") else "controller"
+    atomic_write_text(TIMING_DIR / f"{worker}.json", json.dumps(RECORDER.to_json()))
+    if worker == "controller":
+        merged = merge_reports(sorted(TIMING_DIR.glob("*.json")))
+        atomic_write_text(TIMING_DIR.parent / "timing.json", json.dumps(merged, indent=2))
+        config._timing_summary = merged
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    merged = getattr(config, "_timing_summary", None)
+    if not merged:
+        return
+    terminalreporter.section("time by category")
+    for category, (seconds, count) in sorted(merged["categories"].items(), key=lambda c: -c[1][0]):
+        terminalreporter.write_line(f"{seconds:8.2f}s  {count:6d}x  {category}")
+    terminalreporter.section("slowest spans")
+    for entry in merged["slowest"]:
+        terminalreporter.write_line(
+            f"{entry['seconds']:8.2f}s  {entry['phase']:8s}  {entry['category']:28s}  "
+            f"{entry['detail'][:60]}  {entry['nodeid']}"
+        )
@@ -0,0 +1,31 @@
+from playwright.sync_api import Page
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+
+from tests.support.api_login import totp_code
+
+
+NAVIGATION_TIMEOUT = 15000
+QUICK_TIMEOUT = 5000
+
+
+def login_via_ui(page: Page, user: dict, selectors: dict, base_url: str):
+    """Log in through the login form, handling TOTP when the user has a secret."""
+    page.goto(f"{base_url}/login", wait_until="domcontentloaded")
+
+    page.locator(selectors["email_input"]).fill(user["email"])
+    page.locator(selectors["password_input"]).fill(user["password"])
+    page.locator(selectors["login_button"]).click()
+
+    if user.get("totp_secret"):
+        otp_input = page.locator(
+            selectors.get("otp_input", "input[name='otp']")
+        ).first
+        try:
+            otp_input.wait_for(state="visible", timeout=QUICK_TIMEOUT)
+        except PlaywrightTimeoutError:
+            pass
+        else:
+            otp_input.fill(totp_code(user["totp_secret"]))
+            page.locator("button:has-text('Verify')").click()
+
+    page.wait_for_url("**/projects", timeout=NAVIGATION_TIMEOUT)
@@ -0,0 +1,115 @@
+"""Polling waits for eventually consistent state, instead of fixed sleeps.
+
+Every wait is recorded in WAIT_LOG with how long it actually took, and the
+slowest ones are listed in the terminal summary, so real propagation latency
+on the target environment is visible in each run. Under xdist every worker
+writes its log to reports/waits/<worker>.json and the controller merges them.
+"""
+import json
+import random
+import time
+from pathlib import Path
+
+import pytest
+
+from tests.support.listing import ListingError, find_project
+from tests.support.locking import atomic_write_text
+
+
+WAITS_DIR = Path(__file__).parent.parent.parent / "reports" / "waits"
+
+WAIT_LOG = []
+
+
+class WaitTimeout(AssertionError):
+    pass
+
+
+def wait_until(condition, timeout=10, description="condition", initial_delay=0.1,
+               max_delay=2, backoff=2, jitter=0.2, ignore=(), sleep=None):
+    """Call `condition` until it returns something truthy and return that value.
+
+    Polls with exponential backoff plus random jitter and gives up after `timeout`
+    seconds. Exceptions listed in `ignore` count as "not yet". Pass a different
+    `sleep` (e.g. a Playwright page's wait_for_timeout in ms) where blocking the
+    thread is not appropriate.
+    """
+    sleep = sleep or time.sleep
+    start = time.monotonic()
+    deadline = start + timeout
+    delay = initial_delay
+    attempts = 0
+
+    while True:
+        attempts += 1
+        try:
+            result = condition()
+        except ignore:
+            result = None
+        now = time.monotonic()
+        if result:
+            record_wait(description, now - start, attempts, True)
+            return result
+        if now >= deadline:
+            record_wait(description, now - start, attempts, False)
+            raise WaitTimeout(f"Timed out after {timeout}s waiting for {description}")
+
+        pause = min(delay, max_delay) * (1 + random.uniform(-jitter, jitter))
+        sleep(min(pause, deadline - now))
+        delay *= backoff
+
+
+def wait_for_project_listed(tenant_client, project_id, timeout=30):
+    """Wait until `project_id` shows up in the tenant's project list."""
+    def listed():
+        try:
+            return find_project(tenant_client, project_id) is not None
+        except ListingError:
+            return False
+
+    return wait_until(listed, timeout=timeout, description=f"project {project_id} listed")
+
+
+def record_wait(description, elapsed, attempts=1, succeeded=True):
+    """Add a wait timed elsewhere (e.g. a Playwright auto-wait) to WAIT_LOG."""
+    WAIT_LOG.append({
+        "description": description,
+        "elapsed": elapsed,
+        "attempts": attempts,
+        "succeeded": succeeded,
+    })
+
+
+# -----------------------------
+# pytest plugin
+# -----------------------------
+
+def pytest_configure(config):
+    config._waits = []
+    if not hasattr(config, "workerinput"):
+        for stale in WAITS_DIR.glob("*.json"):
+            stale.unlink()
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_sessionfinish(session):
+    config = session.config
+    if hasattr(config, "workerinput"):
+        atomic_write_text(WAITS_DIR / f"{config.workerinput['workerid']}.json", json.dumps(WAIT_LOG))
+        return
+
+    waits = list(WAIT_LOG)
+    for path in sorted(WAITS_DIR.glob("*.json")):
+        waits.extend(json.loads(path.read_text()))
+    config._waits = waits
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    if not config._waits:
+        return
+    terminalreporter.section("eventual consistency waits")
+    for wait in sorted(config._waits, key=lambda w: w["elapsed"], reverse=True)[:10]:
+        status = "ok" if wait["succeeded"] else "TIMEOUT"
+        terminalreporter.write_line(
+            f"{wait['elapsed']:7.2f}s  {wait['attempts']:3d} polls  {status:7s}  {wait['description']}"
+        )
@@ -0,0 +1 @@
+"""Init file for harness unit tests"""
@@ -0,0 +1,153 @@
+import json
+from urllib.parse import parse_qs
+
+import pytest
+
+from tests.support.har import REDACTED, HarReplayer, redact_body
+
+
+API = "https://api.example/api/projects"
+PROJECT_1 = "5ca2f370-9a77-4a78-8a17-fa58c4ced07f"
+PROJECT_2 = "0b9c6a4e-1d2f-4e3a-9b8c-7d6e5f4a3b2c"
+
+
+def _entry(method, url, body="", response="{}", status=200):
+    request = {"method": method, "url": url}
+    if body:
+        request["postData"] = {"mimeType": "application/json", "text": body}
+    return {
+        "request": request,
+        "response": {
+            "status": status,
+            "headers": [
+                {"name": "Content-Type", "value": "application/json"},
+                {"name": "Content-Length", "value": "2"},
+            ],
+            "content": {"mimeType": "application/json", "text": response},
+        },
+    }
+
+
+class TestRedactBody:
+
+    @pytest.mark.unit
+    def test_json_fields_at_any_depth(self):
+        body = {"email": "a@b.c", "password": "hunter2", "session": {"token": "t0k", "user": {"id": 1}}}
+
+        assert json.loads(redact_body(json.dumps(body))) == {
+            "email": "a@b.c", "password": REDACTED, "session": {"token": REDACTED, "user": {"id": 1}},
+        }
+
+    @pytest.mark.unit
+    def test_json_list_and_bytes(self):
+        body = json.dumps([{"code": "123456"}, {"name": "x"}]).encode()
+
+        assert json.loads(redact_body(body)) == [{"code": REDACTED}, {"name": "x"}]
+
+    @pytest.mark.unit
+    def test_null_secret_left_alone(self):
+        body = '{"token": null, "requires_2fa": true}'
+
+        assert redact_body(body) == body
+
+    @pytest.mark.unit
+    def test_form_body(self):
+        assert parse_qs(redact_body("email=a%40b.c&password=hunter2")) == {"email": ["a@b.c"], "password": [REDACTED]}
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("body", [
+        '{"name":  "Project", "description": "unchanged formatting"}',
+        "name=Project&description=x",
+        "<html><body>a=b</body></html>",
+        "plain text",
+    ])
+    def test_bodies_without_secrets_unchanged(self, body):
+        assert redact_body(body) == body
+
+    @pytest.mark.unit
+    def test_empty(self):
+        assert redact_body(None) == ""
+        assert redact_body(b"") == ""
+
+
+class TestHarReplayer:
+
+    @pytest.mark.unit
+    def test_exact_match_preferred(self):
+        replayer = HarReplayer([
+            _entry("POST", API, '{"name": "Other"}', response='{"n": 1}'),
+            _entry("POST", API, '{"name": "Wanted"}', response='{"n": 2}'),
+        ])
+
+        entry = replayer.match("POST", API, '{"name": "Wanted"}')
+
+        assert replayer.response(entry)[2] == b'{"n": 2}'
+
+    @pytest.mark.unit
+    def test_query_order_does_not_matter(self):
+        replayer = HarReplayer([_entry("GET", f"{API}?limit=2&cursor=4")])
+
+        assert replayer.match("GET", f"{API}?cursor=4&limit=2", "") is replayer.entries[0]
+
+    @pytest.mark.unit
+    def test_masked_match_learns_new_ids(self):
+        replayer = HarReplayer([
+            _entry("GET", f"{API}/{PROJECT_1}", response=json.dumps({"id": PROJECT_1})),
+            _entry("DELETE", f"{API}/{PROJECT_1}", status=204, response=""),
+        ])
+
+        entry = replayer.match("GET", f"{API}/{PROJECT_2}", "")
+
+        assert json.loads(replayer.response(entry)[2]) == {"id": PROJECT_2}
+        assert replayer.substitutions == {PROJECT_1: PROJECT_2}
+        assert replayer.match("DELETE", f"{API}/{PROJECT_2}", "") is replayer.entries[1]
+
+    @pytest.mark.unit
+    def test_masked_body_match(self):
+        replayer = HarReplayer([_entry("POST", API, '{"name": "IntegrationTest_1700000000"}', response='{"n": 1}')])
+
+        entry = replayer.match("POST", API, '{"name": "IntegrationTest_1800000000"}')
+
+        assert entry is replayer.entries[0]
+
+    @pytest.mark.unit
+    def test_loose_match_ignores_body(self):
+        replayer = HarReplayer([_entry("POST", API, '{"name": "Recorded"}')])
+
+        assert replayer.match("POST", API, '{"name": "Something else"}') is replayer.entries[0]
+
+    @pytest.mark.unit
+    def test_redacted_login_matches(self):
+        recorded = redact_body('{"email": "a@b.c", "password": "old-secret"}')
+        replayer = HarReplayer([_entry("POST", "https://api.example/api/auth/login", recorded)])
+
+        entry = replayer.match("POST", "https://api.example/api/auth/login", '{"email": "a@b.c", "password": "new"}')
+
+        assert entry is replayer.entries[0]
+        assert replayer.substitutions == {}
+
+    @pytest.mark.unit
+    def test_recorded_order_then_last_answer_repeats(self):
+        replayer = HarReplayer([
+            _entry("GET", API, response='{"page": 1}'),
+            _entry("GET", API, response='{"page": 2}'),
+        ])
+
+        bodies = [replayer.response(replayer.match("GET", API, ""))[2] for _ in range(3)]
+
+        assert bodies == [b'{"page": 1}', b'{"page": 2}', b'{"page": 2}']
+
+    @pytest.mark.unit
+    def test_unmatched_recorded(self):
+        replayer = HarReplayer([_entry("GET", API)])
+
+        assert replayer.match("PUT", f"{API}/x", "{}", source="http") is None
+        assert replayer.unmatched == [f"http PUT {API}/x"]
+
+    @pytest.mark.unit
+    def test_wire_headers_dropped(self):
+        replayer = HarReplayer([_entry("GET", API)])
+
+        _, headers, _ = replayer.response(replayer.match("GET", API, ""))
+
+        assert headers == {"Content-Type": "application/json"}
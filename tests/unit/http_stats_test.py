@@ -0,0 +1,127 @@
+import pytest
+
+from tests.support.http_stats import BUCKET_GROWTH, MIN_LATENCY_MS, HttpStats, LatencyHistogram
+from tests.support.session_scope import session_scope
+
+
+# a reported percentile is the middle of its bucket, so it is off by at most half a bucket
+BUCKET_ERROR = BUCKET_GROWTH ** 0.5 - 1
+
+
+def _histogram(values):
+    histogram = LatencyHistogram()
+    for ms in values:
+        histogram.add(ms)
+    return histogram
+
+
+class FakeResponse:
+
+    def __init__(self, status_code):
+        self.status_code = status_code
+
+
+class TestLatencyHistogram:
+
+    @pytest.mark.unit
+    def test_empty(self):
+        histogram = LatencyHistogram()
+
+        assert histogram.percentile(50) is None
+        assert (histogram.count, histogram.min_ms, histogram.max_ms) == (0, None, None)
+
+    @pytest.mark.unit
+    def test_single_value_is_exact(self):
+        histogram = _histogram([42.0])
+
+        assert [histogram.percentile(q) for q in (0, 50, 99, 100)] == [42.0] * 4
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("q", [50, 90, 95, 99])
+    def test_percentiles_within_bucket_error(self, q):
+        histogram = _histogram(range(1, 1001))
+
+        assert histogram.percentile(q) == pytest.approx(q * 10, rel=BUCKET_ERROR)
+
+    @pytest.mark.unit
+    def test_percentiles_clamped_to_observed_range(self):
+        histogram = _histogram([10.0, 10.2, 10.3])
+
+        assert 10.0 <= histogram.percentile(1) <= histogram.percentile(100) <= 10.3
+
+    @pytest.mark.unit
+    def test_values_below_the_smallest_bucket_share_bucket_zero(self):
+        histogram = _histogram([0, MIN_LATENCY_MS / 10, MIN_LATENCY_MS])
+
+        assert histogram.buckets == {0: 3}
+        assert histogram.min_ms == 0
+
+    @pytest.mark.unit
+    def test_buckets_grow_geometrically(self):
+        histogram = _histogram([MIN_LATENCY_MS * BUCKET_GROWTH ** power * 1.001 for power in (10, 100)])
+
+        assert sorted(histogram.buckets) == [10, 100]
+
+    @pytest.mark.unit
+    def test_merge_equals_one_histogram_of_everything(self):
+        merged = _histogram(range(1, 500))
+        merged.merge(_histogram(range(500, 1001)))
+        whole = _histogram(range(1, 1001))
+
+        assert merged.to_json() == whole.to_json()
+        assert merged.percentile(95) == whole.percentile(95)
+
+    @pytest.mark.unit
+    def test_merge_into_empty(self):
+        merged = LatencyHistogram()
+        merged.merge(_histogram([3.0, 7.0]))
+
+        assert (merged.count, merged.min_ms, merged.max_ms) == (2, 3.0, 7.0)
+
+    @pytest.mark.unit
+    def test_json_round_trip(self):
+        histogram = _histogram([0.5, 12.0, 250.0])
+
+        assert LatencyHistogram.from_json(histogram.to_json()).to_json() == histogram.to_json()
+
+
+class TestHttpStats:
+
+    @pytest.mark.unit
+    def test_tenants_folded_per_endpoint(self):
+        stats = HttpStats()
+        stats("GET", "/api/projects/{id}", "tenant_a_123", FakeResponse(200), 10.0)
+        stats("GET", "/api/projects/{id}", "tenant_b_456", FakeResponse(404), 20.0)
+        stats("POST", "/api/projects", None, FakeResponse(503), 30.0)
+
+        summary = stats.summary(elapsed=2.0)
+
+        assert list(summary) == ["GET /api/projects/{id}", "POST /api/projects"]
+        get = summary["GET /api/projects/{id}"]
+        assert (get["count"], get["statuses"], get["error_rate"], get["throughput_rps"]) == (
+            2, {"200": 1, "404": 1}, 0.0, 1.0,
+        )
+        assert summary["POST /api/projects"]["error_rate"] == 1.0
+        assert ("POST", "/api/projects", "-") in stats.endpoints
+
+    @pytest.mark.unit
+    def test_background_traffic_left_out(self):
+        stats = HttpStats()
+        with session_scope(background=True):
+            stats("GET", "/api/projects", "tenant_a_123", FakeResponse(200), 5.0)
+        with session_scope():
+            stats("GET", "/api/projects", "tenant_a_123", FakeResponse(200), 5.0)
+
+        assert stats.summary()["GET /api/projects"]["count"] == 1
+
+    @pytest.mark.unit
+    def test_json_round_trip_and_merge(self):
+        worker = HttpStats()
+        worker.add("GET", "/api/projects", "tenant_a_123", 200, 4.0)
+        controller = HttpStats()
+        controller.add("GET", "/api/projects", "tenant_a_123", 500, 8.0)
+
+        controller.merge(HttpStats.from_json(worker.to_json()))
+
+        summary = controller.summary()["GET /api/projects"]
+        assert (summary["count"], summary["statuses"], summary["max_ms"]) == (2, {"200": 1, "500": 1}, 8.0)
@@ -0,0 +1,72 @@
+import json
+
+import pytest
+
+from tests.support.api_client import WorkflowProClient
+from tests.support.async_api import AsyncWorkflowProClient
+from tests.support.config import TEST_DATA_PATH
+from tests.support.isolation import IsolationMatrix
+from tests.support.stub_server import WorkflowProStub
+
+
+TEST_DATA = json.loads(TEST_DATA_PATH.read_text())
+TENANTS = {"tenant_a_123": "token_a", "tenant_b_456": "token_b"}
+PROJECTS_PER_TENANT = 5
+
+
+@pytest.fixture(scope="module")
+def stub():
+    server = WorkflowProStub(TEST_DATA, static_tokens={token: tenant for tenant, token in TENANTS.items()}).start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def tenants(stub):
+    client = AsyncWorkflowProClient(WorkflowProClient(stub.url, TEST_DATA["api_endpoints"]))
+    yield {tenant_id: client.as_tenant(token, tenant_id) for tenant_id, token in TENANTS.items()}
+    client.close()
+    client.client.close()
+
+
+def _leak_last(stub, viewer, monkeypatch):
+    """Make `viewer`'s listing end with the newest project another tenant owns."""
+    list_projects = stub.state.list_projects
+
+    def leaky(tenant_id):
+        projects = list_projects(tenant_id)
+        if tenant_id == viewer:
+            projects += [p for p in stub.state.projects.values() if p["tenant_id"] != viewer][-1:]
+        return projects
+
+    monkeypatch.setattr(stub.state, "list_projects", leaky)
+
+
+class TestIsolationMatrix:
+
+    @pytest.mark.unit
+    async def test_isolated_tenants_pass(self, tenants):
+        matrix = IsolationMatrix(tenants, resources_per_tenant=PROJECTS_PER_TENANT, page_size=2)
+
+        report = await matrix.run()
+
+        assert report.ok, report.render()
+
+    @pytest.mark.unit
+    async def test_leak_on_a_later_page_is_found(self, stub, tenants, monkeypatch):
+        _leak_last(stub, "tenant_a_123", monkeypatch)
+        matrix = IsolationMatrix(tenants, resources_per_tenant=PROJECTS_PER_TENANT, page_size=2)
+
+        report = await matrix.run()
+
+        assert list(report.violations) == [("tenant_a_123", "tenant_b_456")]
+        assert list(report.violations[("tenant_a_123", "tenant_b_456")]) == ["list"]
+
+    @pytest.mark.unit
+    async def test_probes_are_a_bounded_sample(self, tenants):
+        matrix = IsolationMatrix(tenants, resources_per_tenant=PROJECTS_PER_TENANT, probes_per_pair=1)
+
+        report = await matrix.run()
+
+        # creates, one listing per tenant, and get/update/delete of one project per tenant pair
+        assert report.requests == 2 * PROJECTS_PER_TENANT + 2 + 3 * 2 * 1
@@ -0,0 +1,147 @@
+import json
+
+import pytest
+
+from tests.support import ledger as ledger_module
+from tests.support.ledger import DELETE_ATTEMPTS, ResourceLedger, merge_journals
+
+
+def _entry(resource_id, user_key="tenant_a_admin", group="projects"):
+    return {"group": group, "id": resource_id, "user_key": user_key}
+
+
+def _journal(directory, name, pending=(), leaked=()):
+    (directory / f"{name}.json").write_text(json.dumps({"pending": list(pending), "leaked": list(leaked)}))
+
+
+class FakeResponse:
+
+    def __init__(self, status_code):
+        self.status_code = status_code
+
+
+class FakeClient:
+    """Answers every DELETE with the next status from `statuses` (the last one repeats)."""
+
+    base_url = "http://localhost"
+    endpoints = {"projects": {"delete": "/api/projects/{id}"}}
+    headers = {}
+    timeout = (1, 1)
+    observers = []
+
+    def __init__(self, statuses):
+        self.statuses = list(statuses)
+        self.deletes = []
+
+    def as_tenant(self, token, tenant_id):
+        return self
+
+    def delete(self, group, name, path_params=None):
+        self.deletes.append(path_params["id"])
+        return FakeResponse(self.statuses.pop(0) if len(self.statuses) > 1 else self.statuses[0])
+
+
+class TestMergeJournals:
+
+    @pytest.mark.unit
+    def test_no_journals(self, tmp_path):
+        assert merge_journals(tmp_path) == {"pending": [], "leaked": []}
+
+    @pytest.mark.unit
+    def test_entries_from_every_worker(self, tmp_path):
+        _journal(tmp_path, "gw0", pending=[_entry("p1")], leaked=[_entry("p2")])
+        _journal(tmp_path, "gw1", pending=[_entry("p3", "tenant_b_admin")])
+
+        merged = merge_journals(tmp_path)
+
+        assert merged["pending"] == [_entry("p1"), _entry("p3", "tenant_b_admin")]
+        assert merged["leaked"] == [_entry("p2")]
+
+    @pytest.mark.unit
+    def test_same_resource_kept_once(self, tmp_path):
+        _journal(tmp_path, "controller", pending=[_entry("p1")])
+        _journal(tmp_path, "gw0", pending=[_entry("p1"), _entry("p1", group="tasks")])
+
+        assert merge_journals(tmp_path)["pending"] == [_entry("p1"), _entry("p1", group="tasks")]
+
+    @pytest.mark.unit
+    def test_pending_elsewhere_is_not_reported_leaked(self, tmp_path):
+        _journal(tmp_path, "gw0", leaked=[_entry("p1"), _entry("p2")])
+        _journal(tmp_path, "gw1", pending=[_entry("p1")])
+
+        merged = merge_journals(tmp_path)
+
+        assert merged["pending"] == [_entry("p1")]
+        assert merged["leaked"] == [_entry("p2")]
+
+    @pytest.mark.unit
+    def test_previous_leak_report_is_ignored(self, tmp_path):
+        (tmp_path / "leaked.json").write_text(json.dumps([_entry("old")]))
+        _journal(tmp_path, "gw0", pending=[_entry("p1")])
+
+        assert merge_journals(tmp_path) == {"pending": [_entry("p1")], "leaked": []}
+
+
+class TestDelete:
+
+    @pytest.fixture(autouse=True)
+    def no_backoff(self, monkeypatch):
+        monkeypatch.setattr(ledger_module, "DELETE_BACKOFF", 0)
+
+    def _ledger(self, client):
+        ledger = ResourceLedger(client, lambda user_key: ("token", "tenant_a_123"))
+        ledger.client = client
+        return ledger
+
+    @pytest.mark.unit
+    def test_session_does_not_retry(self):
+        ledger = ResourceLedger(FakeClient([204]), lambda user_key: ("token", "tenant_a_123"))
+        retry = ledger.client.session.get_adapter("http://localhost").max_retries
+
+        assert retry.total == 0
+        ledger.close()
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("status", [200, 204, 404])
+    def test_deleted(self, status):
+        client = FakeClient([status])
+        ledger = self._ledger(client)
+        ledger.record("projects", "p1", "tenant_a_admin")
+
+        ledger.flush()
+
+        assert ledger.leaked == []
+        assert client.deletes == ["p1"]
+
+    @pytest.mark.unit
+    def test_server_errors_retried_then_leaked(self):
+        client = FakeClient([500])
+        ledger = self._ledger(client)
+        ledger.record("projects", "p1", "tenant_a_admin")
+
+        ledger.flush()
+
+        assert ledger.leaked == [_entry("p1")]
+        assert client.deletes == ["p1"] * DELETE_ATTEMPTS
+
+    @pytest.mark.unit
+    def test_recovers_after_server_error(self):
+        client = FakeClient([503, 204])
+        ledger = self._ledger(client)
+        ledger.record("projects", "p1", "tenant_a_admin")
+
+        ledger.flush()
+
+        assert ledger.leaked == []
+        assert client.deletes == ["p1", "p1"]
+
+    @pytest.mark.unit
+    def test_client_error_is_not_retried(self):
+        client = FakeClient([403])
+        ledger = self._ledger(client)
+        ledger.record("projects", "p1", "tenant_a_admin")
+
+        ledger.flush()
+
+        assert ledger.leaked == [_entry("p1")]
+        assert client.deletes == ["p1"]
@@ -0,0 +1,203 @@
+import json
+
+import pytest
+
+from tests.support.listing import ListingError, ProjectRef, _Stream, find_project, iter_projects
+
+
+def _projects(*ids):
+    return [{"id": project_id, "name": f"Project {project_id}", "tenant_id": "tenant_a_123"} for project_id in ids]
+
+
+class FakeResponse:
+
+    def __init__(self, payload, chunk_size=None, status_code=200, links=None):
+        self.body = payload if isinstance(payload, bytes) else json.dumps(payload).encode()
+        self.chunk_size = chunk_size
+        self.status_code = status_code
+        self.links = links or {}
+        self.encoding = "utf-8"
+        self.closed = False
+        self.read = 0
+
+    def iter_content(self, chunk_size):
+        size = self.chunk_size or chunk_size
+        for start in range(0, len(self.body), size):
+            self.read = start + size
+            yield self.body[start:start + size]
+
+    def close(self):
+        self.closed = True
+
+
+class FakeTenant:
+    """Answers projects.list from `pages`, a function of the query params."""
+
+    def __init__(self, pages):
+        self.pages = pages
+        self.requests = []
+        self.responses = []
+
+    def get(self, group, name, params=None, stream=False):
+        assert (group, name, stream) == ("projects", "list", True)
+        self.requests.append(dict(params))
+        response = self.pages(params)
+        self.responses.append(response)
+        return response
+
+
+class TestChunkBoundaries:
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, 64])
+    def test_items_split_anywhere_decode_the_same(self, chunk_size):
+        payload = {
+            "items": _projects("a1", "ü-ñ", "b\"2"),
+            "next_cursor": None,
+        }
+        tenant = FakeTenant(lambda params: FakeResponse(payload, chunk_size))
+
+        assert [p.id for p in iter_projects(tenant)] == ["a1", "ü-ñ", "b\"2"]
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("chunk_size", [1, 2, 3, 5])
+    def test_numbers_split_at_dot_or_exponent(self, chunk_size):
+        body = b'{"total": 2.5e1, "items": [{"id": 1.5e3, "name": "x"}, {"id": -12.25, "name": "y"}], "page": 1.0}'
+        tenant = FakeTenant(lambda params: FakeResponse(body, chunk_size))
+
+        assert [p.id for p in iter_projects(tenant)] == [1500.0, -12.25]
+
+    @pytest.mark.unit
+    def test_bare_number_array_with_one_byte_chunks(self):
+        stream = _Stream(FakeResponse(b"[1.5e3, 2E-1, 10]", chunk_size=1))
+
+        assert list(stream.array()) == [1500.0, 0.2, 10]
+
+    @pytest.mark.unit
+    def test_truncated_body_raises_listing_error(self):
+        tenant = FakeTenant(lambda params: FakeResponse(b'{"items": [{"id": "a1", "na', chunk_size=4))
+
+        with pytest.raises(ListingError):
+            list(iter_projects(tenant))
+
+
+class TestEnvelopes:
+
+    @pytest.mark.unit
+    def test_bare_array_is_one_page(self):
+        tenant = FakeTenant(lambda params: FakeResponse(_projects("a1", "a2")))
+
+        assert list(iter_projects(tenant)) == [
+            ProjectRef("a1", "Project a1", "tenant_a_123"),
+            ProjectRef("a2", "Project a2", "tenant_a_123"),
+        ]
+        assert len(tenant.requests) == 1
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("key", ["items", "projects", "data", "results"])
+    def test_item_keys(self, key):
+        tenant = FakeTenant(lambda params: FakeResponse({"total": 1, key: _projects("a1")}))
+
+        assert [p.id for p in iter_projects(tenant)] == ["a1"]
+
+    @pytest.mark.unit
+    def test_project_id_field_and_nested_values(self):
+        items = [{"project_id": "p1", "name": "x", "tags": [{"a": [1, 2]}], "owner": {"id": "u1"}}]
+        tenant = FakeTenant(lambda params: FakeResponse({"items": items, "meta": {"next": None}}, chunk_size=3))
+
+        assert list(iter_projects(tenant)) == [ProjectRef("p1", "x", None)]
+
+    @pytest.mark.unit
+    def test_error_status_raises(self):
+        tenant = FakeTenant(lambda params: FakeResponse({"error": "nope"}, status_code=500))
+
+        with pytest.raises(ListingError):
+            list(iter_projects(tenant))
+        assert tenant.responses[0].closed
+
+
+class TestPagination:
+
+    @pytest.mark.unit
+    def test_cursor(self):
+        pages = {None: (_projects("a1", "a2"), "c2"), "c2": (_projects("a3"), None)}
+
+        def page(params):
+            items, cursor = pages[params.get("cursor")]
+            return FakeResponse({"items": items, "next_cursor": cursor})
+
+        tenant = FakeTenant(page)
+
+        assert [p.id for p in iter_projects(tenant, page_size=2)] == ["a1", "a2", "a3"]
+        assert tenant.requests == [{"limit": 2}, {"limit": 2, "cursor": "c2"}]
+
+    @pytest.mark.unit
+    def test_next_url(self):
+        def page(params):
+            if "offset" in params:
+                return FakeResponse({"items": _projects("a2"), "next": None})
+            return FakeResponse({"items": _projects("a1"), "next": "/api/projects?limit=1&offset=1"})
+
+        tenant = FakeTenant(page)
+
+        assert [p.id for p in iter_projects(tenant, page_size=1)] == ["a1", "a2"]
+        assert tenant.requests[1] == {"limit": "1", "offset": "1"}
+
+    @pytest.mark.unit
+    def test_link_header(self):
+        def page(params):
+            if params.get("page") == "2":
+                return FakeResponse(_projects("a2"))
+            return FakeResponse(_projects("a1"), links={"next": {"url": "https://api/projects?limit=1&page=2"}})
+
+        tenant = FakeTenant(page)
+
+        assert [p.id for p in iter_projects(tenant, page_size=1)] == ["a1", "a2"]
+
+    @pytest.mark.unit
+    def test_page_numbers(self):
+        def page(params):
+            number = params.get("page", 1)
+            return FakeResponse({"items": _projects(f"a{number}"), "page": number, "total_pages": 3})
+
+        tenant = FakeTenant(page)
+
+        assert [p.id for p in iter_projects(tenant)] == ["a1", "a2", "a3"]
+        assert [r.get("page") for r in tenant.requests] == [None, 2, 3]
+
+    @pytest.mark.unit
+    def test_has_more_false_stops_before_link(self):
+        tenant = FakeTenant(lambda params: FakeResponse(
+            {"items": _projects("a1"), "has_more": False},
+            links={"next": {"url": "https://api/projects?page=2"}},
+        ))
+
+        assert [p.id for p in iter_projects(tenant)] == ["a1"]
+        assert len(tenant.requests) == 1
+
+
+class TestFindProject:
+
+    @pytest.mark.unit
+    def test_stops_reading_at_the_match(self):
+        body = {"items": _projects(*(f"p{i}" for i in range(500))), "next_cursor": "more"}
+        tenant = FakeTenant(lambda params: FakeResponse(body, chunk_size=256))
+
+        assert find_project(tenant, "p3").id == "p3"
+        response = tenant.responses[0]
+        assert response.closed
+        assert response.read < len(response.body) // 10
+        assert len(tenant.requests) == 1
+
+    @pytest.mark.unit
+    def test_absent_reads_every_page(self):
+        pages = {None: (_projects("a1"), "c2"), "c2": (_projects("a2"), None)}
+
+        def page(params):
+            items, cursor = pages[params.get("cursor")]
+            return FakeResponse({"items": items, "next_cursor": cursor})
+
+        tenant = FakeTenant(page)
+
+        assert find_project(tenant, "zz") is None
+        assert len(tenant.requests) == 2
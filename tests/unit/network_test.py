@@ -0,0 +1,133 @@
+import json
+
+import pytest
+
+from tests.support.network import NetworkPolicy, NetworkRouter, StaticAssetCache
+
+
+URL = "https://app.example/static/app.js"
+TTL = 3600
+
+
+class FakeFetched:
+
+    def __init__(self, status, headers, body=b""):
+        self.status = status
+        self.headers = headers
+        self._body = body
+
+    def body(self):
+        return self._body
+
+
+class FakeRoute:
+    """Answers fetch() with `fetched` and keeps what was sent and fulfilled."""
+
+    def __init__(self, fetched=None):
+        self.request = type("Request", (), {"headers": {"accept": "*/*"}})()
+        self.fetched = fetched
+        self.fetches = []
+        self.fulfilled = None
+
+    def fetch(self, headers=None):
+        self.fetches.append(headers)
+        return self.fetched
+
+    def fulfill(self, status, headers, body):
+        self.fulfilled = (status, body)
+
+
+@pytest.fixture
+def router(tmp_path):
+    return NetworkRouter(NetworkPolicy(cache_ttl=TTL), StaticAssetCache(tmp_path))
+
+
+def _store(router, headers, age, body=b"old"):
+    router.cache.put(URL, 200, headers, body)
+    meta_path, _ = router.cache._paths(URL)
+    meta = json.loads(meta_path.read_text())
+    meta["stored_at"] -= age
+    meta_path.write_text(json.dumps(meta))
+
+
+class TestFreshness:
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("cache_control, fresh_for", [
+        ("", TTL),
+        ("public", TTL),
+        ("max-age=60", 60),
+        ("public, max-age=86400", TTL),
+        ("no-cache", 0),
+        ("max-age=600, no-cache", 0),
+        ("max-age=0", 0),
+        ("max-age=soon", 0),
+        ('max-age="30"', 30),
+    ])
+    def test_fresh_for(self, cache_control, fresh_for):
+        assert NetworkPolicy(cache_ttl=TTL).fresh_for({"cache-control": cache_control}) == fresh_for
+
+
+class TestServeCached:
+
+    @pytest.mark.unit
+    def test_fresh_entry_served_without_a_request(self, router):
+        _store(router, {"cache-control": "max-age=600", "etag": '"v1"'}, age=10)
+        route = FakeRoute()
+
+        router._serve_cached(route, URL)
+
+        assert route.fetches == []
+        assert route.fulfilled == (200, b"old")
+
+    @pytest.mark.unit
+    def test_no_cache_entry_revalidated_every_time(self, router):
+        _store(router, {"cache-control": "no-cache", "etag": '"v1"'}, age=0)
+        route = FakeRoute(FakeFetched(304, {}))
+
+        router._serve_cached(route, URL)
+
+        assert route.fetches[0]["if-none-match"] == '"v1"'
+        assert route.fulfilled == (200, b"old")
+        assert router.stats["cache_revalidated"] == 1
+
+    @pytest.mark.unit
+    def test_max_age_shorter_than_ttl_expires_first(self, router):
+        _store(router, {"cache-control": "max-age=60", "etag": '"v1"'}, age=120)
+        route = FakeRoute(FakeFetched(200, {"etag": '"v2"'}, b"new"))
+
+        router._serve_cached(route, URL)
+
+        assert route.fulfilled == (200, b"new")
+        assert router.cache.get(URL)[1] == b"new"
+
+    @pytest.mark.unit
+    def test_last_modified_used_without_etag(self, router):
+        _store(router, {"last-modified": "Tue, 01 Sep 2026 10:00:00 GMT"}, age=TTL + 1)
+        route = FakeRoute(FakeFetched(304, {}))
+
+        router._serve_cached(route, URL)
+
+        assert route.fetches[0]["if-modified-since"] == "Tue, 01 Sep 2026 10:00:00 GMT"
+        assert route.fulfilled == (200, b"old")
+
+    @pytest.mark.unit
+    def test_stale_entry_without_validators_fetched_again(self, router):
+        _store(router, {"content-type": "text/javascript"}, age=TTL + 1)
+        route = FakeRoute(FakeFetched(200, {"content-type": "text/javascript"}, b"new"))
+
+        router._serve_cached(route, URL)
+
+        assert route.fetches == [None]
+        assert route.fulfilled == (200, b"new")
+        assert router.stats["cache_misses"] == 1
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("cache_control", ["no-store", "private, max-age=60"])
+    def test_uncacheable_responses_not_stored(self, router, cache_control):
+        route = FakeRoute(FakeFetched(200, {"cache-control": cache_control}, b"secret"))
+
+        router._serve_cached(route, URL)
+
+        assert route.fulfilled == (200, b"secret")
+        assert router.cache.get(URL) is None
@@ -0,0 +1,78 @@
+import json
+
+import pytest
+
+from tests.support.api_client import WorkflowProClient
+from tests.support.config import TEST_DATA_PATH
+from tests.support.project_pool import ProjectPool
+from tests.support.stub_server import WorkflowProStub
+
+
+TEST_DATA = json.loads(TEST_DATA_PATH.read_text())
+TENANT = "tenant_a_123"
+
+
+class RotatingLogin:
+    """credentials() handing out `token`; expire() revokes it and logs in again."""
+
+    def __init__(self, stub):
+        self.stub = stub
+        self.logins = 0
+        self.expire()
+
+    def expire(self):
+        self.stub.state.static_tokens.pop(f"token_{self.logins}", None)
+        self.logins += 1
+        self.stub.state.static_tokens[f"token_{self.logins}"] = TENANT
+
+    def __call__(self, user_key):
+        return f"token_{self.logins}", TENANT
+
+
+@pytest.fixture(scope="module")
+def stub():
+    server = WorkflowProStub(TEST_DATA).start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def pool(stub):
+    client = WorkflowProClient(stub.url, TEST_DATA["api_endpoints"])
+    login = RotatingLogin(stub)
+    pool = ProjectPool(client, login, {"name": "Pool Test", "description": "pool"}, size=2, low_water=0)
+    pool.login = login
+    yield pool
+    pool.close()
+    client.close()
+
+
+def _idle(pool, user_key):
+    with pool.lock:
+        assert pool.lock.wait_for(lambda: not pool.pending.get(user_key), 5)
+
+
+class TestProjectPool:
+
+    @pytest.mark.unit
+    def test_lease_and_release(self, pool):
+        project = pool.lease("tenant_a_admin", timeout=5)
+        pool.release("tenant_a_admin", project["id"])
+
+        assert project["tenant_id"] == TENANT
+        assert pool.stats["leased"] == 1
+
+    @pytest.mark.unit
+    def test_expired_login_is_renewed(self, pool):
+        project = pool.lease("tenant_a_admin", timeout=5)
+        _idle(pool, "tenant_a_admin")
+        pool.login.expire()
+
+        pool.release("tenant_a_admin", project["id"], destroy=True)
+        # two from the queue, then one created with the new token
+        leased = [pool.lease("tenant_a_admin", timeout=5) for _ in range(3)]
+        _idle(pool, "tenant_a_admin")
+
+        assert len(leased) == 3
+        assert pool.errors == {}
+        assert project["id"] not in pool.owned
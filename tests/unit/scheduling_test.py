@@ -0,0 +1,187 @@
+import pytest
+
+from tests.support import scheduling
+from tests.support.scheduling import (
+    DEFAULT_DURATION,
+    DurationHistory,
+    longest_first_makespan,
+    make_scheduler_class,
+    note_tenant,
+)
+from tests.support.session_scope import session_scope
+
+
+class FakeConfig:
+
+    def __init__(self, workers):
+        self.workers = workers
+
+    def getvalue(self, name):
+        assert name == "tx"
+        return [f"{self.workers}*popen"]
+
+    def getoption(self, name):
+        return None
+
+
+class FakeNode:
+
+    shutting_down = False
+
+    def __init__(self, name):
+        self.gateway = type("Gateway", (), {"id": name})()
+        self.sent = []
+        self.shut_down = False
+
+    def send_runtest_some(self, indices):
+        self.sent.extend(indices)
+
+    def shutdown(self):
+        self.shut_down = True
+
+
+def _scheduler(tests, workers=2):
+    """A DurationScheduling over `tests` ({nodeid: (seconds, tenants)}) with every node collected."""
+    history = DurationHistory({
+        nodeid: {"duration": seconds, "runs": 1, "tenants": sorted(tenants)}
+        for nodeid, (seconds, tenants) in tests.items()
+    })
+    scheduler = make_scheduler_class()(FakeConfig(workers), history=history)
+    nodes = [FakeNode(f"gw{i}") for i in range(workers)]
+    for node in nodes:
+        scheduler.add_node(node)
+        scheduler.add_node_collection(node, list(tests))
+    return scheduler, nodes
+
+
+def _sent(scheduler, node):
+    return [scheduler.collection[index] for index in node.sent]
+
+
+class TestMakespan:
+
+    @pytest.mark.unit
+    def test_no_tests(self):
+        assert longest_first_makespan([], 3) == (0.0, [0.0, 0.0, 0.0])
+
+    @pytest.mark.unit
+    def test_longest_first(self):
+        # 7 and 5 start on their own workers, then 4 and 3 join whichever is free first
+        assert longest_first_makespan([3, 5, 4, 7], 2) == (10, [9, 10])
+
+    @pytest.mark.unit
+    def test_one_long_test_bounds_the_makespan(self):
+        makespan, per_worker = longest_first_makespan([30, 1, 1, 1, 1], 4)
+
+        assert makespan == 30
+        assert sum(per_worker) == 34
+
+
+class TestDurationHistory:
+
+    @pytest.mark.unit
+    def test_predictions(self):
+        history = DurationHistory({"a": {"duration": 4.0, "runs": 1, "tenants": []},
+                                   "b": {"duration": 2.0, "runs": 1, "tenants": []}})
+
+        assert history.predict("a") == 4.0
+        assert history.predict("new") == 3.0
+        assert DurationHistory().predict("new") == DEFAULT_DURATION
+
+    @pytest.mark.unit
+    def test_update_is_a_moving_average(self):
+        history = DurationHistory()
+        history.update({"a": (4.0, {"tenant_b_admin", "tenant_a_admin"})})
+        history.update({"a": (2.0, {"tenant_a_admin"})})
+
+        assert history.tests["a"] == {"duration": 3.0, "runs": 2, "tenants": ["tenant_a_admin"]}
+
+    @pytest.mark.unit
+    def test_save_keeps_entries_of_other_runs(self, tmp_path):
+        path = tmp_path / "durations.json"
+        DurationHistory({"a": {"duration": 1.0, "runs": 1, "tenants": []}}).save(path)
+        DurationHistory({"b": {"duration": 2.0, "runs": 1, "tenants": []}}).save(path)
+
+        assert set(DurationHistory.load(path).tests) == {"a", "b"}
+
+
+class TestDurationScheduling:
+
+    @pytest.mark.unit
+    def test_longest_tests_go_out_first(self):
+        scheduler, (gw0, gw1) = _scheduler({
+            "short": (1, ()), "long": (30, ()), "medium": (10, ()), "tiny": (0.1, ()),
+        })
+
+        scheduler.schedule()
+
+        assert _sent(scheduler, gw0) + _sent(scheduler, gw1) == ["long", "medium", "short", "tiny"]
+        assert scheduler.config._schedule_plan["predicted_makespan_s"] == 30
+
+    @pytest.mark.unit
+    def test_same_tenant_preferred_among_similar_lengths(self):
+        scheduler, (gw0, gw1) = _scheduler({
+            "a1": (10, {"tenant_a_admin"}),
+            "b1": (9.9, {"tenant_b_admin"}),
+            "b2": (9.8, {"tenant_b_admin"}),
+            "a2": (9.5, {"tenant_a_admin"}),
+        })
+
+        scheduler.schedule()
+
+        assert _sent(scheduler, gw0) == ["a1", "a2"]
+        assert _sent(scheduler, gw1) == ["b1", "b2"]
+
+    @pytest.mark.unit
+    def test_much_longer_test_beats_affinity(self):
+        scheduler, (gw0, _) = _scheduler({
+            "a1": (10, {"tenant_a_admin"}),
+            "b1": (9.9, {"tenant_b_admin"}),
+            "long": (9, ()),
+            "a2": (1, {"tenant_a_admin"}),
+        })
+
+        scheduler.schedule()
+
+        assert _sent(scheduler, gw0) == ["a1", "b1"]
+
+    @pytest.mark.unit
+    def test_refills_as_tests_finish(self):
+        scheduler, (gw0, gw1) = _scheduler({f"t{i}": (10 - i, ()) for i in range(6)})
+        scheduler.schedule()
+
+        scheduler.mark_test_complete(gw0, gw0.sent[0])
+
+        assert _sent(scheduler, gw0) == ["t0", "t1", "t4"]
+        assert scheduler.pending and not gw0.shut_down
+
+
+class TestNoteTenant:
+
+    @pytest.fixture(autouse=True)
+    def running(self, monkeypatch):
+        monkeypatch.setattr(scheduling, "_current", "tests/x_test.py::test_x")
+        monkeypatch.setattr(scheduling, "_tenants", {})
+
+    @pytest.mark.unit
+    def test_recorded_for_the_running_test(self):
+        note_tenant("tenant_a_admin")
+        with session_scope():
+            note_tenant("tenant_b_admin")
+
+        assert scheduling._tenants == {"tests/x_test.py::test_x": {"tenant_a_admin", "tenant_b_admin"}}
+
+    @pytest.mark.unit
+    def test_background_work_left_out(self):
+        with session_scope(background=True):
+            note_tenant("tenant_b_admin")
+
+        assert scheduling._tenants == {}
+
+    @pytest.mark.unit
+    def test_nothing_recorded_between_tests(self, monkeypatch):
+        monkeypatch.setattr(scheduling, "_current", None)
+
+        note_tenant("tenant_a_admin")
+
+        assert scheduling._tenants == {}
@@ -0,0 +1,92 @@
+import json
+import os
+
+import pytest
+import requests
+
+from tests.support.config import TEST_DATA_PATH
+from tests.support.stub_server import WorkflowProStub
+
+
+TENANT = "tenant_a_123"
+
+
+@pytest.fixture(scope="module")
+def stub():
+    # one server for the module: every stop() waits out serve_forever's 0.5s poll
+    server = WorkflowProStub(json.loads(TEST_DATA_PATH.read_text()), static_tokens={"trusted": None}).start()
+    yield server
+    server.stop()
+
+
+def _get(stub, path, tenant=TENANT, **kwargs):
+    headers = {"Authorization": "Bearer trusted", "X-Tenant-ID": tenant}
+    return requests.get(f"{stub.url}{path}", headers=headers, timeout=5, **kwargs)
+
+
+class TestListProjects:
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("params", [
+        {"limit": "ten"},
+        {"limit": "0"},
+        {"limit": "2", "cursor": "abc"},
+        {"limit": "2", "cursor": "-1"},
+    ])
+    def test_bad_paging_parameters_are_rejected(self, stub, params):
+        response = _get(stub, "/api/projects", params=params)
+
+        assert response.status_code == 400
+        assert "error" in response.json()
+
+    @pytest.mark.unit
+    def test_pages(self, stub):
+        for i in range(3):
+            stub.state.create_project(TENANT, {"name": f"Project {i}"})
+
+        first = _get(stub, "/api/projects", params={"limit": "2"}).json()
+        second = _get(stub, "/api/projects", params={"limit": "2", "cursor": first["next_cursor"]}).json()
+
+        assert [len(first["items"]), len(second["items"])] == [2, 1]
+        assert second["next_cursor"] is None
+
+
+class TestTenants:
+
+    @pytest.mark.unit
+    def test_unknown_tenant_of_trusted_token_is_unauthorized(self, stub):
+        assert _get(stub, "/api/tenants", tenant="tenant_nobody").status_code == 401
+
+    @pytest.mark.unit
+    def test_switch_to_unknown_tenant_is_unauthorized(self, stub):
+        response = requests.post(
+            f"{stub.url}/api/tenants/switch", json={"tenant_id": "tenant_nobody"},
+            headers={"Authorization": "Bearer trusted", "X-Tenant-ID": "tenant_nobody"}, timeout=5,
+        )
+
+        assert response.status_code == 401
+
+
+class TestPlumbing:
+
+    @pytest.mark.unit
+    def test_head_answers_like_get_without_body(self, stub):
+        get = requests.get(f"{stub.url}/login", timeout=5)
+        head = requests.head(f"{stub.url}/login", timeout=5)
+
+        assert head.status_code == get.status_code == 200
+        assert head.headers["Content-Length"] == get.headers["Content-Length"]
+        assert head.content == b""
+
+    @pytest.mark.unit
+    def test_stop_restores_environment(self, monkeypatch):
+        monkeypatch.setenv("BASE_URL", "https://app.example")
+        monkeypatch.delenv("API_BASE_URL", raising=False)
+        server = WorkflowProStub(json.loads(TEST_DATA_PATH.read_text())).start()
+        server.export_env()
+        assert os.environ["BASE_URL"] == os.environ["API_BASE_URL"] == server.url
+
+        server.stop()
+
+        assert os.environ["BASE_URL"] == "https://app.example"
+        assert "API_BASE_URL" not in os.environ